@@ -1,32 +1,186 @@
+-- Every jam is an event. All event data is partitioned by event_id, so queries for the active event only touch
+-- its own partitions, and a finished event can be archived by dropping them. (Requires PostgreSQL 15+)
+-- Partitions for the active event are created by universal.Database on startup.
+CREATE TABLE IF NOT EXISTS events(
+    event_id INT PRIMARY KEY,
+    created TIMESTAMP DEFAULT (now() at time zone 'utc'),
+    archived TIMESTAMP
+);
+
 CREATE TABLE IF NOT EXISTS teams(
-    team_id BIGINT PRIMARY KEY,
-    token TEXT UNIQUE NOT NULL,
-    invite TEXT UNIQUE NOT NULL,
-    name TEXT UNIQUE NOT NULL,
+    event_id INT NOT NULL,
+    team_id BIGINT NOT NULL,
+    token TEXT NOT NULL,
+    invite TEXT NOT NULL,
+    name TEXT NOT NULL,
     github TEXT,
-    owner BIGINT UNIQUE NOT NULL,
-    role_id BIGINT UNIQUE NOT NULL,
-    text_id BIGINT UNIQUE NOT NULL,
-    voice_id BIGINT UNIQUE NOT NULL,
-    created TIMESTAMP DEFAULT (now() at time zone 'utc')
-);
+    owner BIGINT NOT NULL,
+    role_id BIGINT NOT NULL,
+    text_id BIGINT NOT NULL,
+    voice_id BIGINT NOT NULL,
+    created TIMESTAMP DEFAULT (now() at time zone 'utc'),
+    PRIMARY KEY (event_id, team_id),
+    UNIQUE (event_id, token),
+    UNIQUE (event_id, invite),
+    UNIQUE (event_id, name),
+    UNIQUE (event_id, owner),
+    UNIQUE (event_id, role_id),
+    UNIQUE (event_id, text_id),
+    UNIQUE (event_id, voice_id)
+) PARTITION BY LIST (event_id);
 
 CREATE TABLE IF NOT EXISTS members(
-    member_id BIGINT PRIMARY KEY,
+    event_id INT NOT NULL,
+    member_id BIGINT NOT NULL,
     languages INT[],
     timezone INTERVAL,
     solo BOOLEAN,
     team_id BIGINT,
     registered TIMESTAMP DEFAULT (now() at time zone 'utc'),
-    FOREIGN KEY (team_id) REFERENCES teams (team_id) ON DELETE SET NULL
-);
+    PRIMARY KEY (event_id, member_id),
+    FOREIGN KEY (event_id, team_id) REFERENCES teams (event_id, team_id) ON DELETE SET NULL (team_id)
+) PARTITION BY LIST (event_id);
+
+-- Used when fetching a team with its members, and by ON DELETE SET NULL when a team is deleted...
+CREATE INDEX IF NOT EXISTS members_event_team_idx ON members (event_id, team_id);
 
 CREATE TABLE IF NOT EXISTS error_log(
-    id SERIAL PRIMARY KEY,
+    event_id INT NOT NULL,
+    id SERIAL,
     channel BIGINT,
     invoker BIGINT,
     command TEXT,
     error TEXT,
     traceback TEXT,
-    created TIMESTAMP DEFAULT (now() at time zone 'utc')
+    created TIMESTAMP DEFAULT (now() at time zone 'utc'),
+    PRIMARY KEY (event_id, id)
+) PARTITION BY LIST (event_id);
+
+-- One row per team, kept current by the triggers below so team level facts never need every member...
+CREATE TABLE IF NOT EXISTS team_summary(
+    event_id INT NOT NULL,
+    team_id BIGINT NOT NULL,
+    name TEXT NOT NULL,
+    member_count INT NOT NULL DEFAULT 0,
+    solo_count INT NOT NULL DEFAULT 0,
+    languages INT[] NOT NULL DEFAULT '{}',
+    min_timezone INTERVAL,
+    max_timezone INTERVAL,
+    all_solo BOOLEAN NOT NULL DEFAULT TRUE,
+    updated TIMESTAMP DEFAULT (now() at time zone 'utc'),
+    PRIMARY KEY (event_id, team_id),
+    FOREIGN KEY (event_id, team_id) REFERENCES teams (event_id, team_id) ON DELETE CASCADE
+) PARTITION BY LIST (event_id);
+
+-- The single team signature changed when events were added...
+DROP FUNCTION IF EXISTS refresh_team_summary(BIGINT);
+
+-- Recompute the summary of a single team. This only reads the members of that team.
+-- Concurrent member changes to one team would each recompute without the other's uncommitted member, and the last
+-- upsert would win with a stale summary. So the team row is locked first, until commit: a waiting recompute then reads
+-- a fresh snapshot which includes the member committed before it. FOR NO KEY UPDATE does not block the foreign key
+-- checks (FOR KEY SHARE) of members joining the team...
+CREATE OR REPLACE FUNCTION refresh_team_summary(event INT, target BIGINT) RETURNS VOID AS $$
+BEGIN
+    PERFORM 1 FROM teams WHERE event_id = event AND team_id = target FOR NO KEY UPDATE;
+
+    INSERT INTO team_summary AS summary
+        (event_id, team_id, name, member_count, solo_count, languages, min_timezone, max_timezone, all_solo, updated)
+    SELECT
+        teams.event_id,
+        teams.team_id,
+        teams.name,
+        count(members.member_id),
+        count(members.member_id) FILTER (WHERE members.solo),
+        COALESCE(
+            (SELECT array_agg(DISTINCT language ORDER BY language)
+             FROM members AS m, unnest(m.languages) AS language
+             WHERE m.event_id = teams.event_id AND m.team_id = teams.team_id),
+            '{}'
+        ),
+        min(members.timezone),
+        max(members.timezone),
+        COALESCE(bool_and(members.solo), TRUE),
+        now() at time zone 'utc'
+    FROM teams
+    LEFT OUTER JOIN members ON (teams.event_id = members.event_id AND teams.team_id = members.team_id)
+    WHERE teams.event_id = event AND teams.team_id = target
+    GROUP BY teams.event_id, teams.team_id, teams.name
+    ON CONFLICT (event_id, team_id) DO UPDATE SET
+        name = EXCLUDED.name,
+        member_count = EXCLUDED.member_count,
+        solo_count = EXCLUDED.solo_count,
+        languages = EXCLUDED.languages,
+        min_timezone = EXCLUDED.min_timezone,
+        max_timezone = EXCLUDED.max_timezone,
+        all_solo = EXCLUDED.all_solo,
+        updated = EXCLUDED.updated;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION team_summary_members() RETURNS TRIGGER AS $$
+BEGIN
+    -- A member moving between two teams locks both in the same order, so two opposite moves cannot deadlock...
+    IF TG_OP = 'UPDATE' AND OLD.team_id IS NOT NULL AND NEW.team_id IS NOT NULL
+            AND NEW.team_id IS DISTINCT FROM OLD.team_id THEN
+        PERFORM 1 FROM teams WHERE event_id = NEW.event_id AND team_id IN (OLD.team_id, NEW.team_id)
+        ORDER BY team_id FOR NO KEY UPDATE;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF OLD.team_id IS NOT NULL THEN
+            PERFORM refresh_team_summary(OLD.event_id, OLD.team_id);
+        END IF;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        IF NEW.team_id IS NOT NULL THEN
+            PERFORM refresh_team_summary(NEW.event_id, NEW.team_id);
+        END IF;
+    ELSIF TG_OP = 'UPDATE' THEN
+        IF NEW.team_id IS NOT NULL AND NEW.team_id IS DISTINCT FROM OLD.team_id THEN
+            PERFORM refresh_team_summary(NEW.event_id, NEW.team_id);
+        END IF;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION team_summary_teams() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_team_summary(NEW.event_id, NEW.team_id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS team_summary_members ON members;
+CREATE TRIGGER team_summary_members AFTER INSERT OR UPDATE OR DELETE ON members
+    FOR EACH ROW EXECUTE FUNCTION team_summary_members();
+
+DROP TRIGGER IF EXISTS team_summary_teams ON teams;
+CREATE TRIGGER team_summary_teams AFTER INSERT OR UPDATE OF name ON teams
+    FOR EACH ROW EXECUTE FUNCTION team_summary_teams();
+
+-- Backfill any teams created before the summary existed...
+SELECT refresh_team_summary(event_id, team_id) FROM teams
+WHERE (event_id, team_id) NOT IN (SELECT event_id, team_id FROM team_summary);
+
+-- Discord side effects, committed in the same transaction as the change that caused them and run by the bot.
+-- Jobs are not event data, so this table is not partitioned. A running job whose lease (available) has passed
+-- belongs to a worker that died, and is claimed again...
+CREATE TABLE IF NOT EXISTS outbox(
+    job_id BIGSERIAL PRIMARY KEY,
+    event_id INT NOT NULL,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    available TIMESTAMP NOT NULL DEFAULT (now() at time zone 'utc'),
+    last_error TEXT,
+    created TIMESTAMP DEFAULT (now() at time zone 'utc'),
+    completed TIMESTAMP
 );
+
+CREATE INDEX IF NOT EXISTS outbox_claim_idx ON outbox (available) WHERE status IN ('pending', 'running');
@@ -0,0 +1,143 @@
+-- SQLite version of SCHEMA.sql, see universal/sqlite.py for how the custom column types are converted.
+-- JSON columns hold a list of ints, INTERVAL columns hold whole seconds.
+-- SQLite has no partitions, so every event table leads its keys and indexes with event_id instead.
+CREATE TABLE IF NOT EXISTS events(
+    event_id INTEGER PRIMARY KEY,
+    created TIMESTAMP DEFAULT (datetime('now')),
+    archived TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS teams(
+    event_id INTEGER NOT NULL,
+    team_id INTEGER PRIMARY KEY,
+    token TEXT NOT NULL,
+    invite TEXT NOT NULL,
+    name TEXT NOT NULL,
+    github TEXT,
+    owner INTEGER NOT NULL,
+    role_id INTEGER NOT NULL,
+    text_id INTEGER NOT NULL,
+    voice_id INTEGER NOT NULL,
+    created TIMESTAMP DEFAULT (datetime('now')),
+    UNIQUE (event_id, token),
+    UNIQUE (event_id, invite),
+    UNIQUE (event_id, name),
+    UNIQUE (event_id, owner),
+    UNIQUE (event_id, role_id),
+    UNIQUE (event_id, text_id),
+    UNIQUE (event_id, voice_id)
+);
+
+CREATE TABLE IF NOT EXISTS members(
+    event_id INTEGER NOT NULL,
+    member_id INTEGER NOT NULL,
+    languages JSON,
+    timezone INTERVAL,
+    solo BOOLEAN,
+    team_id INTEGER,
+    registered TIMESTAMP DEFAULT (datetime('now')),
+    PRIMARY KEY (event_id, member_id),
+    FOREIGN KEY (team_id) REFERENCES teams (team_id) ON DELETE SET NULL
+);
+
+CREATE INDEX IF NOT EXISTS members_team_id_idx ON members (team_id);
+
+-- Team names are unique per event regardless of case...
+CREATE UNIQUE INDEX IF NOT EXISTS teams_name_lower_idx ON teams (event_id, lower(name));
+
+CREATE TABLE IF NOT EXISTS error_log(
+    event_id INTEGER NOT NULL,
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel INTEGER,
+    invoker INTEGER,
+    command TEXT,
+    error TEXT,
+    traceback TEXT,
+    created TIMESTAMP DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS error_log_event_idx ON error_log (event_id);
+
+-- One row per team, kept current by the triggers below so team level facts never need every member...
+CREATE TABLE IF NOT EXISTS team_summary(
+    event_id INTEGER NOT NULL,
+    team_id INTEGER PRIMARY KEY REFERENCES teams (team_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    member_count INTEGER NOT NULL DEFAULT 0,
+    solo_count INTEGER NOT NULL DEFAULT 0,
+    languages JSON NOT NULL DEFAULT '[]',
+    min_timezone INTERVAL,
+    max_timezone INTERVAL,
+    all_solo BOOLEAN NOT NULL DEFAULT 1,
+    updated TIMESTAMP DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS team_summary_event_idx ON team_summary (event_id, name);
+
+-- SQLite has no functions, so the triggers select the new summary of a team from this view...
+CREATE VIEW IF NOT EXISTS team_summary_source AS
+SELECT
+    teams.event_id,
+    teams.team_id,
+    teams.name,
+    count(members.member_id),
+    coalesce(sum(members.solo), 0),
+    (SELECT json_group_array(value) FROM (
+        SELECT DISTINCT language.value FROM members AS m, json_each(m.languages) AS language
+        WHERE m.team_id = teams.team_id
+        ORDER BY language.value
+    )),
+    min(members.timezone),
+    max(members.timezone),
+    coalesce(min(members.solo), 1),
+    datetime('now')
+FROM teams
+LEFT OUTER JOIN members ON (teams.team_id = members.team_id)
+GROUP BY teams.team_id;
+
+CREATE TRIGGER IF NOT EXISTS team_summary_members_insert AFTER INSERT ON members WHEN NEW.team_id IS NOT NULL
+BEGIN
+    INSERT OR REPLACE INTO team_summary SELECT * FROM team_summary_source WHERE team_id = NEW.team_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS team_summary_members_update AFTER UPDATE ON members
+BEGIN
+    INSERT OR REPLACE INTO team_summary SELECT * FROM team_summary_source WHERE team_id IN (OLD.team_id, NEW.team_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS team_summary_members_delete AFTER DELETE ON members WHEN OLD.team_id IS NOT NULL
+BEGIN
+    INSERT OR REPLACE INTO team_summary SELECT * FROM team_summary_source WHERE team_id = OLD.team_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS team_summary_teams_insert AFTER INSERT ON teams
+BEGIN
+    INSERT OR REPLACE INTO team_summary SELECT * FROM team_summary_source WHERE team_id = NEW.team_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS team_summary_teams_update AFTER UPDATE OF name ON teams
+BEGIN
+    INSERT OR REPLACE INTO team_summary SELECT * FROM team_summary_source WHERE team_id = NEW.team_id;
+END;
+
+-- Backfill any teams created before the summary existed...
+INSERT OR IGNORE INTO team_summary SELECT * FROM team_summary_source
+WHERE team_id NOT IN (SELECT team_id FROM team_summary);
+
+-- Discord side effects, committed in the same transaction as the change that caused them and run by the bot.
+-- A running job whose lease (available) has passed belongs to a worker that died, and is claimed again...
+CREATE TABLE IF NOT EXISTS outbox(
+    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_id INTEGER NOT NULL,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    payload JSON NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available TIMESTAMP NOT NULL DEFAULT (datetime('now')),
+    last_error TEXT,
+    created TIMESTAMP DEFAULT (datetime('now')),
+    completed TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS outbox_claim_idx ON outbox (available) WHERE status IN ('pending', 'running');
@@ -48,10 +48,20 @@ async def main(client_: discord.Client, /) -> None:
 
 
 if __name__ == '__main__':
+    universal.install_uvloop(universal.CONFIG['SERVER'].get('uvloop', False))
+
     intents: discord.Intents = discord.Intents.default()
     intents.members = True
 
-    client: discord.Client = discord.Client(intents=intents)
+    client: discord.Client = discord.Client(intents=intents, **universal.member_cache_options(intents))
     app: Server = Server(client=client)
 
+    @client.event
+    async def on_ready() -> None:
+        await app.on_client_ready()
+
+    @client.event
+    async def on_member_join(member: discord.Member) -> None:
+        app.members.forget(member.guild.id, member.id)
+
     asyncio.run(main(client))
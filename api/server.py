@@ -22,9 +22,12 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 import asyncio
+import inspect
 import json
 import logging
+import time
 import uuid
+from collections.abc import Callable
 from typing import Any
 
 import asyncpg
@@ -56,31 +59,108 @@ class Server(Starlette):
     def __init__(self, *, client: discord.Client) -> None:
         self.client = client
 
-        self.database: universal.Database | None = None
+        self.database: universal.DatabaseProtocol | None = None
+        self.members: universal.MemberCache = universal.MemberCache(
+            size=universal.CONFIG.get('DISCORD', {}).get('member_lru', 256)
+        )
 
         self.commit_queues: dict[str, asyncio.Queue] = {}
         self.team_feed_queues: dict[str, asyncio.Queue] = {}
 
+        self.loop_monitor: universal.LoopMonitor = universal.LoopMonitor(
+            threshold=universal.CONFIG['SERVER'].get('lag_threshold', 0.1)
+        )
+
+        self.metrics: universal.MetricsRegistry = universal.MetricsRegistry()
+        self.webhooks: universal.Counter = self.metrics.counter(
+            'codejam_github_webhooks_total', 'GitHub webhooks received, by response status.', labels=('status',)
+        )
+        self.webhook_seconds: universal.Histogram = self.metrics.histogram(
+            'codejam_github_webhook_seconds', 'Time spent handling a GitHub webhook.'
+        )
+        self.feed_seconds: universal.Histogram = self.metrics.histogram(
+            'codejam_team_feed_seconds', 'Time spent building the team feed.', labels=('primary',)
+        )
+        self.feed_updates: universal.Counter = self.metrics.counter(
+            'codejam_team_feed_updates_total', 'Team feed updates requested by the bot, by response status.',
+            labels=('status',)
+        )
+        self.query_seconds: universal.Histogram = self.metrics.histogram(
+            'codejam_database_query_seconds', 'Time spent in database queries.', labels=('query',)
+        )
+        self.sse_events: universal.Counter = self.metrics.counter(
+            'codejam_sse_events_total', 'Events queued for SSE subscribers.', labels=('stream',)
+        )
+        self.sse_subscribers: universal.Gauge = self.metrics.gauge(
+            'codejam_sse_subscribers', 'Connected SSE subscribers.', labels=('stream',)
+        )
+        self.sse_queued: universal.Gauge = self.metrics.gauge(
+            'codejam_sse_queued_events', 'Events waiting to be sent to SSE subscribers.', labels=('stream',)
+        )
+        self.loop_lag: universal.Gauge = self.metrics.gauge(
+            'codejam_event_loop_lag_seconds', 'Event loop scheduling lag over the recent samples.', labels=('quantile',)
+        )
+        self.loop_stalls: universal.Gauge = self.metrics.gauge(
+            'codejam_event_loop_stalls', 'Event loop stalls past the lag threshold since starting.'
+        )
+
         routes: list[Route] = [
             Route('/api/github/commit_feed', self.event_commit, methods=['GET']),
             Route('/api/github/{team_id:int}/{team_token:str}', self.receive_github, methods=['POST']),
             Route('/api/teams/feed', self.team_feed, methods=['GET']),
             Route('/api/teams/update', self.receive_team_feed_update, methods=['POST']),
             Route('/api/teams/feed_event', self.event_team_feed, methods=['GET']),
+            Route('/api/teams/summary', self.team_summary, methods=['GET']),
+            Route('/api/metrics', self.serve_metrics, methods=['GET']),
+            Route('/api/profile', self.profile, methods=['POST']),
         ]
 
+        # Opt in, to capture traffic for benchmarks/replay.py...
+        self.recorder: universal.TrafficRecorder = universal.TrafficRecorder(
+            universal.CONFIG['SERVER'].get('record_path', ''),
+            max_bytes=universal.CONFIG['SERVER'].get('record_max_bytes', 0)
+        )
+
+        self.profiler: universal.SamplingProfiler = universal.SamplingProfiler(
+            directory=universal.CONFIG['SERVER'].get('profile_directory', 'profiles')
+        )
+
+        # The code a route runs, for scoped profiles. SSE routes do their work in their publisher...
+        self.profile_scopes: dict[str, list[Callable[..., Any]]] = {route.path: [route.endpoint] for route in routes}
+        self.profile_scopes['/api/github/commit_feed'].append(self.publisher_commit)
+        self.profile_scopes['/api/teams/feed_event'].append(self.publisher_team_feed)
+
         super().__init__(
             debug=universal.CONFIG['SERVER']['debug'],
             routes=routes,
             middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
-            on_startup=[self.on_ready]
+            on_startup=[self.on_ready],
+            on_shutdown=[self.on_close]
         )
 
     async def on_ready(self) -> None:
-        self.database = await universal.Database.setup()
+        self.database = await universal.setup_database()
+
+        # uvicorn and the discord client share this loop, so a stall in either delays both...
+        self.loop_monitor.start()
+        self.recorder.start()
 
         logger.info('Successfully started API Server.')
 
+    async def on_close(self) -> None:
+        await self.recorder.close()
+
+    async def on_client_ready(self) -> None:
+        # The guild is not chunked at login, so only registered participants are brought into the member cache...
+        guild: discord.Guild = self.client.get_guild(TIMEENJOYED_SERVER)
+        if guild is not None and self.database is not None:
+            with self.query_seconds.time(query='fetch_members'):
+                members: list[asyncpg.Record] = await self.database.fetch_members()
+
+            await self.members.ensure(guild, [member['member_id'] for member in members])
+
+        logger.info(universal.ready_report(self.client))
+
     async def publisher_commit(self, request: Request, id_: str, /) -> dict[str, Any]:
         queue: asyncio.Queue = self.commit_queues[id_]
 
@@ -102,11 +182,97 @@ class Server(Starlette):
         self.commit_queues[id_] = asyncio.Queue()
         return EventSourceResponse(self.publisher_commit(request, id_))
 
+    def authorized(self, request: Request, /) -> bool:
+        """Whether the request carries the backend token."""
+        auth: str = request.headers.get('authorization', None)
+        if not auth:
+            return False
+
+        return auth == universal.CONFIG['TOKENS']['backend']
+
+    async def serve_metrics(self, request: Request) -> Response:
+        if not self.authorized(request):
+            return Response(status_code=401)
+
+        # Gauges describing the queues are read when scraped...
+        streams: dict[str, dict[str, asyncio.Queue]] = {
+            'commit': self.commit_queues,
+            'team_feed': self.team_feed_queues
+        }
+
+        for stream, queues in streams.items():
+            self.sse_subscribers.set(len(queues), stream=stream)
+            self.sse_queued.set(sum(queue.qsize() for queue in queues.values()), stream=stream)
+
+        for quantile, lag in zip(('0.5', '0.95', '0.99'), self.loop_monitor.percentiles(50, 95, 99)):
+            self.loop_lag.set(lag, quantile=quantile)
+
+        self.loop_stalls.set(self.loop_monitor.stalls)
+
+        return Response(self.metrics.render(), status_code=200, media_type=universal.PROMETHEUS_CONTENT_TYPE)
+
+    async def profile(self, request: Request) -> JSONResponse | Response:
+        """Profile the server for ?seconds= (default 30), optionally only the comma separated ?routes=.
+
+        Needs the admin token (TOKENS.admin) in the Authorization header. Responds once the profile is written.
+        """
+        admin: str = universal.CONFIG['TOKENS'].get('admin', '')
+        if not admin or request.headers.get('authorization', None) != admin:
+            return Response(status_code=401)
+
+        try:
+            seconds: float = float(request.query_params.get('seconds', 30))
+        except ValueError:
+            return JSONResponse({'error': 'seconds must be a number.'}, status_code=400)
+
+        paths: list[str] = [p for p in request.query_params.get('routes', '').split(',') if p]
+        unknown: list[str] = [p for p in paths if p not in self.profile_scopes]
+        if unknown:
+            return JSONResponse({'error': f'Unknown routes: {", ".join(unknown)}'}, status_code=400)
+
+        scope: list[Any] = [inspect.unwrap(f).__code__ for p in paths for f in self.profile_scopes[p]]
+
+        try:
+            profile: universal.Profile = await self.profiler.profile(seconds, name='api', scope=scope)
+        except RuntimeError as e:
+            return JSONResponse({'error': str(e)}, status_code=409)
+
+        data: dict[str, Any] = {'path': str(profile.path), 'samples': profile.samples, 'kept': profile.kept}
+        return JSONResponse(data, status_code=200)
+
     async def receive_github(self, request: Request) -> Response:
+        at: float = time.time()
+
+        # A webhook which raises (E.g. a malformed body) is answered with a 500 by starlette, and counted as one...
+        status: int = 500
+
+        try:
+            with self.webhook_seconds.time():
+                response: Response = await self.handle_github(request)
+
+            status = response.status_code
+            return response
+        finally:
+            self.webhooks.inc(status=status)
+
+            if self.recorder.enabled:
+                await self.record_github(request, at=at, status=status)
+
+    async def record_github(self, request: Request, /, *, at: float, status: int) -> None:
+        try:
+            body: bytes = await request.body()
+        except Exception:
+            # The client went away before sending the whole body...
+            body = b''
+
+        self.recorder.record('github', at=at, status=status, team=request.path_params['team_id'], body=body)
+
+    async def handle_github(self, request: Request) -> Response:
         id_: int = request.path_params['team_id']
         token: str = request.path_params['team_token']
 
-        team: list[asyncpg.Record] = await self.database.fetch_team(team_id=int(id_))
+        with self.query_seconds.time(query='fetch_team'):
+            team: list[asyncpg.Record] = await self.database.fetch_team(team_id=int(id_))
         if not team:
             return Response(status_code=404)
 
@@ -135,11 +301,33 @@ class Server(Starlette):
         for queue in self.commit_queues.values():
             await queue.put(to_send)
 
+        self.sse_events.inc(len(self.commit_queues), stream='commit')
+
         return Response(status_code=200)
 
-    async def get_team_feed(self) -> dict[str | None, list[dict[str, str]]]:
+    async def get_team_feed(
+            self,
+            *,
+            primary: bool = False,
+            refresh: bool = False
+    ) -> dict[str | None, list[dict[str, str]]]:
+        with self.feed_seconds.time(primary=str(primary).lower()):
+            return await self.build_team_feed(primary=primary, refresh=refresh)
+
+    async def build_team_feed(
+            self,
+            *,
+            primary: bool = False,
+            refresh: bool = False
+    ) -> dict[str | None, list[dict[str, str]]]:
         guild: discord.Guild = self.client.get_guild(TIMEENJOYED_SERVER)
-        members: list[asyncpg.Record] = await self.database.fetch_members()
+
+        with self.query_seconds.time(query='fetch_members'):
+            members: list[asyncpg.Record] = await self.database.fetch_members(primary=primary)
+
+        if refresh:
+            # Members who registered since we started are not cached yet. Only they are requested...
+            await self.members.ensure(guild, [member['member_id'] for member in members])
 
         data: dict[str | None, list[dict[str, str]]] = {}
         for member in members:
@@ -169,6 +357,30 @@ class Server(Starlette):
 
         return JSONResponse(data, status_code=200)
 
+    async def team_summary(self, request: Request) -> JSONResponse:
+        with self.query_seconds.time(query='fetch_team_summaries'):
+            summaries: list[asyncpg.Record] = await self.database.fetch_team_summaries()
+
+        data: list[dict[str, Any]] = []
+        for summary in summaries:
+            timezones: list[float] | None = None
+            if summary['min_timezone'] is not None:
+                timezones = [
+                    summary['min_timezone'].total_seconds() / (60 * 60),
+                    summary['max_timezone'].total_seconds() / (60 * 60)
+                ]
+
+            data.append({
+                'name': escape(summary['name']),
+                'members': summary['member_count'],
+                'solo': summary['solo_count'],
+                'languages': summary['languages'],
+                'timezones': timezones,
+                'all_solo': summary['all_solo']
+            })
+
+        return JSONResponse(data, status_code=200)
+
     async def event_team_feed(self, request: Request) -> EventSourceResponse:
         id_: str = str(uuid.uuid4())
 
@@ -194,17 +406,20 @@ class Server(Starlette):
         del self.team_feed_queues[id_]
 
     async def receive_team_feed_update(self, request: Request) -> Response:
-        auth: str = request.headers.get('authorization', None)
-        if not auth:
-            return Response(status_code=401)
+        at: float = time.time()
 
-        secret: str = universal.CONFIG['TOKENS']['backend']
-        if secret != auth:
+        if not self.authorized(request):
+            self.feed_updates.inc(status=401)
+            self.recorder.record('update', at=at, status=401)
             return Response(status_code=401)
 
-        data: dict[str | None, list[dict[str, str]]] = await self.get_team_feed()
+        # The bot has just written to the database, so a lagging replica could send out a stale feed...
+        data: dict[str | None, list[dict[str, str]]] = await self.get_team_feed(primary=True, refresh=True)
 
         for queue in self.team_feed_queues.values():
             await queue.put(data)
 
+        self.sse_events.inc(len(self.team_feed_queues), stream='team_feed')
+        self.feed_updates.inc(status=200)
+        self.recorder.record('update', at=at, status=200)
         return Response(status_code=200)
@@ -0,0 +1,349 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import argparse
+import asyncio
+import json
+import pathlib
+import random
+import sys
+from collections.abc import Iterator
+from typing import Any
+
+import asyncpg
+
+import universal
+from bot.core.utils import timezones
+
+
+# Relative popularity of each language in bot/core/utils.py. Members who pick "No Preference" pick nothing else...
+LANGUAGE_WEIGHTS: dict[int, float] = {
+    0: 6, 1: 30, 2: 22, 3: 12, 4: 10, 5: 3, 6: 12, 7: 6, 8: 10, 9: 7, 10: 5, 11: 2, 12: 3, 13: 4, 14: 1, 15: 1,
+    16: 2, 17: 3, 18: 3
+}
+
+# How many languages a member picks...
+LANGUAGE_COUNTS: dict[int, float] = {1: 30, 2: 30, 3: 22, 4: 12, 5: 6}
+
+# Members cluster around the Americas, Europe and East Asia, keyed as in bot/core/utils.py...
+TIMEZONE_WEIGHTS: dict[int, float] = {
+    2: 1, 3: 1, 4: 10, 5: 5, 6: 8, 7: 14, 8: 4, 9: 4, 12: 6, 13: 14, 14: 6, 15: 5, 16: 1, 17: 3, 18: 1, 19: 3,
+    20: 6, 21: 2, 22: 3, 24: 1
+}
+
+# Team sizes, including the owner...
+TEAM_SIZES: dict[int, float] = {1: 8, 2: 22, 3: 30, 4: 25, 5: 15}
+
+# The share of members who prefer to work alone, and never join a team...
+SOLO_RATIO: float = 0.2
+
+# The share of members with their own avatar, the rest have one of the Discord defaults...
+CUSTOM_AVATAR_RATIO: float = 0.7
+
+# Pushes arrive at random, but a push is often followed by another from the same team soon after...
+BURST_RATIO: float = 0.35
+
+# How many commits a push carries: 1 + a geometric number with this mean...
+EXTRA_COMMITS: float = 1.5
+
+TEAM_COLUMNS: list[str] = [
+    'event_id', 'team_id', 'token', 'invite', 'name', 'owner', 'role_id', 'text_id', 'voice_id', 'github'
+]
+MEMBER_COLUMNS: list[str] = ['event_id', 'member_id', 'languages', 'timezone', 'solo', 'team_id']
+
+# Words for names, with a few characters that need escaping in the feeds...
+ADJECTIVES: tuple[str, ...] = (
+    'Sleepy', 'Null', 'Async', 'Pixel', 'Quantum', 'Lazy', 'Rusty', 'Tiny', 'Cosmic', 'Electric', '<Broken>',
+    'Recursive', 'Hungry', 'Infinite', 'Silent', 'Turbo', 'Green', 'Mutable', 'Static', 'Retro'
+)
+NOUNS: tuple[str, ...] = (
+    'Pythons', 'Pointers', 'Ducks', 'Lambdas', 'Goblins', 'Sprites', 'Threads', 'Bytes & Bits', 'Coroutines',
+    'Wizards', 'Owls', 'Stacks', 'Packets', 'Crabs', '"Hackers"', 'Gophers', 'Kernels', 'Pandas', 'Llamas', 'Nodes'
+)
+HANDLES: tuple[str, ...] = (
+    'pixel', 'byte', 'duck', 'owl', 'crab', 'gopher', 'panda', 'llama', 'kernel', 'lambda', 'sprite', 'wizard',
+    'goblin', 'thread', 'packet', 'node', 'comet', 'nova', 'echo', 'ember'
+)
+COMMIT_MESSAGES: tuple[str, ...] = (
+    'Initial commit', 'Fix typo in README', 'Add player movement', 'Refactor the <Game> class', 'WIP',
+    'Merge branch \'main\' of github.com:team/jam', 'Fix collision bug & clean up', 'Add "start" menu',
+    'Update dependencies', 'Add sound effects', 'Remove debug prints', 'Tweak difficulty', 'Fix crash on exit',
+    'Add tests', 'Format code', 'Final submission :tada:'
+)
+
+
+def weighted_sample(weights: dict[int, float], count: int, /, *, rng: random.Random) -> list[int]:
+    """Pick count distinct keys, each with probability proportional to its weight."""
+    # Efraimidis and Spirakis: the keys with the largest random ** (1 / weight)...
+    keyed: list[tuple[float, int]] = [(rng.random() ** (1 / weight), key) for key, weight in weights.items()]
+    return [key for _, key in sorted(keyed, reverse=True)[:count]]
+
+
+def weighted_choice(weights: dict[int, float], /, *, rng: random.Random) -> int:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+class Jam:
+    """A reproducible synthetic jam: members, teams and the Discord and GitHub profiles behind them.
+
+    The same sizes and seed always give the same jam, so benchmarks and staging runs can share datasets.
+
+    Parameters
+    ----------
+    members: int
+        The amount of members.
+    teams: int
+        The amount of teams. Each team is owned by a different member.
+    rng: random.Random
+        Seeded random generator. Everything is drawn from it in a fixed order.
+    solo_ratio: float
+        The share of members who prefer to work alone.
+    event: int
+        The event the rows belong to.
+    """
+
+    def __init__(
+            self,
+            *,
+            members: int,
+            teams: int,
+            rng: random.Random,
+            solo_ratio: float = SOLO_RATIO,
+            event: int = universal.EVENT
+    ) -> None:
+        if not 0 <= teams <= members:
+            raise ValueError('A jam needs a member to own each team.')
+
+        self.event = event
+        self.rng = rng
+
+        member_ids: list[int] = rng.sample(range(10 ** 17, 10 ** 18), members)
+        team_ids: list[int] = rng.sample(range(1, 2 ** 32), teams)
+        solo: list[bool] = [rng.random() < solo_ratio for _ in member_ids]
+
+        # Owners are picked from the members open to teams first...
+        candidates: list[int] = [i for i in range(members) if not solo[i]] + [i for i in range(members) if solo[i]]
+        owners: list[int] = candidates[:teams]
+        joining: list[int] = [i for i in candidates[teams:] if not solo[i]]
+        rng.shuffle(joining)
+
+        team_of: dict[int, int] = {}
+        for team_id, owner in zip(team_ids, owners):
+            solo[owner] = False
+            team_of[owner] = team_id
+
+            for _ in range(weighted_choice(TEAM_SIZES, rng=rng) - 1):
+                if not joining:
+                    break
+
+                team_of[joining.pop()] = team_id
+
+        # Every member who is left stays without a team, looking for one...
+        self.profiles: list[dict[str, Any]] = [self._profile(member_id) for member_id in member_ids]
+        self._profiles: dict[int, dict[str, Any]] = {profile['id']: profile for profile in self.profiles}
+
+        self.members: list[tuple[Any, ...]] = []
+        for index, member_id in enumerate(member_ids):
+            count: int = weighted_choice(LANGUAGE_COUNTS, rng=rng)
+            picked: list[int] = weighted_sample(LANGUAGE_WEIGHTS, count, rng=rng)
+
+            self.members.append((
+                event,
+                member_id,
+                [0] if 0 in picked else picked,
+                timezones[weighted_choice(TIMEZONE_WEIGHTS, rng=rng)]['delta'],
+                solo[index],
+                team_of.get(index)
+            ))
+
+        self.teams: list[tuple[Any, ...]] = []
+        for index, (team_id, owner) in enumerate(zip(team_ids, owners)):
+            snowflake: int = 10 ** 18 + index * 3
+            name: str = f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {index}'
+            github: str | None = None
+
+            if rng.random() < 0.8:
+                github = f'https://github.com/{self.profiles[owner]["github"]}/jam-{team_id:x}'
+
+            self.teams.append((
+                event,
+                team_id,
+                f'token-{team_id}',
+                f'inv{team_id:x}',
+                name,
+                member_ids[owner],
+                snowflake,
+                snowflake + 1,
+                snowflake + 2,
+                github
+            ))
+
+        self.rosters: dict[int, list[int]] = {team[1]: [] for team in self.teams}
+        for member in self.members:
+            if member[5] is not None:
+                self.rosters[member[5]].append(member[1])
+
+    def _profile(self, member_id: int, /) -> dict[str, Any]:
+        """The Discord and GitHub profile stub of a member."""
+        rng: random.Random = self.rng
+        name: str = f'{rng.choice(HANDLES)}_{rng.choice(HANDLES)}{member_id % 1000}'
+
+        if rng.random() < CUSTOM_AVATAR_RATIO:
+            avatar: str = f'https://cdn.discordapp.com/avatars/{member_id}/{rng.getrandbits(128):032x}.png'
+        else:
+            avatar = f'https://cdn.discordapp.com/embed/avatars/{(member_id >> 22) % 6}.png'
+
+        return {
+            'id': member_id,
+            'name': name,
+            'display_name': name.replace('_', ' ').title(),
+            'avatar_url': avatar,
+            'github': name.replace('_', '-'),
+            'github_avatar_url': f'https://avatars.githubusercontent.com/u/{member_id % 10 ** 8}'
+        }
+
+    @property
+    def member_ids(self) -> list[int]:
+        return [member[1] for member in self.members]
+
+    def profile(self, member_id: int, /) -> dict[str, Any]:
+        return self._profiles[member_id]
+
+    def push(self, team: tuple[Any, ...], /, *, rng: random.Random) -> dict[str, Any]:
+        """A GitHub push webhook payload from a member of the team."""
+        roster: list[int] = self.rosters[team[1]] or [team[5]]
+        sender: dict[str, Any] = self.profile(rng.choice(roster))
+
+        commits: list[dict[str, Any]] = []
+        for _ in range(1 + int(rng.expovariate(1 / EXTRA_COMMITS))):
+            author: dict[str, Any] = self.profile(rng.choice(roster))
+            commits.append({'author': {'name': author['display_name']}, 'message': rng.choice(COMMIT_MESSAGES)})
+
+        return {
+            'repository': {'html_url': team[9]},
+            'sender': {'login': sender['github'], 'avatar_url': sender['github_avatar_url']},
+            'commits': commits
+        }
+
+    def pushes(self, count: int, /, *, rate: float, rng: random.Random) -> Iterator[dict[str, Any]]:
+        """A stream of push webhooks, arriving at about rate per second, with bursts from busy teams.
+
+        Each item has the time it is due (in seconds from the start), the team to send it to and the payload.
+        """
+        if not self.teams:
+            return
+
+        # Some teams push far more than others...
+        activity: list[float] = [rng.paretovariate(1.5) for _ in self.teams]
+        at: float = 0.0
+        team: tuple[Any, ...] = self.teams[0]
+
+        for index in range(count):
+            if index and rng.random() < BURST_RATIO:
+                at += rng.expovariate(rate * 10)
+            else:
+                at += rng.expovariate(rate)
+                team = rng.choices(self.teams, weights=activity)[0]
+
+            yield {'at': round(at, 6), 'team_id': team[1], 'token': team[2], 'payload': self.push(team, rng=rng)}
+
+
+async def prepare(connection: asyncpg.Connection, schema: str, /) -> None:
+    """Drop and recreate the schema, with every table of SCHEMA.sql and the partitions of the current event."""
+    await connection.execute(f'DROP SCHEMA IF EXISTS {schema} CASCADE')
+    await connection.execute(f'CREATE SCHEMA {schema}')
+    await connection.execute(f'SET search_path TO {schema}')
+
+    with open('SCHEMA.sql', 'r') as fp:
+        await connection.execute(fp.read())
+
+    await universal.Database._create_partitions(connection, universal.EVENT)
+
+
+async def write(connection: asyncpg.Connection, jam: Jam, /) -> None:
+    """COPY the teams and members of the jam into the tables on the search path."""
+    await connection.copy_records_to_table('teams', records=jam.teams, columns=TEAM_COLUMNS)
+    await connection.copy_records_to_table('members', records=jam.members, columns=MEMBER_COLUMNS)
+
+
+def dump(path: pathlib.Path, items: Iterator[dict[str, Any]], /) -> int:
+    """Write the items as JSON lines, returning how many were written."""
+    written: int = 0
+
+    with path.open('w') as fp:
+        for item in items:
+            fp.write(json.dumps(item) + '\n')
+            written += 1
+
+    return written
+
+
+async def run(args: argparse.Namespace) -> int:
+    rng: random.Random = random.Random(args.seed)
+    jam: Jam = Jam(members=args.members, teams=args.teams, rng=rng, solo_ratio=args.solo_ratio)
+
+    teamed: int = sum(member[5] is not None for member in jam.members)
+    print(f'Generated {len(jam.members)} members ({teamed} in teams) and {len(jam.teams)} teams.')
+
+    if not args.skip_database:
+        connection: asyncpg.Connection = await asyncpg.connect(args.dsn)
+
+        try:
+            async with connection.transaction():
+                await prepare(connection, args.schema)
+                await write(connection, jam)
+
+            await connection.execute('ANALYZE')
+        finally:
+            await connection.close()
+
+        print(f'Written into schema "{args.schema}".')
+
+    if args.out:
+        args.out.mkdir(parents=True, exist_ok=True)
+
+        profiles: int = dump(args.out / 'profiles.jsonl', iter(jam.profiles))
+        pushes: int = dump(args.out / 'pushes.jsonl', jam.pushes(args.pushes, rate=args.rate, rng=rng))
+        print(f'Written {profiles} profiles and {pushes} pushes to {args.out}.')
+
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Generate a reproducible synthetic jam, with webhook traffic.')
+    parser.add_argument('--dsn', default=universal.CONFIG['DATABASE']['dsn'], help='The Postgres to write into.')
+    parser.add_argument('--schema', default='synthetic_jam', help='Dropped and recreated, then filled.')
+    parser.add_argument('--members', type=int, default=5_000)
+    parser.add_argument('--teams', type=int, default=1_000)
+    parser.add_argument('--solo-ratio', type=float, default=SOLO_RATIO)
+    parser.add_argument('--seed', type=int, default=2023)
+    parser.add_argument('--out', type=pathlib.Path, help='Write profiles.jsonl and pushes.jsonl to this directory.')
+    parser.add_argument('--pushes', type=int, default=10_000, help='Push webhooks to write to pushes.jsonl.')
+    parser.add_argument('--rate', type=float, default=20.0, help='The average pushes per second.')
+    parser.add_argument('--skip-database', action='store_true', help='Only write the files.')
+
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == '__main__':
+    main()
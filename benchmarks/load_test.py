@@ -0,0 +1,388 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import subprocess
+import sys
+import time
+import urllib.parse
+from typing import Any
+
+import aiohttp
+import asyncpg
+
+import universal
+
+from .jam import Jam
+from .query_plans import BENCH_SCHEMA, seed
+
+
+# The avatars Discord gives to members without one, so the feed has realistic URLs...
+DEFAULT_AVATAR: str = 'https://cdn.discordapp.com/embed/avatars/{index}.png'
+
+
+class StubAvatar:
+
+    def __init__(self, url: str, /) -> None:
+        self.url = url
+
+
+class StubMember:
+    """A synthetic guild member, with the attributes the team feed reads."""
+
+    def __init__(self, member_id: int, /, profile: dict[str, Any] | None = None) -> None:
+        self.id = member_id
+
+        if profile:
+            self.display_name = profile['display_name']
+            self.display_avatar = StubAvatar(profile['avatar_url'])
+        else:
+            self.display_name = f'Member {member_id % 100_000}'
+            self.display_avatar = StubAvatar(DEFAULT_AVATAR.format(index=member_id % 6))
+
+
+class StubGuild:
+    """A guild in which every member exists and is cached, so no Discord calls are made."""
+
+    def __init__(self, guild_id: int, /, profiles: dict[int, dict[str, Any]] | None = None) -> None:
+        self.id = guild_id
+        self._members: dict[int, StubMember] = {}
+        self._profiles: dict[int, dict[str, Any]] = profiles or {}
+
+    def get_member(self, member_id: int, /) -> StubMember:
+        try:
+            return self._members[member_id]
+        except KeyError:
+            self._members[member_id] = StubMember(member_id, self._profiles.get(member_id))
+            return self._members[member_id]
+
+    async def query_members(self, *, user_ids: list[int], limit: int, cache: bool) -> list[StubMember]:
+        return [self.get_member(member_id) for member_id in user_ids]
+
+
+class StubClient:
+    """Stands in for the discord.Client of the API server. It is always ready, and has a single guild.
+
+    Members get the names and avatars of the given profile stubs (see benchmarks/jam.py), or synthetic ones.
+    """
+
+    def __init__(self, profiles: list[dict[str, Any]] | None = None) -> None:
+        self.guild: StubGuild = StubGuild(0, {profile['id']: profile for profile in profiles or []})
+        self.guilds: list[StubGuild] = [self.guild]
+
+    def get_guild(self, guild_id: int, /) -> StubGuild:
+        return self.guild
+
+    async def wait_until_ready(self) -> None:
+        return
+
+
+def bench_dsn(dsn: str, /) -> str:
+    """The dsn, with every connection using the bench schema. asyncpg passes unknown dsn parameters as settings."""
+    parts: urllib.parse.SplitResult = urllib.parse.urlsplit(dsn)
+    query: str = urllib.parse.urlencode([*urllib.parse.parse_qsl(parts.query), ('search_path', BENCH_SCHEMA)])
+
+    return urllib.parse.urlunsplit(parts._replace(query=query))
+
+
+async def serve(args: argparse.Namespace) -> None:
+    """Run the API server with a stub Discord client. Started as a subprocess by the load test."""
+    import uvicorn
+
+    from api.server import Server
+
+    universal.CONFIG['DATABASE'].update(backend='postgres', dsn=bench_dsn(args.dsn), replicas=[])
+    universal.CONFIG['TOKENS']['backend'] = args.token
+    universal.CONFIG['SERVER']['debug'] = False
+
+    # The same jam the load test seeded, so members get its profiles...
+    jam: Jam = Jam(members=args.members, teams=args.teams, rng=random.Random(args.seed))
+    app: Server = Server(client=StubClient(jam.profiles))  # type: ignore
+    config = uvicorn.Config(app, host='127.0.0.1', port=args.port, log_level='warning', backlog=4096)
+
+    await uvicorn.Server(config).serve()
+
+
+class ProcessStats:
+    """Reads the memory and CPU time of a process from /proc (Linux only)."""
+
+    def __init__(self, pid: int, /) -> None:
+        self.pid = pid
+        self.ticks: int = os.sysconf('SC_CLK_TCK')
+
+    def rss(self) -> int:
+        """The resident memory in bytes."""
+        with open(f'/proc/{self.pid}/status') as fp:
+            for line in fp:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+
+        return 0
+
+    def cpu(self) -> float:
+        """The user and system CPU time in seconds."""
+        with open(f'/proc/{self.pid}/stat') as fp:
+            # The command name may contain spaces, so the fields are counted from after it...
+            fields: list[str] = fp.read().rsplit(')', 1)[1].split()
+
+        return (int(fields[11]) + int(fields[12])) / self.ticks
+
+
+class Subscriber:
+    """A single SSE connection, recording when each event arrived."""
+
+    def __init__(self, stream: str, /) -> None:
+        self.stream = stream
+        self.events: list[tuple[float, str]] = []
+        self.connected: asyncio.Event = asyncio.Event()
+
+    async def run(self, session: aiohttp.ClientSession, url: str, /) -> None:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=None)) as resp:
+            self.connected.set()
+            data: list[str] = []
+
+            async for raw in resp.content:
+                line: str = raw.decode().rstrip('\r\n')
+
+                if line.startswith('data:'):
+                    data.append(line[5:].lstrip())
+                elif not line and data:
+                    self.events.append((time.perf_counter(), '\n'.join(data)))
+                    data = []
+
+
+def percentiles(samples: list[float], /) -> str:
+    if not samples:
+        return 'no samples'
+
+    ordered: list[float] = sorted(samples)
+    p50, p95, p99 = (ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in (50, 95, 99))
+
+    return f'p50 {p50 * 1000:.1f}ms | p95 {p95 * 1000:.1f}ms | p99 {p99 * 1000:.1f}ms | max {ordered[-1] * 1000:.1f}ms'
+
+
+async def wait_for_server(session: aiohttp.ClientSession, base: str, process: subprocess.Popen, /) -> None:
+    for _ in range(300):
+        if process.poll() is not None:
+            raise RuntimeError('The API server exited while starting.')
+
+        try:
+            async with session.get(f'{base}/api/teams/summary') as resp:
+                if resp.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+
+        await asyncio.sleep(0.1)
+
+    raise RuntimeError('The API server did not start in time.')
+
+
+async def connect(
+        session: aiohttp.ClientSession,
+        url: str,
+        stream: str,
+        count: int,
+        tasks: list[asyncio.Task],
+        /
+) -> list[Subscriber]:
+    subscribers: list[Subscriber] = [Subscriber(stream) for _ in range(count)]
+
+    for subscriber in subscribers:
+        tasks.append(asyncio.create_task(subscriber.run(session, url)))
+
+    await asyncio.gather(*(s.connected.wait() for s in subscribers))
+    return subscribers
+
+
+async def commit_burst(
+        session: aiohttp.ClientSession,
+        base: str,
+        jam: Jam,
+        count: int,
+        rng: random.Random,
+        /
+) -> int:
+    """Fire webhooks concurrently. The send time is carried in the commit message, to measure delivery latency."""
+    async def webhook(sequence: int) -> int:
+        team: tuple[Any, ...] = rng.choice(jam.teams)
+        payload: dict[str, Any] = jam.push(team, rng=rng)
+
+        commit: dict[str, Any] = payload['commits'][0]
+        commit['message'] = f'{sequence} {time.perf_counter()} {commit["message"]}'
+
+        async with session.post(f'{base}/api/github/{team[1]}/{team[2]}', json=payload) as resp:
+            return resp.status
+
+    statuses: list[int] = await asyncio.gather(*(webhook(sequence) for sequence in range(count)))
+    return sum(status == 200 for status in statuses)
+
+
+async def update_burst(session: aiohttp.ClientSession, base: str, token: str, count: int, /) -> list[float]:
+    """Send feed updates one after another, as the bot would. Returns when each was sent."""
+    sent: list[float] = []
+
+    for _ in range(count):
+        sent.append(time.perf_counter())
+
+        async with session.post(f'{base}/api/teams/update', headers={'Authorization': token}) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f'Feed update failed with status code: {resp.status}')
+
+    return sent
+
+
+async def run(args: argparse.Namespace) -> int:
+    rng: random.Random = random.Random(args.seed)
+
+    print(f'Seeding {args.members} members and {args.teams} teams into schema "{BENCH_SCHEMA}"...')
+    pool: asyncpg.Pool = await asyncpg.create_pool(args.dsn, server_settings={'search_path': BENCH_SCHEMA})
+    keys: dict[str, Any] = await seed(pool, members=args.members, teams=args.teams, rng=rng)
+    await pool.close()
+
+    token: str = secrets.token_hex(16)
+    base: str = f'http://127.0.0.1:{args.port}'
+    command: list[str] = [
+        sys.executable, '-m', 'benchmarks.load_test', '--serve', '--dsn', args.dsn, '--port', str(args.port),
+        '--token', token, '--members', str(args.members), '--teams', str(args.teams), '--seed', str(args.seed)
+    ]
+
+    process: subprocess.Popen = subprocess.Popen(command)
+    stats: ProcessStats = ProcessStats(process.pid)
+    tasks: list[asyncio.Task] = []
+
+    connector: aiohttp.TCPConnector = aiohttp.TCPConnector(limit=0)
+    session: aiohttp.ClientSession = aiohttp.ClientSession(connector=connector)
+
+    try:
+        await wait_for_server(session, base, process)
+        idle_rss: int = stats.rss()
+
+        print(f'Opening {args.feed_clients} team feed and {args.commit_clients} commit feed connections...')
+        start: float = time.perf_counter()
+        cpu: float = stats.cpu()
+
+        feed: list[Subscriber] = await connect(
+            session, f'{base}/api/teams/feed_event', 'feed', args.feed_clients, tasks
+        )
+        commits: list[Subscriber] = await connect(
+            session, f'{base}/api/github/commit_feed', 'commit', args.commit_clients, tasks
+        )
+
+        # Every team feed connection is sent the whole feed when it connects...
+        while sum(bool(s.events) for s in feed) < len(feed):
+            await asyncio.sleep(0.05)
+
+        connect_time: float = time.perf_counter() - start
+        connect_cpu: float = stats.cpu() - cpu
+        connected_rss: int = stats.rss()
+        connections: int = len(feed) + len(commits)
+
+        print(f'Firing {args.webhooks} webhooks and {args.updates} feed updates...')
+        for subscriber in feed:
+            subscriber.events.clear()
+
+        start = time.perf_counter()
+        cpu = stats.cpu()
+
+        accepted, sent = await asyncio.gather(
+            commit_burst(session, base, keys['jam'], args.webhooks, rng),
+            update_burst(session, base, token, args.updates)
+        )
+
+        # Wait for every connection to receive everything, or give up after the timeout...
+        deadline: float = time.perf_counter() + args.timeout
+        while time.perf_counter() < deadline:
+            if all(len(s.events) >= accepted for s in commits) and all(len(s.events) >= len(sent) for s in feed):
+                break
+
+            await asyncio.sleep(0.05)
+
+        burst_time: float = time.perf_counter() - start
+        burst_cpu: float = stats.cpu() - cpu
+    finally:
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await session.close()
+
+        process.terminate()
+        process.wait(timeout=10)
+
+    commit_latency: list[float] = []
+    for subscriber in commits:
+        for received, data in subscriber.events:
+            message: str = json.loads(data)['commits'][0]['message']
+            commit_latency.append(received - float(message.split()[1]))
+
+    # Updates are sent one after another, so the n-th event on a connection is the n-th update...
+    feed_latency: list[float] = [
+        received - sent[index] for s in feed for index, (received, _) in enumerate(s.events[:len(sent)])
+    ]
+
+    delivered: int = sum(len(s.events) for s in (*feed, *commits))
+    expected: int = len(feed) * len(sent) + len(commits) * accepted
+
+    print(f'\nConnections:      {connections} in {connect_time:.2f}s, CPU {connect_cpu / connect_time * 100:.0f}%')
+    print(f'Memory:           {idle_rss / 2 ** 20:.1f} MiB idle, {connected_rss / 2 ** 20:.1f} MiB connected, '
+          f'{(connected_rss - idle_rss) / max(1, connections) / 1024:.1f} KiB per connection')
+    print(f'Webhooks:         {accepted}/{args.webhooks} accepted')
+    print(f'Delivered:        {delivered}/{expected} events in {burst_time:.2f}s, '
+          f'{delivered / burst_time:.0f} events/s, CPU {burst_cpu / burst_time * 100:.0f}%')
+    print(f'Commit latency:   {percentiles(commit_latency)}')
+    print(f'Feed latency:     {percentiles(feed_latency)}')
+
+    return 0 if delivered == expected else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Load test the SSE feeds and webhooks of the API server.')
+    parser.add_argument('--dsn', default=universal.CONFIG['DATABASE']['dsn'], help='A local Postgres to seed.')
+    parser.add_argument('--port', type=int, default=2751)
+    parser.add_argument('--members', type=int, default=2_000)
+    parser.add_argument('--teams', type=int, default=400)
+    parser.add_argument('--feed-clients', type=int, default=1_000, help='Connections to /api/teams/feed_event.')
+    parser.add_argument('--commit-clients', type=int, default=1_000, help='Connections to /api/github/commit_feed.')
+    parser.add_argument('--webhooks', type=int, default=200, help='GitHub webhooks fired at once.')
+    parser.add_argument('--updates', type=int, default=10, help='Team feed updates sent one after another.')
+    parser.add_argument('--timeout', type=float, default=60.0, help='How long to wait for every event to arrive.')
+    parser.add_argument('--seed', type=int, default=2023)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--token', help=argparse.SUPPRESS)
+
+    args: argparse.Namespace = parser.parse_args()
+    if args.serve:
+        asyncio.run(serve(args))
+        return
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import argparse
+import io
+import logging
+import os
+import statistics
+import time
+from typing import TextIO
+
+from colorama import Fore, Back
+
+import universal
+from universal import logger as logger_
+
+
+class LegacyHandler(logging.Handler):
+    """The handler as it was before records were queued: a new Formatter and a print() per record."""
+
+    def __init__(self, level: int, stream: TextIO) -> None:
+        super().__init__(level=level)
+        self.stream = stream
+
+    def emit(self, record: logging.LogRecord) -> None:
+        colours: dict[str, str] = logger_.LEVEL_COLOURS[record.levelname]
+        name_back = Back.MAGENTA if record.name.startswith(logger_.OWN_LOGGERS) else Back.BLACK
+        name_fore = Fore.BLACK if record.name.startswith(logger_.OWN_LOGGERS) else Fore.WHITE
+
+        fmt: str = Back.BLACK + '[{asctime}] ' + Back.RESET + colours['highlight'] + Fore.BLACK + '[{levelname:<8}]' + \
+            name_back + name_fore + ' {name:<20}' + Back.RESET + colours['base'] + ': {message}'
+
+        formatter = logging.Formatter(fmt=fmt, datefmt='%Y-%m-%d %H:%M:%S', style='{')
+        print(formatter.format(record), file=self.stream)
+        self.flush()
+
+
+def open_sink(kind: str, /) -> TextIO:
+    if kind == 'devnull':
+        return open(os.devnull, 'w')
+
+    if kind == 'memory':
+        return io.StringIO()
+
+    # A real file, flushed on every write like a terminal or a service log...
+    return open(kind, 'w', buffering=1)
+
+
+def measure(handler: logging.Handler, records: int, /) -> list[float]:
+    """The time (in microseconds) the calling thread spent in handle() for each record."""
+    logger: logging.Logger = logging.getLogger('bot.benchmark')
+    timings: list[float] = []
+
+    for index in range(records):
+        record: logging.LogRecord = logger.makeRecord(
+            logger.name, logging.DEBUG, __file__, 0, 'Team %s updated by member %d', (f'team-{index}', index), None
+        )
+
+        start: float = time.perf_counter()
+        handler.handle(record)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+
+    return timings
+
+
+def report(name: str, timings: list[float], /, *, drain: float | None = None) -> None:
+    ordered: list[float] = sorted(timings)
+    p99: float = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+    line: str = f'{name:<8} {statistics.median(ordered):>10.2f} {statistics.fmean(ordered):>10.2f} {p99:>10.2f}'
+    if drain is not None:
+        line += f' {drain * 1000:>12.1f}'
+
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare the per-record cost of the legacy and queued log handlers.')
+    parser.add_argument('--records', type=int, default=20_000)
+    parser.add_argument(
+        '--sink',
+        default='devnull',
+        help="Where lines are written: 'devnull', 'memory' or a file path (line buffered, like a terminal)."
+    )
+    parser.add_argument('--colour', action='store_true', help='Write colour escapes from the queued handler too.')
+    args: argparse.Namespace = parser.parse_args()
+
+    logger_.COLOUR = args.colour
+
+    legacy: LegacyHandler = LegacyHandler(logging.DEBUG, open_sink(args.sink))
+    legacy_timings: list[float] = measure(legacy, args.records)
+
+    # A writer of its own, so the benchmark does not write to stdout...
+    handler: universal.Handler = universal.Handler(level=logging.DEBUG)
+    handler._writer = logger_._Writer(logger_.ConsoleSink(open_sink(args.sink)))
+
+    queued_timings: list[float] = measure(handler, args.records)
+
+    start: float = time.perf_counter()
+    handler.flush()
+    drain: float = time.perf_counter() - start
+
+    print(f'{args.records} records to {args.sink}, time spent in the calling thread per record (us):\n')
+    print(f'{"handler":<8} {"median":>10} {"mean":>10} {"p99":>10} {"drain (ms)":>12}')
+    report('legacy', legacy_timings)
+    report('queued', queued_timings, drain=drain)
+
+    handler._writer.close()
+
+
+if __name__ == '__main__':
+    main()
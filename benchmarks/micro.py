@@ -0,0 +1,315 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import argparse
+import asyncio
+import datetime
+import gc
+import json
+import logging
+import pathlib
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import asyncpg
+from starlette.requests import Request
+
+import universal
+
+from .jam import Jam
+from .load_test import StubClient
+from .query_plans import BENCH_SCHEMA, cases as database_cases, seed
+
+
+# Where the recorded timings and memory are kept, so regressions show up in review...
+BASELINE: pathlib.Path = pathlib.Path(__file__).parent / 'baselines' / 'micro.json'
+
+# The pinned synthetic event sizes, in members. There is a team for every 5 members...
+SIZES: tuple[int, ...] = (1_000, 10_000, 50_000)
+
+# Each timing repeat runs the case for at least this long (in seconds)...
+MIN_REPEAT_TIME: float = 0.2
+
+# Timing regressions smaller than this (in microseconds) are treated as noise...
+MIN_REGRESSION_US: float = 5.0
+
+
+class StubDatabase:
+    """Answers the reads of the API server from synthetic rows in memory, so only our own code is measured."""
+
+    def __init__(self, members: int, /, *, rng: random.Random) -> None:
+        jam: Jam = Jam(members=members, teams=max(1, members // 5), rng=rng)
+        names: dict[int, str] = {team[1]: team[4] for team in jam.teams}
+
+        self.members: list[dict[str, Any]] = []
+        rosters: dict[int, list[dict[str, Any]]] = {team_id: [] for team_id in names}
+
+        for _, member_id, languages, timezone, solo, team_id in jam.members:
+            row: dict[str, Any] = {
+                'member_id': member_id,
+                'languages': languages,
+                'timezone': timezone,
+                'solo': solo,
+                'name': names.get(team_id)
+            }
+
+            self.members.append(row)
+            if team_id is not None:
+                rosters[team_id].append(row)
+
+        # What the team_summary triggers would keep for each team...
+        self.summaries: list[dict[str, Any]] = []
+        for team in jam.teams:
+            rows: list[dict[str, Any]] = rosters[team[1]]
+            timezones: list[datetime.timedelta] = [m['timezone'] for m in rows]
+
+            self.summaries.append({
+                'name': team[4],
+                'member_count': len(rows),
+                'solo_count': sum(m['solo'] for m in rows),
+                'languages': sorted({language for m in rows for language in m['languages']}),
+                'min_timezone': min(timezones, default=None),
+                'max_timezone': max(timezones, default=None),
+                'all_solo': all(m['solo'] for m in rows)
+            })
+
+        self.team: dict[str, Any] = {'team_id': jam.teams[0][1], 'name': jam.teams[0][4], 'token': jam.teams[0][2]}
+
+    async def fetch_members(self, *, primary: bool = False) -> list[dict[str, Any]]:
+        return self.members
+
+    async def fetch_team_summaries(self, *, primary: bool = False) -> list[dict[str, Any]]:
+        return self.summaries
+
+    async def fetch_team(self, **kwargs: Any) -> list[dict[str, Any]]:
+        return [self.team]
+
+
+def github_request(commits: int, /, *, team: dict[str, Any]) -> Request:
+    """A GitHub push webhook request to the team with the given amount of commits, full of characters that need
+    escaping.
+    """
+    payload: dict[str, Any] = {
+        'sender': {'login': '<load> & "test"', 'avatar_url': 'https://avatars.githubusercontent.com/u/1'},
+        'commits': [
+            {'author': {'name': f'<author {index}>'}, 'message': f'Fix <b>bug</b> #{index} & "quote" it'}
+            for index in range(commits)
+        ]
+    }
+    body: bytes = json.dumps(payload).encode()
+
+    async def receive() -> dict[str, Any]:
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    scope: dict[str, Any] = {
+        'type': 'http',
+        'method': 'POST',
+        'path': f'/api/github/{team["team_id"]}/{team["token"]}',
+        'headers': [],
+        'query_string': b'',
+        'path_params': {'team_id': team['team_id'], 'team_token': team['token']}
+    }
+    return Request(scope, receive)
+
+
+def server_cases(members: int, /, *, rng: random.Random) -> dict[str, Callable[[], Awaitable[Any]]]:
+    """The API server hot paths, against synthetic rows of the given size."""
+    from api.server import Server
+
+    server: Server = Server(client=StubClient())  # type: ignore
+    server.database = StubDatabase(members, rng=rng)  # type: ignore
+
+    async def feed_json() -> str:
+        return json.dumps(await server.get_team_feed())
+
+    return {
+        'server.get_team_feed': server.get_team_feed,
+        'server.team_feed_json': feed_json,
+        'server.team_summary': lambda: server.team_summary(None)  # type: ignore
+    }
+
+
+def fixed_cases(*, rng: random.Random) -> dict[str, Callable[[], Awaitable[Any]]]:
+    """The hot paths which do not depend on the size of the event."""
+    from api.server import Server
+
+    server: Server = Server(client=StubClient())  # type: ignore
+    database: StubDatabase = StubDatabase(5, rng=rng)
+    server.database = database  # type: ignore
+    request: Request = github_request(20, team=database.team)
+
+    async def github() -> Any:
+        # The body is cached on the request after the first read, so this only measures our own handling...
+        return await server.receive_github(request)
+
+    formatter: universal.Formatter = universal.Formatter()
+    record: logging.LogRecord = logging.getLogger('bot.benchmark').makeRecord(
+        'bot.benchmark', logging.INFO, __file__, 0, 'Team %s updated by member %d', ('team', 1), None
+    )
+
+    async def plain() -> str:
+        return formatter.format(record)
+
+    async def colour() -> str:
+        return formatter.colour_format(record)
+
+    return {
+        'server.receive_github[20 commits]': github,
+        'formatter.format': plain,
+        'formatter.colour_format': colour
+    }
+
+
+async def measure(call: Callable[[], Awaitable[Any]], /, *, repeats: int) -> dict[str, float]:
+    """Time per operation (median of the repeats), then the peak memory and blocks of one operation."""
+    # Warm up, and find how many operations fill a repeat...
+    start: float = time.perf_counter()
+    await call()
+    once: float = max(time.perf_counter() - start, 1e-7)
+    loops: int = max(1, int(MIN_REPEAT_TIME / once))
+
+    timings: list[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            await call()
+
+        timings.append((time.perf_counter() - start) / loops)
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        before: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        baseline: int = tracemalloc.get_traced_memory()[0]
+
+        result: Any = await call()
+        peak: int = tracemalloc.get_traced_memory()[1] - baseline
+
+        after: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        del result
+    finally:
+        tracemalloc.stop()
+
+    # Blocks allocated by the operation and still alive when it returned, including its result...
+    blocks: int = sum(max(0, stat.count_diff) for stat in after.compare_to(before, 'lineno'))
+
+    return {'time_us': statistics.median(timings) * 1_000_000, 'peak_kib': peak / 1024, 'blocks': blocks}
+
+
+async def database_suite(dsn: str, members: int, /, *, rng: random.Random) -> dict[str, Callable[[], Awaitable[Any]]]:
+    """Every fetch method of universal.Database, against a seeded event of the given size."""
+    pool: asyncpg.Pool = await asyncpg.create_pool(dsn, server_settings={'search_path': BENCH_SCHEMA})
+    keys: dict[str, Any] = await seed(pool, members=members, teams=members // 5, rng=rng)
+
+    database: universal.Database = universal.Database()
+    database._pool = pool
+
+    calls: dict[str, Callable[[], Awaitable[Any]]] = database_cases(database, keys)
+    return {f'database.{name}': call for name, call in calls.items() if name.startswith('fetch')}
+
+
+async def run(args: argparse.Namespace) -> int:
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    sizes: list[int] = args.sizes or list(SIZES)
+
+    # Size independent...
+    for name, call in fixed_cases(rng=random.Random(args.seed)).items():
+        results.setdefault(name, {})['-'] = await measure(call, repeats=args.repeats)
+
+    for size in sizes:
+        print(f'Measuring {size} members...')
+
+        suite: dict[str, Callable[[], Awaitable[Any]]] = server_cases(size, rng=random.Random(args.seed))
+        if not args.skip_database:
+            suite.update(await database_suite(args.dsn, size, rng=random.Random(args.seed)))
+
+        for name, call in suite.items():
+            results.setdefault(name, {})[str(size)] = await measure(call, repeats=args.repeats)
+
+    if not args.skip_database:
+        connection: asyncpg.Connection = await asyncpg.connect(args.dsn)
+        await connection.execute(f'DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE')
+        await connection.close()
+
+    baseline: dict[str, dict[str, dict[str, float]]] = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    failures: list[str] = []
+
+    print(f'\n{"case":<36} {"size":>6} {"time (us)":>12} {"baseline":>12} {"peak (KiB)":>11} {"blocks":>8}')
+    for name, by_size in results.items():
+        for size, result in by_size.items():
+            previous: dict[str, float] | None = baseline.get(name, {}).get(size)
+            base: str = f'{previous["time_us"]:.2f}' if previous else '-'
+
+            print(
+                f'{name:<36} {size:>6} {result["time_us"]:>12.2f} {base:>12} '
+                f'{result["peak_kib"]:>11.1f} {result["blocks"]:>8}'
+            )
+
+            if not previous:
+                continue
+
+            limit: float = max(previous['time_us'] * (1 + args.threshold), previous['time_us'] + MIN_REGRESSION_US)
+            if result['time_us'] > limit:
+                failures.append(f'{name} [{size}]: {result["time_us"]:.2f}us regressed past {limit:.2f}us.')
+
+            memory: float = max(previous['peak_kib'] * (1 + args.threshold), previous['peak_kib'] + 1)
+            if result['peak_kib'] > memory:
+                failures.append(f'{name} [{size}]: peak {result["peak_kib"]:.1f}KiB grew past {memory:.1f}KiB.')
+
+    if args.update_baseline:
+        # Merged, so a run with --skip-database keeps the recorded database cases...
+        for name, by_size in results.items():
+            baseline.setdefault(name, {}).update(by_size)
+
+        BASELINE.parent.mkdir(exist_ok=True)
+        BASELINE.write_text(json.dumps(baseline, indent=4, sort_keys=True) + '\n')
+        print(f'\nBaseline written to {BASELINE}')
+
+    for failure in failures:
+        print(f'FAIL {failure}')
+
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Time and memory of the data hot paths, against stored baselines.')
+    parser.add_argument('--dsn', default=universal.CONFIG['DATABASE']['dsn'], help='A local Postgres to seed.')
+    parser.add_argument('--sizes', type=int, nargs='*', help=f'Members per event. Defaults to {SIZES}.')
+    parser.add_argument('--repeats', type=int, default=5, help='Timing repeats per case. The median is kept.')
+    parser.add_argument('--seed', type=int, default=2023)
+    parser.add_argument('--threshold', type=float, default=0.5, help='Allowed slowdown. 0.5 = 50%% slower.')
+    parser.add_argument('--skip-database', action='store_true', help='Only measure the cases without Postgres.')
+    parser.add_argument('--update-baseline', action='store_true')
+
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import pathlib
+import random
+import statistics
+import sys
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import asyncpg
+
+import universal
+
+from .jam import Jam, prepare, write
+
+
+# Where the recorded plan shapes and timings are kept, so regressions show up in review...
+BASELINE: pathlib.Path = pathlib.Path(__file__).parent / 'baselines' / 'query_plans.json'
+
+# All tables are created in this schema, so we never touch real data...
+BENCH_SCHEMA: str = 'query_plan_bench'
+
+# Queries that read whole tables by design...
+SEQ_SCAN_ALLOWED: set[str] = {'fetch_members', 'fetch_teams', 'fetch_team_summaries'}
+
+# Timing regressions smaller than this (in ms) are treated as noise...
+MIN_REGRESSION_MS: float = 0.5
+
+
+class ExplainConnection:
+    """Stands in for an asyncpg connection, running every query with EXPLAIN (ANALYZE, BUFFERS).
+
+    Each query is run in a transaction which is rolled back, so writes do not change the seeded data.
+    """
+
+    def __init__(self, connection: asyncpg.Connection, plans: list[dict[str, Any]], /) -> None:
+        self._connection = connection
+        self._plans = plans
+
+    async def _explain(self, query: str, *args: Any) -> None:
+        transaction = self._connection.transaction()
+        await transaction.start()
+
+        try:
+            raw: str = await self._connection.fetchval(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}', *args)
+        finally:
+            await transaction.rollback()
+
+        self._plans.append(json.loads(raw)[0])
+
+    async def fetch(self, query: str, *args: Any) -> list[Any]:
+        await self._explain(query, *args)
+        return []
+
+    async def fetchrow(self, query: str, *args: Any) -> None:
+        await self._explain(query, *args)
+        return None
+
+    async def execute(self, query: str, *args: Any) -> str:
+        await self._explain(query, *args)
+        return ''
+
+    @contextlib.asynccontextmanager
+    async def transaction(self) -> None:
+        # Every query is already run in its own transaction, which is rolled back...
+        yield
+
+
+class ExplainPool:
+    """Stands in for the Database pool, handing out ExplainConnections."""
+
+    def __init__(self, pool: asyncpg.Pool, /) -> None:
+        self._pool = pool
+        self.plans: list[dict[str, Any]] = []
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> ExplainConnection:
+        async with self._pool.acquire() as connection:
+            yield ExplainConnection(connection, self.plans)
+
+
+def node_types(plan: dict[str, Any], /) -> list[str]:
+    """Walk a JSON plan and return every node type, depth first."""
+    types: list[str] = [plan['Node Type']]
+
+    for child in plan.get('Plans', []):
+        types.extend(node_types(child))
+
+    return types
+
+
+async def seed(pool: asyncpg.Pool, *, members: int, teams: int, rng: random.Random) -> dict[str, Any]:
+    """Seed the bench schema with a large synthetic jam and return some existing keys to query with."""
+    jam: Jam = Jam(members=members, teams=teams, rng=rng)
+
+    async with pool.acquire() as connection:
+        await prepare(connection, BENCH_SCHEMA)
+        await write(connection, jam)
+
+        log_id: int = await connection.fetchval(
+            """INSERT INTO error_log(event_id, channel, invoker, command, error, traceback)
+               VALUES ($1, 1, $2, 'create', 'HTTPException', '') RETURNING id""",
+            universal.EVENT,
+            jam.members[0][1]
+        )
+
+        await connection.execute('ANALYZE')
+
+    return {'members': jam.member_ids, 'teams': jam.teams, 'log_id': log_id, 'jam': jam}
+
+
+def cases(database: universal.Database, keys: dict[str, Any], /) -> dict[str, Callable[[], Awaitable[Any]]]:
+    """Every public query of universal.Database, called with arguments that hit the seeded data."""
+    team: tuple[Any, ...] = keys['teams'][len(keys['teams']) // 2]
+    member: int = keys['members'][-1]
+
+    return {
+        'create_team': lambda: database.create_team(
+            name='Benchmark Team',
+            owner=member,
+            role_id=1,
+            text_id=2,
+            voice_id=3
+        ),
+        'create_member': lambda: database.create_member(
+            member_id=1,
+            languages=[1, 2],
+            timezone=datetime.timedelta(hours=1),
+            solo=False
+        ),
+        'edit_member_team': lambda: database.edit_member_team(member_id=member, team_id=team[1]),
+        'edit_team_owner': lambda: database.edit_team_owner(member_id=member, team_id=team[1]),
+        'fetch_member': lambda: database.fetch_member(member_id=member),
+        'fetch_members': lambda: database.fetch_members(),
+        'fetch_team[team_id]': lambda: database.fetch_team(team_id=team[1]),
+        'fetch_team[invite]': lambda: database.fetch_team(invite=team[3]),
+        'fetch_team[channel]': lambda: database.fetch_team(text_id=team[7], voice_id=team[7]),
+        'fetch_teams': lambda: database.fetch_teams(),
+        'fetch_team_summaries': lambda: database.fetch_team_summaries(),
+        'edit_team_name': lambda: database.edit_team_name(team_id=team[1], name='Renamed Team'),
+        'delete_team': lambda: database.delete_team(team_id=team[1]),
+        'create_log': lambda: database.create_log(channel=1, invoker=member, command='join', error='', traceback=''),
+        'fetch_log': lambda: database.fetch_log(keys['log_id']),
+    }
+
+
+async def run(args: argparse.Namespace) -> int:
+    rng: random.Random = random.Random(args.seed)
+    pool: asyncpg.Pool = await asyncpg.create_pool(args.dsn, server_settings={'search_path': BENCH_SCHEMA})
+
+    print(f'Seeding {args.members} members and {args.teams} teams into schema "{BENCH_SCHEMA}"...')
+    keys: dict[str, Any] = await seed(pool, members=args.members, teams=args.teams, rng=rng)
+
+    explain: ExplainPool = ExplainPool(pool)
+    database: universal.Database = universal.Database()
+    database._pool = explain
+
+    results: dict[str, dict[str, Any]] = {}
+    for name, call in cases(database, keys).items():
+        explain.plans.clear()
+
+        for _ in range(args.runs):
+            # Methods like create_log index into the returned row, which EXPLAIN does not give us...
+            with contextlib.suppress(TypeError):
+                await call()
+
+        plans: list[dict[str, Any]] = explain.plans
+        results[name] = {
+            'shape': node_types(plans[0]['Plan']),
+            'time': statistics.median(p['Planning Time'] + p['Execution Time'] for p in plans),
+            'buffers': plans[-1]['Plan'].get('Shared Hit Blocks', 0) + plans[-1]['Plan'].get('Shared Read Blocks', 0)
+        }
+
+    if not args.keep:
+        async with pool.acquire() as connection:
+            await connection.execute(f'DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE')
+
+    await pool.close()
+
+    baseline: dict[str, dict[str, Any]] = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    failures: list[str] = []
+
+    # Without a baseline only the sequential scan check runs, timings and plan changes can not be caught...
+    unrecorded: list[str] = [name for name in results if name not in baseline]
+    if unrecorded and not args.update_baseline:
+        print(f'\nWARNING no baseline for: {", ".join(unrecorded)}. Their timings are not compared. '
+              f'Record one on this machine with --update-baseline.')
+
+        if args.require_baseline:
+            failures.append(f'{len(unrecorded)} queries have no baseline in {BASELINE}.')
+
+    print(f'\n{"query":<22} {"time (ms)":>10} {"baseline":>10} {"buffers":>8}  plan')
+    for name, result in results.items():
+        previous: dict[str, Any] | None = baseline.get(name)
+        base: str = f'{previous["time"]:.3f}' if previous else '-'
+
+        print(f'{name:<22} {result["time"]:>10.3f} {base:>10} {result["buffers"]:>8}  {" > ".join(result["shape"])}')
+
+        if 'Seq Scan' in result['shape'] and name not in SEQ_SCAN_ALLOWED:
+            failures.append(f'{name}: falls back to a sequential scan.')
+
+        if previous:
+            limit: float = max(previous['time'] * (1 + args.threshold), previous['time'] + MIN_REGRESSION_MS)
+
+            if result['time'] > limit:
+                failures.append(f'{name}: {result["time"]:.3f}ms regressed past {limit:.3f}ms.')
+
+            if result['shape'] != previous['shape']:
+                print(f'    plan changed, was: {" > ".join(previous["shape"])}')
+
+    if args.update_baseline:
+        BASELINE.parent.mkdir(exist_ok=True)
+        BASELINE.write_text(json.dumps(results, indent=4) + '\n')
+        print(f'\nBaseline written to {BASELINE}')
+
+    for failure in failures:
+        print(f'FAIL {failure}')
+
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Check the query plans of universal.Database against a large event.')
+    parser.add_argument('--dsn', default=universal.CONFIG['DATABASE']['dsn'], help='A local Postgres to seed.')
+    parser.add_argument('--members', type=int, default=20_000)
+    parser.add_argument('--teams', type=int, default=4_000)
+    parser.add_argument('--runs', type=int, default=5, help='Runs per query. The median time is kept.')
+    parser.add_argument('--seed', type=int, default=2023)
+    parser.add_argument('--threshold', type=float, default=0.5, help='Allowed slowdown. 0.5 = 50%% slower.')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--require-baseline', action='store_true', help='Fail when a query has no baseline.')
+    parser.add_argument('--keep', action='store_true', help='Keep the seeded schema around afterwards.')
+
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import argparse
+import asyncio
+import json
+import pathlib
+import sys
+import time
+from typing import Any, NamedTuple
+
+import aiohttp
+
+import universal
+
+
+# Latency regressions smaller than this (in ms) are treated as noise...
+MIN_REGRESSION_MS: float = 5.0
+
+
+class Result(NamedTuple):
+    kind: str
+    recorded: int
+    status: int
+    latency: float
+    late: float
+
+
+async def team_tokens(synthetic: bool, /) -> dict[int, str]:
+    """The webhook token of every team, from the configured database, or as generated by benchmarks/jam.py."""
+    if synthetic:
+        return {}
+
+    database: universal.DatabaseProtocol = await universal.setup_database()
+    return {team['team_id']: team['token'] for team in await database.fetch_teams()}
+
+
+def summarise(results: list[Result], /) -> dict[str, dict[str, Any]]:
+    """Latency percentiles (in ms), errors and how far behind schedule requests were sent, per kind."""
+    summary: dict[str, dict[str, Any]] = {}
+
+    for kind in universal.CAPTURE_KINDS:
+        selected: list[Result] = [r for r in results if r.kind == kind]
+        if not selected:
+            continue
+
+        ordered: list[float] = sorted(r.latency * 1000 for r in selected)
+        p50, p95, p99 = (ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in (50, 95, 99))
+
+        summary[kind] = {
+            'requests': len(selected),
+            'p50': p50,
+            'p95': p95,
+            'p99': p99,
+            'max': ordered[-1],
+            'errors': sum(r.status == 0 or r.status >= 500 for r in selected),
+            'changed': sum(r.status != r.recorded for r in selected),
+            'late': max(r.late for r in selected) * 1000
+        }
+
+    return summary
+
+
+async def run(args: argparse.Namespace) -> int:
+    entries: list[dict[str, Any]] = sorted(universal.read_capture(args.capture), key=lambda e: e['t'])
+    if not entries:
+        print(f'No requests in {args.capture}.')
+        return 1
+
+    tokens: dict[int, str] = await team_tokens(args.synthetic_tokens)
+    first: float = entries[0]['t']
+    duration: float = entries[-1]['t'] - first
+
+    speed: str = f'{args.speed:g}x' if args.speed else 'full speed'
+    print(f'Replaying {len(entries)} requests recorded over {duration:.1f}s against {args.base} at {speed}...')
+
+    connector: aiohttp.TCPConnector = aiohttp.TCPConnector(limit=args.concurrency)
+    session: aiohttp.ClientSession = aiohttp.ClientSession(connector=connector)
+    results: list[Result] = []
+
+    async def send(entry: dict[str, Any], due: float) -> None:
+        sent: float = time.perf_counter()
+
+        if entry['k'] == 'github':
+            token: str = tokens.get(entry['team'], f'token-{entry["team"]}')
+            url: str = f'{args.base}/api/github/{entry["team"]}/{token}'
+            request: dict[str, Any] = {
+                'data': entry.get('b', '').encode(),
+                'headers': {'Content-Type': 'application/json'}
+            }
+        else:
+            # Updates which were refused live are sent without the token again...
+            url = f'{args.base}/api/teams/update'
+            request = {'headers': {'Authorization': args.token} if entry['s'] != 401 else {}}
+
+        try:
+            async with session.post(url, **request) as resp:
+                await resp.read()
+                status: int = resp.status
+        except aiohttp.ClientError:
+            status = 0
+
+        results.append(Result(entry['k'], entry['s'], status, time.perf_counter() - sent, max(0.0, sent - due)))
+
+    # Requests are sent when they are due, whether or not earlier ones were answered, so a slow server sees the
+    # same traffic shape as it did live...
+    tasks: list[asyncio.Task] = []
+    start: float = time.perf_counter()
+
+    try:
+        for entry in entries:
+            due: float = start + (entry['t'] - first) / args.speed if args.speed else start
+            delay: float = due - time.perf_counter()
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            tasks.append(asyncio.create_task(send(entry, due)))
+
+        await asyncio.gather(*tasks)
+    finally:
+        await session.close()
+
+    elapsed: float = time.perf_counter() - start
+    summary: dict[str, dict[str, Any]] = summarise(results)
+    baseline: dict[str, dict[str, Any]] = {}
+
+    if args.baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    print(f'\nReplayed in {elapsed:.1f}s.')
+    print(f'\n{"kind":<8} {"requests":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"max":>8} {"base p95":>9} '
+          f'{"errors":>6} {"changed":>7} {"late":>8}')
+
+    failures: list[str] = []
+    for kind, result in summary.items():
+        previous: dict[str, Any] | None = baseline.get(kind)
+        base: str = f'{previous["p95"]:.1f}' if previous else '-'
+
+        print(f'{kind:<8} {result["requests"]:>8} {result["p50"]:>8.1f} {result["p95"]:>8.1f} {result["p99"]:>8.1f} '
+              f'{result["max"]:>8.1f} {base:>9} {result["errors"]:>6} {result["changed"]:>7} {result["late"]:>8.1f}')
+
+        if result['errors']:
+            failures.append(f'{kind}: {result["errors"]} requests failed.')
+
+        if previous:
+            limit: float = max(previous['p95'] * (1 + args.threshold), previous['p95'] + MIN_REGRESSION_MS)
+
+            if result['p95'] > limit:
+                failures.append(f'{kind}: p95 {result["p95"]:.1f}ms regressed past {limit:.1f}ms.')
+
+    print('\nTimes are in ms. "changed" counts responses with another status than recorded, "late" is how far behind '
+          'schedule the replay fell.')
+
+    if args.baseline and args.update_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(summary, indent=4) + '\n')
+        print(f'Baseline written to {args.baseline}')
+
+    for failure in failures:
+        print(f'FAIL {failure}')
+
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Replay a capture of webhook and team feed traffic against a server.')
+    parser.add_argument('capture', type=pathlib.Path, help='A capture written by the API server (SERVER.record_path).')
+    parser.add_argument('--base', default=f'http://127.0.0.1:{universal.CONFIG["SERVER"]["port"]}')
+    parser.add_argument('--speed', type=float, default=1.0, help='2 = twice as fast as recorded. 0 = all at once.')
+    parser.add_argument('--concurrency', type=int, default=0, help='Requests in flight at once. 0 for no limit.')
+    parser.add_argument('--token', default=universal.CONFIG['TOKENS']['backend'], help='For team feed updates.')
+    parser.add_argument(
+        '--synthetic-tokens',
+        action='store_true',
+        help='Use the webhook tokens of benchmarks/jam.py instead of reading them from the configured database.'
+    )
+    parser.add_argument('--baseline', type=pathlib.Path, help='A previous summary to compare against.')
+    parser.add_argument('--update-baseline', action='store_true', help='Write this summary to --baseline.')
+    parser.add_argument('--threshold', type=float, default=0.5, help='Allowed p95 slowdown. 0.5 = 50%% slower.')
+
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == '__main__':
+    main()
@@ -23,4 +23,11 @@ SOFTWARE.
 """
 from .bot_ import Bot, logger
 from .exceptions import *
+from .notifier import BackendNotifier
+from .outbox import Outbox
+from .reconcile import Drift, reconcile
+from .registry import Registry
+from .scheduler import Lane, RestScheduler
+from .timings import Timings
+from .tracing import SPAN_PARTS, Span, TracedDatabase, command_span, current_span, traced
 from .utils import *
@@ -30,6 +30,13 @@ from discord.ext import commands
 
 import universal
 
+from .notifier import BackendNotifier
+from .outbox import Outbox
+from .registry import Registry
+from .scheduler import RestScheduler
+from .timings import Timings
+from .tracing import TracedDatabase
+
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -43,10 +50,40 @@ class Bot(commands.Bot):
         intents.members = True
 
         self.session = session
-        self.database: universal.Database | None = None
+        self.database: Registry | None = None
+        self.timings: Timings = Timings()
+        self.profiler: universal.SamplingProfiler = universal.SamplingProfiler(
+            directory=universal.CONFIG['BOT'].get('profile_directory', 'profiles')
+        )
+        self.loop_monitor: universal.LoopMonitor = universal.LoopMonitor(
+            threshold=universal.CONFIG['BOT'].get('lag_threshold', 0.1)
+        )
+        self.rest: RestScheduler = RestScheduler(
+            concurrency=universal.CONFIG['BOT'].get('rest_concurrency', 10),
+            background=universal.CONFIG['BOT'].get('rest_background', 3)
+        )
+        self.members: universal.MemberCache = universal.MemberCache(
+            size=universal.CONFIG.get('DISCORD', {}).get('member_lru', 256)
+        )
+        self.backend: BackendNotifier = BackendNotifier(
+            session,
+            url=universal.CONFIG['BOT'].get('backend_url', 'https://codejam.timeenjoyed.dev/api/teams/update'),
+            token=universal.CONFIG['TOKENS']['backend'],
+            window=universal.CONFIG['BOT'].get('backend_debounce', 2.0)
+        )
+        self.outbox: Outbox = Outbox(
+            self,
+            workers=universal.CONFIG['BOT'].get('outbox_workers', 4),
+            max_attempts=universal.CONFIG['BOT'].get('outbox_attempts', 8)
+        )
 
         # type: ignore
-        super().__init__(help_command=None, intents=intents, command_prefix=commands.when_mentioned_or('?? ', '??'))
+        super().__init__(
+            help_command=None,
+            intents=intents,
+            command_prefix=commands.when_mentioned_or('?? ', '??'),
+            **universal.member_cache_options(intents)
+        )
         discord.utils.setup_logging(handler=universal.Handler(level=universal.CONFIG['LOGGING']['level']))
 
     async def on_command_error(self, context: commands.Context, exception: commands.CommandError, /) -> None:
@@ -66,7 +103,40 @@ class Bot(commands.Bot):
 
         logger.info(f'Loaded ({len(modules)}) modules.')
 
-        self.database = await universal.Database.setup()
+        # Members and teams are held in memory, and written through to the database...
+        # Queries are traced, so commands can report how long they spent in the database...
+        self.database = await Registry.setup(TracedDatabase(await universal.setup_database()))
+        self.database.start(interval=universal.CONFIG['BOT'].get('registry_sweep', 300))
+
+        # Discord side effects committed by commands are run by these workers...
+        self.outbox.start()
+        self.backend.start()
+        self.loop_monitor.start()
+
+    async def close(self) -> None:
+        self.loop_monitor.stop()
+        self.outbox.stop()
+        await self.backend.close()
+
+        if self.database:
+            self.database.stop()
+
+        await super().close()
 
     async def on_ready(self) -> None:
         logger.info(f'Logged in as {self.user} (ID: {self.user.id})')
+
+        # Only registered participants are cached, instead of chunking every guild at login...
+        members: list[universal.Row] = await self.database.fetch_members()
+        for guild in self.guilds:
+            await self.members.ensure(guild, [member['member_id'] for member in members])
+
+        logger.info(universal.ready_report(self))
+
+    async def on_member_join(self, member: discord.Member, /) -> None:
+        # They may have been requested while not in the guild...
+        self.members.forget(member.guild.id, member.id)
+
+    async def on_interaction(self, interaction: discord.Interaction, /) -> None:
+        # Managers are kept cached once seen, without having to chunk the guild to find them...
+        await self.members.keep(interaction.user)
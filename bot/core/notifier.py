@@ -0,0 +1,176 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import asyncio
+import logging
+import random
+
+import aiohttp
+
+
+__all__ = ('BackendNotifier',)
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+# Statuses worth retrying. Anything else (E.g. 401, a wrong token) will not be fixed by trying again...
+RETRY_STATUSES: frozenset[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class BackendNotifier:
+    """Tells the API server the teams have changed, so it can push a fresh feed.
+
+    Changes are signalled with notify(), which never blocks. Signals arriving within ``window`` seconds of each other
+    are coalesced into a single POST, waiting at most ``max_delay`` seconds during a steady stream of changes.
+    Failed deliveries are retried with exponential backoff and jitter until they succeed. A change signalled while a
+    POST is in flight is always followed by another POST, so the last change is never lost.
+
+    Parameters
+    ----------
+    session: aiohttp.ClientSession
+        The session used to POST.
+    url: str
+        The update endpoint of the API server.
+    token: str
+        The backend token, sent as the Authorization header.
+    window: float
+        How long (in seconds) to wait for more changes before sending. Defaults to 2.
+    max_delay: float
+        The longest (in seconds) a change waits to be sent while changes keep arriving. Defaults to 10.
+    max_backoff: float
+        The longest (in seconds) wait between retries. Defaults to 60.
+    """
+
+    def __init__(
+            self,
+            session: aiohttp.ClientSession,
+            /,
+            *,
+            url: str,
+            token: str,
+            window: float = 2.0,
+            max_delay: float = 10.0,
+            max_backoff: float = 60.0
+    ) -> None:
+        self.session = session
+        self.url = url
+        self.token = token
+        self.window = window
+        self.max_delay = max_delay
+        self.max_backoff = max_backoff
+
+        self._changed: asyncio.Event = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+        self.signals: int = 0
+        self.sent: int = 0
+        self._covered: int = 0
+
+    @property
+    def pending(self) -> bool:
+        """Whether there is a change which has not been delivered yet."""
+        return self._changed.is_set()
+
+    def start(self) -> None:
+        """Start delivering notifications."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def notify(self) -> None:
+        """Signal that the teams have changed. Safe to call as often as needed."""
+        self.signals += 1
+        self._changed.set()
+
+    async def close(self, *, timeout: float = 5.0) -> None:
+        """Stop, making one last attempt (within timeout seconds) to deliver a pending change."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        if not self.pending:
+            return
+
+        self._changed.clear()
+        try:
+            await asyncio.wait_for(self._send(), timeout=timeout)
+        except (asyncio.TimeoutError, aiohttp.ClientError, OSError) as e:
+            logger.warning(f'Unable to deliver the final backend notification: {e}')
+
+    async def _debounce(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        deadline: float = loop.time() + self.max_delay
+
+        # Keep waiting while changes keep arriving, but never past the deadline...
+        seen: int = self.signals
+        while True:
+            await asyncio.sleep(max(0.0, min(self.window, deadline - loop.time())))
+
+            if self.signals == seen or loop.time() >= deadline:
+                return
+
+            seen = self.signals
+
+    async def _run(self) -> None:
+        while True:
+            await self._changed.wait()
+            await self._debounce()
+
+            # Cleared before sending, so a change made while we send sets it again and is sent after...
+            self._changed.clear()
+            signals: int = self.signals
+
+            attempt: int = 0
+            while True:
+                try:
+                    if await self._send():
+                        logger.info(f'Successfully updated backend server. ({signals - self._covered}) changes sent.')
+
+                    self._covered = signals
+                    break
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                    attempt += 1
+                    delay: float = min(self.max_backoff, 2 ** attempt) * random.uniform(0.5, 1.0)
+
+                    logger.warning(f'Unable to reach backend server ({e}). Retrying in {delay:.1f}s.')
+                    await asyncio.sleep(delay)
+                except Exception as e:
+                    logger.error(f'Unable to update backend server. Fatal exception occurred: {e}')
+                    break
+
+    async def _send(self) -> bool:
+        """POST once. Returns False for a response that retrying will not fix, and raises for one that it will."""
+        headers: dict[str, str] = {'Authorization': self.token}
+
+        async with self.session.post(self.url, headers=headers) as resp:
+            if resp.status == 200:
+                self.sent += 1
+                return True
+
+            if resp.status in RETRY_STATUSES:
+                raise aiohttp.ClientResponseError(
+                    resp.request_info, resp.history, status=resp.status, message=resp.reason or ''
+                )
+
+            logger.error(f'Unable to update backend server. Failed with status code: {resp.status}')
+            return False
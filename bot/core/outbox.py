@@ -0,0 +1,303 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import asyncio
+import logging
+import random
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+import discord
+
+import universal
+
+if TYPE_CHECKING:
+    from .bot_ import Bot
+
+
+__all__ = ('Outbox',)
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+# Retries back off exponentially (with jitter) up to this many seconds...
+MAX_BACKOFF: float = 300.0
+
+# Errors which are worth retrying. Anything else (E.g. discord.Forbidden) fails the job straight away...
+RETRY_ERRORS: tuple[type[Exception], ...] = (
+    discord.DiscordServerError,
+    discord.RateLimited,
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    OSError
+)
+
+
+class Outbox:
+    """Worker pool draining the durable outbox of Discord side effects.
+
+    Commands commit the side effects they need as universal.Job rows in the same transaction as their database change,
+    reply straight away, and call notify(). Workers claim jobs with a lease, so jobs left behind by a crash or restart
+    are claimed again once their lease runs out. Failed jobs are retried with backoff, up to max_attempts.
+
+    The lease of a running job is renewed every lease / 3 seconds, so a job waiting on the RestScheduler for longer
+    than its lease is not claimed by another worker. Jobs may still run more than once (E.g. the bot died before a job
+    was completed):
+        - add_role / remove_role: {'guild_id', 'member_id', 'role_id', 'reason'}. Safe to repeat.
+        - delete_role: {'guild_id', 'role_id', 'reason'}. Safe to repeat.
+        - delete_channel: {'guild_id', 'channel_id', 'reason'}. Safe to repeat.
+        - send_message: {'channel_id', 'content', 'silent', 'pin', 'reason'}. The sent message id is recorded in the
+          payload, and a repeat does not send again. Only a crash or database error between sending and recording
+          it can send twice. Pinning is enqueued as its own job.
+        - pin_message: {'channel_id', 'message_id', 'reason'}. Safe to repeat.
+
+    A role, channel or member which no longer exists means there is nothing left to do, so the job is completed.
+    Every REST call goes through the bot's RestScheduler in the background lane.
+
+    Parameters
+    ----------
+    bot: Bot
+        The bot. Its database is used to claim jobs.
+    workers: int
+        The amount of jobs run concurrently. Defaults to 4.
+    max_attempts: int
+        How many times a job is attempted before it fails. Defaults to 8.
+    lease: float
+        How long (in seconds) a claimed job can go without renewing its lease before it can be claimed again, E.g.
+        when the bot died. Defaults to 60.
+    poll: float
+        How often (in seconds) idle workers check for jobs enqueued elsewhere. Defaults to 5.
+    """
+
+    def __init__(
+            self,
+            bot: 'Bot',
+            /,
+            *,
+            workers: int = 4,
+            max_attempts: int = 8,
+            lease: float = 60.0,
+            poll: float = 5.0
+    ) -> None:
+        self.bot = bot
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.poll = poll
+
+        self._wakeup: asyncio.Event = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the workers."""
+        if self._tasks:
+            return
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f'Started ({self.workers}) outbox workers.')
+
+    def stop(self) -> None:
+        """Stop the workers. Jobs they were running are claimed again once their lease runs out."""
+        for task in self._tasks:
+            task.cancel()
+
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers. Call this after committing jobs, so they run without waiting for the next poll."""
+        self._wakeup.set()
+
+    async def depth(self, *, prefix: str | None = None) -> dict[str, int]:
+        """Count the outbox jobs which are not done, by status. Optionally only those whose key starts with prefix."""
+        return await self.bot.database.fetch_outbox_depth(prefix=prefix)
+
+    async def _worker(self) -> None:
+        await self.bot.wait_until_ready()
+
+        while True:
+            # Clear before claiming, so a notify() while we claim is never missed...
+            self._wakeup.clear()
+
+            try:
+                jobs: list[dict[str, Any]] = await self.bot.database.claim_jobs(limit=1, lease=self.lease)
+            except Exception as e:
+                logger.warning(f'Unable to claim outbox jobs: {e}')
+                jobs = []
+
+            if not jobs:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll)
+                except asyncio.TimeoutError:
+                    pass
+
+                continue
+
+            for job in jobs:
+                await self._run(job)
+
+    async def _run(self, job: dict[str, Any], /) -> None:
+        kind: str = job['kind']
+        handler = getattr(self, f'_job_{kind}', None)
+
+        try:
+            if handler is None:
+                raise ValueError(f'Unknown outbox job kind: {kind}')
+
+            heartbeat: asyncio.Task = asyncio.create_task(self._heartbeat(job['job_id']))
+
+            try:
+                await self.bot.timings.timed(f'outbox.{kind}', handler(job))
+            finally:
+                heartbeat.cancel()
+        except Exception as e:
+            await self._failed(job, e)
+            return
+
+        try:
+            await self.bot.database.complete_job(job['job_id'])
+        except Exception as e:
+            # The job is claimed again when the lease runs out. Sent messages are recorded, so they are not resent...
+            logger.warning(f'Unable to complete outbox job ({job["job_id"]}): {e}')
+
+    async def _heartbeat(self, job_id: int, /) -> None:
+        """Renew the lease of a running job until cancelled."""
+        while True:
+            await asyncio.sleep(self.lease / 3)
+
+            try:
+                await self.bot.database.extend_job(job_id, lease=self.lease)
+            except Exception as e:
+                logger.warning(f'Unable to renew the lease of outbox job ({job_id}): {e}')
+
+    async def _failed(self, job: dict[str, Any], error: Exception, /) -> None:
+        message: str = f'{type(error).__name__}: {error}'
+        name: str = f'Outbox job ({job["job_id"]}) {job["kind"]}'
+
+        try:
+            if isinstance(error, RETRY_ERRORS) and job['attempts'] < self.max_attempts:
+                delay: float = min(MAX_BACKOFF, 2 ** job['attempts']) * random.uniform(0.5, 1.0)
+                await self.bot.database.retry_job(job['job_id'], delay=delay, error=message)
+
+                logger.warning(f'{name} failed, retrying in {delay:.1f}s: {message}')
+            else:
+                await self.bot.database.fail_job(job['job_id'], error=message)
+                logger.error(f'{name} failed permanently: {message}')
+        except Exception as e:
+            logger.warning(f'Unable to record the failure of outbox job ({job["job_id"]}): {e}')
+
+    def _guild(self, guild_id: int, /) -> discord.Guild:
+        guild: discord.Guild | None = self.bot.get_guild(guild_id)
+        if guild is None:
+            raise LookupError(f'The bot is not in the guild ({guild_id}).')
+
+        return guild
+
+    async def _job_add_role(self, job: dict[str, Any], /) -> None:
+        payload: dict[str, Any] = job['payload']
+        guild: discord.Guild = self._guild(payload['guild_id'])
+
+        member: discord.Member | None = await self.bot.members.get(guild, payload['member_id'])
+        role: discord.Role | None = guild.get_role(payload['role_id'])
+
+        if member is not None and role is not None and role not in member.roles:
+            call = member.add_roles(role, reason=payload.get('reason'))
+            await self.bot.rest.call(call, route='add_role', bucket=guild.id)
+
+    async def _job_remove_role(self, job: dict[str, Any], /) -> None:
+        payload: dict[str, Any] = job['payload']
+        guild: discord.Guild = self._guild(payload['guild_id'])
+
+        member: discord.Member | None = await self.bot.members.get(guild, payload['member_id'])
+        role: discord.Role | None = guild.get_role(payload['role_id'])
+
+        if member is not None and role is not None and role in member.roles:
+            call = member.remove_roles(role, reason=payload.get('reason'))
+            await self.bot.rest.call(call, route='remove_role', bucket=guild.id)
+
+    async def _job_delete_role(self, job: dict[str, Any], /) -> None:
+        payload: dict[str, Any] = job['payload']
+        role: discord.Role | None = self._guild(payload['guild_id']).get_role(payload['role_id'])
+
+        if role is None:
+            return
+
+        try:
+            call = role.delete(reason=payload.get('reason'))
+            await self.bot.rest.call(call, route='delete_role', bucket=role.guild.id)
+        except discord.NotFound:
+            pass
+
+    async def _job_delete_channel(self, job: dict[str, Any], /) -> None:
+        payload: dict[str, Any] = job['payload']
+        channel: discord.abc.GuildChannel | None = self._guild(payload['guild_id']).get_channel(payload['channel_id'])
+
+        if channel is None:
+            return
+
+        try:
+            call = channel.delete(reason=payload.get('reason'))
+            await self.bot.rest.call(call, route='delete_channel', bucket=channel.guild.id)
+        except discord.NotFound:
+            pass
+
+    async def _job_send_message(self, job: dict[str, Any], /) -> None:
+        payload: dict[str, Any] = job['payload']
+        channel: discord.abc.Messageable | None = self.bot.get_channel(payload['channel_id'])
+
+        if channel is None:
+            return
+
+        # A repeat of a job which already sent its message only has the pin left to do...
+        message_id: int | None = payload.get('message_id')
+
+        if message_id is None:
+            call = channel.send(payload['content'], silent=payload.get('silent', False))
+            message: discord.Message = await self.bot.rest.call(call, route='send_message', bucket=channel.id)
+
+            message_id = message.id
+            await self.bot.database.update_job_payload(job['job_id'], {'message_id': message_id})
+
+        if payload.get('pin'):
+            # Pinning is its own job, so a failed pin is retried without sending the message again...
+            pin: universal.Job = universal.Job(
+                'pin_message',
+                {'channel_id': channel.id, 'message_id': message_id, 'reason': payload.get('reason')},
+                key=f'{job["idempotency_key"]}:pin'
+            )
+
+            await self.bot.database.enqueue_jobs([pin])
+            self.notify()
+
+    async def _job_pin_message(self, job: dict[str, Any], /) -> None:
+        payload: dict[str, Any] = job['payload']
+        channel: discord.abc.Messageable | None = self.bot.get_channel(payload['channel_id'])
+
+        if channel is None:
+            return
+
+        try:
+            call = channel.get_partial_message(payload['message_id']).pin(reason=payload.get('reason'))
+            await self.bot.rest.call(call, route='pin_message', bucket=channel.id)
+        except discord.NotFound:
+            pass
@@ -0,0 +1,186 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from typing import Any, NamedTuple
+
+import universal
+
+
+__all__ = ('Drift', 'reconcile')
+
+
+class Drift(NamedTuple):
+    """Every difference found between the database and the guild.
+
+    Differences which can be fixed are turned into outbox jobs by jobs(). Teams missing a role or channel are only
+    reported, the team row holds the IDs so they need a manager to decide whether to recreate or delete the team.
+    """
+
+    # (team_id, name) of teams whose role no longer exists...
+    missing_roles: list[tuple[int, str]]
+    # (team_id, name, channel_id) of team channels which no longer exist...
+    missing_channels: list[tuple[int, str, int]]
+    # (member_id, role_id) of members missing the role of their team...
+    add_roles: list[tuple[int, int]]
+    # (member_id, role_id) of members holding the role of a team they are not in...
+    remove_roles: list[tuple[int, int]]
+    # Team roles and channels (by name) which no team owns...
+    orphan_roles: list[int]
+    orphan_channels: list[int]
+    # Registered members who are no longer in the guild...
+    departed: list[int]
+
+    @property
+    def fixable(self) -> int:
+        return len(self.add_roles) + len(self.remove_roles) + len(self.orphan_roles) + len(self.orphan_channels)
+
+    def jobs(self, *, guild_id: int, reason: str, key: str) -> list[universal.Job]:
+        """The outbox jobs fixing every fixable difference. Every job key starts with key."""
+        jobs: list[universal.Job] = []
+
+        for kind, pairs in (('add_role', self.add_roles), ('remove_role', self.remove_roles)):
+            for member_id, role_id in pairs:
+                payload: dict[str, Any] = {
+                    'guild_id': guild_id,
+                    'member_id': member_id,
+                    'role_id': role_id,
+                    'reason': reason
+                }
+                jobs.append(universal.Job(kind, payload, key=f'{key}:{kind}:{member_id}:{role_id}'))
+
+        for role_id in self.orphan_roles:
+            payload: dict[str, Any] = {'guild_id': guild_id, 'role_id': role_id, 'reason': reason}
+            jobs.append(universal.Job('delete_role', payload, key=f'{key}:delete_role:{role_id}'))
+
+        for channel_id in self.orphan_channels:
+            payload: dict[str, Any] = {'guild_id': guild_id, 'channel_id': channel_id, 'reason': reason}
+            jobs.append(universal.Job('delete_channel', payload, key=f'{key}:delete_channel:{channel_id}'))
+
+        return jobs
+
+    def report(self) -> str:
+        """A plain text report of every difference, by ID."""
+        sections: list[tuple[str, list[str]]] = [
+            ('Teams missing their role (not fixed)', [f'{name} ({id_})' for id_, name in self.missing_roles]),
+            (
+                'Teams missing a channel (not fixed)',
+                [f'{name} ({id_}): channel {channel}' for id_, name, channel in self.missing_channels]
+            ),
+            ('Members missing their team role', [f'member {m} needs role {r}' for m, r in self.add_roles]),
+            ('Members holding another team role', [f'member {m} holds role {r}' for m, r in self.remove_roles]),
+            ('Orphaned team roles', [f'role {r}' for r in self.orphan_roles]),
+            ('Orphaned team channels', [f'channel {c}' for c in self.orphan_channels]),
+            ('Registered members no longer in the guild (not fixed)', [f'member {m}' for m in self.departed])
+        ]
+
+        lines: list[str] = []
+        for title, items in sections:
+            lines.append(f'{title}: {len(items)}')
+            lines.extend(f'    {item}' for item in items)
+
+        return '\n'.join(lines)
+
+
+def reconcile(
+        members: list[universal.Row],
+        teams: list[universal.Row],
+        /,
+        *,
+        roles: dict[int, str],
+        channels: dict[int, str],
+        category: set[int],
+        holders: dict[int, set[int]],
+        prefix: str
+) -> Drift:
+    """Compare the database against a snapshot of the guild. Nothing is fetched, so this is only set arithmetic.
+
+    Parameters
+    ----------
+    members: list[universal.Row]
+        Every registered member. E.g. from fetch_members().
+    teams: list[universal.Row]
+        Every team. E.g. from fetch_teams().
+    roles: dict[int, str]
+        The name of every role in the guild, by ID.
+    channels: dict[int, str]
+        The name of every channel in the guild, by ID.
+    category: set[int]
+        The IDs of the channels in the CodeJam category.
+    holders: dict[int, set[int]]
+        The role IDs held by every member of the guild, by member ID.
+    prefix: str
+        The prefix of every team role and channel name.
+
+    Returns
+    -------
+    Drift
+    """
+    team_roles: dict[int, int] = {team['team_id']: team['role_id'] for team in teams}
+    owned_roles: set[int] = set(team_roles.values())
+    owned_channels: set[int] = {c for team in teams for c in (team['text_id'], team['voice_id'])}
+
+    missing_roles: list[tuple[int, str]] = [(t['team_id'], t['name']) for t in teams if t['role_id'] not in roles]
+    missing_channels: list[tuple[int, str, int]] = [
+        (team['team_id'], team['name'], channel)
+        for team in teams
+        for channel in (team['text_id'], team['voice_id'])
+        if channel not in channels
+    ]
+
+    add_roles: list[tuple[int, int]] = []
+    remove_roles: list[tuple[int, int]] = []
+    departed: list[int] = []
+
+    registered: set[int] = set()
+    for member in members:
+        registered.add(member['member_id'])
+
+        held: set[int] | None = holders.get(member['member_id'])
+        if held is None:
+            departed.append(member['member_id'])
+            continue
+
+        expected: int | None = team_roles.get(member['team_id'])
+        if expected is not None and expected in roles and expected not in held:
+            add_roles.append((member['member_id'], expected))
+
+        remove_roles.extend((member['member_id'], role) for role in sorted((held & owned_roles) - {expected}))
+
+    # Guild members who never registered can not hold a team role either...
+    for member_id in holders.keys() - registered:
+        remove_roles.extend((member_id, role) for role in sorted(holders[member_id] & owned_roles))
+
+    orphan_roles: list[int] = sorted(r for r, name in roles.items() if name.startswith(prefix) and r not in owned_roles)
+    orphan_channels: list[int] = sorted(
+        c for c in category if channels.get(c, '').startswith(prefix) and c not in owned_channels
+    )
+
+    return Drift(
+        missing_roles=missing_roles,
+        missing_channels=missing_channels,
+        add_roles=add_roles,
+        remove_roles=remove_roles,
+        orphan_roles=orphan_roles,
+        orphan_channels=orphan_channels,
+        departed=departed
+    )
@@ -0,0 +1,402 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import asyncio
+import datetime
+import logging
+import pathlib
+from collections.abc import Sequence
+from typing import Any
+
+import universal
+
+
+__all__ = ('Registry',)
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+MEMBER_COLUMNS: tuple[str, ...] = ('event_id', 'member_id', 'languages', 'timezone', 'solo', 'team_id', 'registered')
+TEAM_COLUMNS: tuple[str, ...] = (
+    'event_id',
+    'team_id',
+    'token',
+    'invite',
+    'name',
+    'github',
+    'owner',
+    'role_id',
+    'text_id',
+    'voice_id',
+    'created'
+)
+
+# The unique team columns fetch_team can look a team up by...
+TEAM_KEYS: tuple[str, ...] = ('token', 'invite', 'owner', 'name', 'text_id', 'voice_id', 'role_id')
+
+
+class Registry:
+    """Write-through, in-memory registry of every participant and team in the active event.
+
+    The registry wraps a database and implements the same protocol. Every mutation is written to the database first,
+    and the returned row is then applied in memory. Member and team lookups are answered from memory without a query,
+    with the same row shapes the database returns. Everything else is passed straight through to the database.
+
+    A periodic sweep reloads everything from the database, logging any drift it finds.
+
+    Parameters
+    ----------
+    database: universal.DatabaseProtocol
+        The database to wrap.
+    """
+
+    def __init__(self, database: universal.DatabaseProtocol, /) -> None:
+        self.database = database
+
+        self._members: dict[int, dict[str, Any]] = {}
+        self._teams: dict[int, dict[str, Any]] = {}
+        self._rosters: dict[int, dict[int, None]] = {}
+        self._index: dict[str, dict[Any, int]] = {key: {} for key in TEAM_KEYS}
+        self._names: dict[str, int] = {}
+
+        # Bumped on every mutation, so a sweep knows when its snapshot went stale while loading...
+        self._version: int = 0
+        self._sweeper: asyncio.Task | None = None
+
+    @property
+    def event(self) -> int:
+        return self.database.event
+
+    @classmethod
+    async def setup(cls, database: universal.DatabaseProtocol | None = None, /) -> 'Registry':
+        """Wrap the given database (or the configured one) and load it."""
+        self_: Registry = cls(database or await universal.setup_database())
+        await self_.load()
+
+        return self_
+
+    async def load(self) -> None:
+        """Load every member and team of the active event from the database, replacing what is in memory."""
+        members, teams = await self._snapshot()
+        self._replace(members, teams)
+
+        logger.info(f'Loaded ({len(self._members)}) members and ({len(self._teams)}) teams into the registry.')
+
+    async def _snapshot(self) -> tuple[dict[int, dict[str, Any]], dict[int, dict[str, Any]]]:
+        teams: dict[int, dict[str, Any]] = {}
+        for row in await self.database.fetch_teams(primary=True):
+            teams[row['team_id']] = {c: row[c] for c in TEAM_COLUMNS}
+
+        members: dict[int, dict[str, Any]] = {}
+        for row in await self.database.fetch_members(primary=True):
+            # The joined event_id is the teams, which is None for members without a team...
+            members[row['member_id']] = {**{c: row[c] for c in MEMBER_COLUMNS}, 'event_id': self.event}
+
+        return members, teams
+
+    def _replace(self, members: dict[int, dict[str, Any]], teams: dict[int, dict[str, Any]], /) -> None:
+        self._members = {}
+        self._teams = {}
+        self._rosters = {}
+        self._index = {key: {} for key in TEAM_KEYS}
+        self._names = {}
+
+        for team in teams.values():
+            self._put_team(team)
+
+        for member in members.values():
+            self._put_member(member)
+
+    def start(self, *, interval: float) -> None:
+        """Start the periodic consistency sweep, running every interval seconds."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop(interval))
+
+    def stop(self) -> None:
+        """Stop the periodic consistency sweep."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+
+    async def _sweep_loop(self, interval: float, /) -> None:
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.warning(f'Registry consistency sweep failed: {e}')
+
+    async def sweep(self) -> int | None:
+        """Compare memory against the database and replace it with what the database holds.
+
+        Returns
+        -------
+        int | None
+            The number of members and teams that differed. None if a mutation happened while loading,
+            in which case the snapshot is stale and the sweep is skipped.
+        """
+        version: int = self._version
+        members, teams = await self._snapshot()
+
+        if version != self._version:
+            return None
+
+        drift: int = sum(1 for k in members.keys() | self._members.keys() if members.get(k) != self._members.get(k))
+        drift += sum(1 for k in teams.keys() | self._teams.keys() if teams.get(k) != self._teams.get(k))
+
+        if drift:
+            logger.warning(f'Registry consistency sweep found ({drift}) rows out of sync with the database.')
+
+        self._replace(members, teams)
+        return drift
+
+    def _put_team(self, team: dict[str, Any], /) -> None:
+        old: dict[str, Any] | None = self._teams.get(team['team_id'])
+        if old:
+            self._unindex_team(old)
+
+        self._teams[team['team_id']] = team
+        self._rosters.setdefault(team['team_id'], {})
+
+        for key in TEAM_KEYS:
+            self._index[key][team[key]] = team['team_id']
+
+        self._names[team['name'].lower()] = team['team_id']
+
+    def _unindex_team(self, team: dict[str, Any], /) -> None:
+        for key in TEAM_KEYS:
+            self._index[key].pop(team[key], None)
+
+        self._names.pop(team['name'].lower(), None)
+
+    def _put_member(self, member: dict[str, Any], /) -> None:
+        old: dict[str, Any] | None = self._members.get(member['member_id'])
+        if old and old['team_id'] in self._rosters:
+            self._rosters[old['team_id']].pop(member['member_id'], None)
+
+        self._members[member['member_id']] = member
+
+        if member['team_id'] in self._rosters:
+            self._rosters[member['team_id']][member['member_id']] = None
+
+    def _member_row(self, member: dict[str, Any], /) -> dict[str, Any]:
+        # Shaped like: members LEFT OUTER JOIN teams. Like asyncpg, the last duplicated column wins...
+        return {**member, **self._teams.get(member['team_id'], dict.fromkeys(TEAM_COLUMNS))}
+
+    def _team_rows(self, team_id: int, /) -> list[dict[str, Any]]:
+        # Shaped like: teams LEFT OUTER JOIN members. Like asyncpg, the last duplicated column wins...
+        team: dict[str, Any] = self._teams[team_id]
+        roster: list[int] = list(self._rosters[team_id])
+
+        if not roster:
+            return [{**team, **dict.fromkeys(MEMBER_COLUMNS)}]
+
+        return [{**team, **self._members[member_id]} for member_id in roster]
+
+    async def create_team(
+            self,
+            *,
+            name: str,
+            owner: int,
+            role_id: int,
+            text_id: int,
+            voice_id: int,
+            jobs: Sequence[universal.Job] = ()
+    ) -> universal.Row:
+        row: universal.Row = await self.database.create_team(
+            name=name,
+            owner=owner,
+            role_id=role_id,
+            text_id=text_id,
+            voice_id=voice_id,
+            jobs=jobs
+        )
+
+        self._version += 1
+        self._put_team({c: row[c] for c in TEAM_COLUMNS})
+
+        return row
+
+    async def create_member(
+            self,
+            *,
+            member_id: int,
+            languages: list[int],
+            timezone: datetime.timedelta,
+            solo: bool,
+            team_id: int | None = None
+    ) -> universal.Row:
+        row: universal.Row = await self.database.create_member(
+            member_id=member_id,
+            languages=languages,
+            timezone=timezone,
+            solo=solo,
+            team_id=team_id
+        )
+
+        self._version += 1
+        self._put_member({c: row[c] for c in MEMBER_COLUMNS})
+
+        return row
+
+    async def edit_member_team(
+            self,
+            *,
+            member_id: int,
+            team_id: int | None,
+            jobs: Sequence[universal.Job] = ()
+    ) -> universal.Row:
+        row: universal.Row = await self.database.edit_member_team(member_id=member_id, team_id=team_id, jobs=jobs)
+
+        self._version += 1
+        if row:
+            self._put_member({c: row[c] for c in MEMBER_COLUMNS})
+
+        return row
+
+    async def edit_team_owner(self, *, member_id: int, team_id: int | None) -> universal.Row:
+        row: universal.Row = await self.database.edit_team_owner(member_id=member_id, team_id=team_id)
+
+        self._version += 1
+        if row:
+            self._put_team({c: row[c] for c in TEAM_COLUMNS})
+
+        return row
+
+    async def edit_team_name(self, *, team_id: int, name: str) -> universal.Row:
+        row: universal.Row = await self.database.edit_team_name(team_id=team_id, name=name)
+
+        self._version += 1
+        if row:
+            self._put_team({c: row[c] for c in TEAM_COLUMNS})
+
+        return row
+
+    async def delete_team(self, team_id: int, *, jobs: Sequence[universal.Job] = ()) -> universal.Row:
+        row: universal.Row = await self.database.delete_team(team_id, jobs=jobs)
+
+        self._version += 1
+        team: dict[str, Any] | None = self._teams.pop(team_id, None)
+
+        if team:
+            self._unindex_team(team)
+
+        # Mirror ON DELETE SET NULL...
+        for member_id in self._rosters.pop(team_id, {}):
+            self._members[member_id] = {**self._members[member_id], 'team_id': None}
+
+        return row
+
+    def has_team_name(self, name: str, /) -> bool:
+        """Whether a team with this name already exists, ignoring case.
+
+        This is only a fast pre-check. The database enforces case-insensitive uniqueness when the team is created.
+        """
+        return name.lower() in self._names
+
+    async def fetch_member(self, *, member_id: int, primary: bool = False) -> universal.Row | None:
+        member: dict[str, Any] | None = self._members.get(member_id)
+        return self._member_row(member) if member else None
+
+    async def fetch_members(self, *, primary: bool = False) -> list[universal.Row]:
+        return [self._member_row(member) for member in self._members.values()]
+
+    async def fetch_team(
+            self,
+            *,
+            team_id: int | None = None,
+            token: str | None = None,
+            invite: str | None = None,
+            owner: int | None = None,
+            name: str | None = None,
+            text_id: int | None = None,
+            voice_id: int | None = None,
+            role_id: int | None = None,
+            primary: bool = False
+    ) -> list[universal.Row]:
+        keys: dict[str, Any] = {
+            'token': token,
+            'invite': invite,
+            'owner': owner,
+            'name': name,
+            'text_id': text_id,
+            'voice_id': voice_id,
+            'role_id': role_id
+        }
+
+        # Like the query, every team matching any of the given values is returned...
+        matched: dict[int, None] = {}
+        if team_id in self._teams:
+            matched[team_id] = None
+
+        for key, value in keys.items():
+            if value is not None and value in self._index[key]:
+                matched[self._index[key][value]] = None
+
+        return [row for id_ in matched for row in self._team_rows(id_)]
+
+    async def fetch_teams(self, *, primary: bool = False) -> list[universal.Row]:
+        return [dict(team) for team in self._teams.values()]
+
+    async def fetch_team_summaries(self, *, primary: bool = False) -> list[universal.Row]:
+        return await self.database.fetch_team_summaries(primary=primary)
+
+    async def create_log(self, *, channel: int, invoker: int, command: str, error: str, traceback: str) -> int:
+        return await self.database.create_log(
+            channel=channel,
+            invoker=invoker,
+            command=command,
+            error=error,
+            traceback=traceback
+        )
+
+    async def fetch_log(self, identifier: int, *, primary: bool = False) -> universal.Row | None:
+        return await self.database.fetch_log(identifier, primary=primary)
+
+    async def enqueue_jobs(self, jobs: Sequence[universal.Job], /) -> None:
+        await self.database.enqueue_jobs(jobs)
+
+    async def claim_jobs(self, *, limit: int, lease: float) -> list[dict[str, Any]]:
+        return await self.database.claim_jobs(limit=limit, lease=lease)
+
+    async def complete_job(self, job_id: int, /) -> None:
+        await self.database.complete_job(job_id)
+
+    async def extend_job(self, job_id: int, /, *, lease: float) -> None:
+        await self.database.extend_job(job_id, lease=lease)
+
+    async def update_job_payload(self, job_id: int, /, values: dict[str, Any]) -> None:
+        await self.database.update_job_payload(job_id, values)
+
+    async def retry_job(self, job_id: int, /, *, delay: float, error: str) -> None:
+        await self.database.retry_job(job_id, delay=delay, error=error)
+
+    async def fail_job(self, job_id: int, /, *, error: str) -> None:
+        await self.database.fail_job(job_id, error=error)
+
+    async def fetch_outbox_depth(self, *, prefix: str | None = None) -> dict[str, int]:
+        return await self.database.fetch_outbox_depth(prefix=prefix)
+
+    async def archive_event(self, event_id: int, *, directory: pathlib.Path) -> list[pathlib.Path]:
+        return await self.database.archive_event(event_id, directory=directory)
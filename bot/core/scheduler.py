@@ -0,0 +1,226 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import asyncio
+import enum
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Hashable
+from typing import Any, TypeVar
+
+from .timings import Timings
+from .tracing import Span, current_span
+
+
+__all__ = ('Lane', 'RestScheduler')
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+T = TypeVar('T')
+
+
+class Lane(enum.IntEnum):
+    """Priority lanes for Discord REST calls. Waiting calls in a lower lane always start first."""
+
+    # Replies to an interaction the user is waiting on...
+    INTERACTION = 0
+    # Work a command needs before it can reply. E.g. creating team channels...
+    COMMAND = 1
+    # Work nobody is waiting on. E.g. outbox jobs and bulk edits...
+    BACKGROUND = 2
+
+
+class RestScheduler:
+    """Schedules Discord REST calls by route bucket and priority lane.
+
+    discord.py still handles the rate limit headers of each call. The scheduler decides which call is sent next:
+        - At most `concurrency` calls are in flight at once.
+        - At most `per_bucket` calls to the same route bucket are in flight at once. A bucket is a route and its major
+          parameter, E.g. ('add_role', guild_id), so a burst to one bucket does not hold up calls to any other.
+        - Background calls never take more than `background` of the slots, so replies are never stuck behind them.
+        - When a slot frees up, the waiting call in the lowest lane goes first, oldest first within a lane.
+
+    The time every call waited for a slot is recorded per route in `waits`.
+
+    Parameters
+    ----------
+    concurrency: int
+        The maximum amount of calls in flight. Defaults to 10.
+    per_bucket: int
+        The maximum amount of calls in flight to a single route bucket. Defaults to 2.
+    background: int
+        The maximum amount of background calls in flight. Defaults to 3.
+    """
+
+    def __init__(self, *, concurrency: int = 10, per_bucket: int = 2, background: int = 3) -> None:
+        self.concurrency = concurrency
+        self.per_bucket = per_bucket
+        self.background = background
+
+        self.waits: Timings = Timings()
+
+        self._active: int = 0
+        self._active_background: int = 0
+        self._buckets: dict[Hashable, int] = {}
+
+        # (lane, order, bucket, future) of every waiting call, kept sorted...
+        self._waiters: list[tuple[Lane, int, Hashable, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    async def call(
+            self,
+            awaitable: Awaitable[T],
+            /,
+            *,
+            route: str,
+            bucket: Any = None,
+            lane: Lane = Lane.BACKGROUND
+    ) -> T:
+        """Wait for a slot, then await the REST call.
+
+        Parameters
+        ----------
+        awaitable: Awaitable[T]
+            The REST call. E.g. member.add_roles(role). A coroutine does nothing until it is awaited,
+            so it is only sent once a slot is granted.
+        route: str
+            The route name, used for the wait time statistics. E.g. 'add_role'.
+        bucket: Any
+            The major parameter of the route. E.g. the guild or channel id. Defaults to None.
+        lane: Lane
+            The priority lane. Defaults to Lane.BACKGROUND.
+
+        Returns
+        -------
+        T
+            The result of the call.
+        """
+        key: Hashable = (route, bucket)
+        start: float = time.perf_counter()
+
+        try:
+            await self._acquire(key, lane)
+        except BaseException:
+            # Never sent, so make sure the coroutine does not warn it was never awaited...
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+
+        self.waits.record(route, time.perf_counter() - start)
+
+        try:
+            return await awaitable
+        finally:
+            self._release(key, lane)
+            self._grant()
+
+            # Waiting for a slot counts as REST time too, it is time the command spent on Discord...
+            span: Span | None = current_span.get()
+            if span is not None:
+                span.rest += time.perf_counter() - start
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Wait time statistics (in milliseconds) for every route, from the most recent calls."""
+        stats: dict[str, dict[str, float]] = {}
+
+        for route in self.waits.steps():
+            p50, p95, p99 = self.waits.percentiles(route, 50, 95, 99)
+            samples: list[float] = self.waits.samples(route)
+
+            stats[route] = {
+                'calls': len(samples),
+                'p50': p50 * 1000,
+                'p95': p95 * 1000,
+                'p99': p99 * 1000,
+                'max': max(samples) * 1000
+            }
+
+        return stats
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _available(self, key: Hashable, lane: Lane, /) -> bool:
+        if self._active >= self.concurrency or self._buckets.get(key, 0) >= self.per_bucket:
+            return False
+
+        return lane is not Lane.BACKGROUND or self._active_background < self.background
+
+    def _take(self, key: Hashable, lane: Lane, /) -> None:
+        self._active += 1
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+
+        if lane is Lane.BACKGROUND:
+            self._active_background += 1
+
+    def _release(self, key: Hashable, lane: Lane, /) -> None:
+        self._active -= 1
+        self._buckets[key] -= 1
+
+        if not self._buckets[key]:
+            del self._buckets[key]
+
+        if lane is Lane.BACKGROUND:
+            self._active_background -= 1
+
+    async def _acquire(self, key: Hashable, lane: Lane, /) -> None:
+        # Only go straight through when no call in the same or a higher lane is waiting for this slot...
+        if self._available(key, lane) and not any(w[0] <= lane for w in self._waiters):
+            self._take(key, lane)
+            return
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._waiters.append((lane, next(self._order), key, future))
+        self._waiters.sort(key=lambda w: w[:2])
+
+        self._grant()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted as we were cancelled, so hand it on...
+                self._release(key, lane)
+                self._grant()
+            else:
+                self._waiters = [w for w in self._waiters if w[3] is not future]
+            raise
+
+    def _grant(self) -> None:
+        """Grant free slots to waiting calls, by lane then age. Calls to a full bucket are skipped, not blocking."""
+        for waiter in list(self._waiters):
+            lane, _, key, future = waiter
+
+            if self._active >= self.concurrency:
+                break
+
+            if future.done() or not self._available(key, lane):
+                continue
+
+            self._waiters.remove(waiter)
+            self._take(key, lane)
+            future.set_result(None)
@@ -0,0 +1,99 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import collections
+import contextlib
+import logging
+import time
+from typing import Any, Awaitable, Iterator, TypeVar
+
+
+__all__ = ('Timings',)
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+T = TypeVar('T')
+
+
+class Timings:
+    """Rolling latency samples for named steps, E.g. 'team_create.role'.
+
+    Only the most recent samples of each step are kept, so memory stays bounded however long the bot runs.
+
+    Parameters
+    ----------
+    maxlen: int
+        The amount of samples kept per step. Defaults to 500.
+    """
+
+    def __init__(self, *, maxlen: int = 500) -> None:
+        self._maxlen = maxlen
+        self._samples: dict[str, collections.deque[float]] = {}
+
+    def record(self, step: str, duration: float, /) -> None:
+        """Record a duration in seconds for the given step."""
+        try:
+            samples: collections.deque[float] = self._samples[step]
+        except KeyError:
+            samples = self._samples[step] = collections.deque(maxlen=self._maxlen)
+
+        samples.append(duration)
+        logger.debug(f'{step} took {duration * 1000:.1f}ms')
+
+    @contextlib.contextmanager
+    def time(self, step: str, /) -> Iterator[None]:
+        """Context manager recording how long the block took, whether it succeeded or not."""
+        start: float = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.record(step, time.perf_counter() - start)
+
+    async def timed(self, step: str, awaitable: Awaitable[T], /) -> T:
+        """Await and time the given awaitable. Useful with asyncio.gather, where a 'with' block can not be used."""
+        with self.time(step):
+            return await awaitable
+
+    def samples(self, step: str, /) -> list[float]:
+        """The recorded samples for the given step, oldest first."""
+        return list(self._samples.get(step, ()))
+
+    def percentiles(self, step: str, /, *percentiles: float) -> list[float]:
+        """The given percentiles (0 to 100) of the recorded samples for a step, by nearest rank.
+
+        Each percentile is 0.0 when the step has no samples.
+        """
+        samples: list[float] = sorted(self._samples.get(step, ()))
+        if not samples:
+            return [0.0 for _ in percentiles]
+
+        return [samples[min(len(samples) - 1, int(len(samples) * p / 100))] for p in percentiles]
+
+    def steps(self) -> list[str]:
+        return sorted(self._samples)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {step: self.samples(step) for step in self.steps()}
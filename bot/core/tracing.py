@@ -0,0 +1,135 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import contextlib
+import contextvars
+import functools
+import inspect
+import logging
+import time
+from collections.abc import Callable, Coroutine, Iterator
+from typing import Any, TypeVar
+
+import discord
+
+import universal
+
+from .timings import Timings
+
+
+__all__ = ('Span', 'TracedDatabase', 'command_span', 'current_span', 'traced', 'SPAN_PARTS')
+
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+T = TypeVar('T')
+
+# What is recorded for every command. 'other' is the total minus database and REST time (E.g. defer and replies)...
+SPAN_PARTS: tuple[str, ...] = ('total', 'db', 'rest', 'other')
+
+
+class Span:
+    """The time spent by a single command invocation, split by where it went.
+
+    Database and REST time are added by TracedDatabase and RestScheduler while the span is current.
+    Concurrent calls (E.g. in asyncio.gather) each add their own time, so these can add up to more than the total.
+    """
+
+    __slots__ = ('name', 'start', 'db', 'rest')
+
+    def __init__(self, name: str, /) -> None:
+        self.name = name
+        self.start: float = time.perf_counter()
+        self.db: float = 0.0
+        self.rest: float = 0.0
+
+
+# The span of the command being run. Tasks started by the command (E.g. gather) see the same span...
+current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar('current_span', default=None)
+
+
+@contextlib.contextmanager
+def command_span(timings: Timings, name: str, /) -> Iterator[Span]:
+    """Trace a command, recording its total, database, REST and other time as 'cmd.<name>.<part>'."""
+    span: Span = Span(name)
+    token: contextvars.Token = current_span.set(span)
+
+    try:
+        yield span
+    finally:
+        current_span.reset(token)
+        total: float = time.perf_counter() - span.start
+
+        timings.record(f'cmd.{name}.total', total)
+        timings.record(f'cmd.{name}.db', span.db)
+        timings.record(f'cmd.{name}.rest', span.rest)
+        timings.record(f'cmd.{name}.other', max(0.0, total - span.db - span.rest))
+
+
+def traced(func: Callable[..., Coroutine[Any, Any, T]], /) -> Callable[..., Coroutine[Any, Any, T]]:
+    """Decorator tracing an app command callback of a cog with a Span, recorded in the bot's timings.
+
+    Place it directly above the function, below the command and check decorators.
+    """
+    @functools.wraps(func)
+    async def wrapper(self: Any, interaction: discord.Interaction, /, *args: Any, **kwargs: Any) -> T:
+        name: str = interaction.command.qualified_name if interaction.command else func.__name__
+
+        with command_span(interaction.client.timings, name):
+            return await func(self, interaction, *args, **kwargs)
+
+    return wrapper
+
+
+class TracedDatabase:
+    """Wraps a database, adding the time of every query to the current span. Anything else is passed through.
+
+    Parameters
+    ----------
+    database: universal.DatabaseProtocol
+        The database to wrap.
+    """
+
+    def __init__(self, database: universal.DatabaseProtocol, /) -> None:
+        self.database = database
+
+    def __getattr__(self, name: str) -> Any:
+        attribute: Any = getattr(self.database, name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        async def query(*args: Any, **kwargs: Any) -> Any:
+            start: float = time.perf_counter()
+
+            try:
+                return await attribute(*args, **kwargs)
+            finally:
+                span: Span | None = current_span.get()
+                if span is not None:
+                    span.db += time.perf_counter() - start
+
+        # Cached on the instance, so __getattr__ is only called once per method...
+        setattr(self, name, query)
+        return query
@@ -40,6 +40,8 @@ async def run() -> None:
 
 
 if __name__ == '__main__':
+    universal.install_uvloop(universal.CONFIG['BOT'].get('uvloop', False))
+
     try:
         asyncio.run(run())
     except KeyboardInterrupt:
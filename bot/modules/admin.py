@@ -21,9 +21,11 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-from typing import Literal
+import inspect
+from typing import Any, Literal
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 
 try:
@@ -31,6 +33,8 @@ try:
 except ImportError:
     from bot.core import *
 
+import universal
+
 
 class Admin(commands.Cog):
 
@@ -78,6 +82,73 @@ class Admin(commands.Cog):
 
         await ctx.send(f"Synced the tree to {ret} guild(s).")
 
+    @commands.command()
+    @commands.is_owner()
+    async def outbox(self, ctx: commands.Context) -> None:
+        """Show how many outbox jobs are waiting, running or have failed."""
+        depth: dict[str, int] = await self.bot.outbox.depth()
+        await ctx.send('\n'.join(f'**{status.title()}:** `{count}`' for status, count in depth.items()))
+
+    @commands.command()
+    @commands.is_owner()
+    async def rest(self, ctx: commands.Context) -> None:
+        """Show how long Discord REST calls have waited for the scheduler, per route."""
+        stats: dict[str, dict[str, float]] = self.bot.rest.stats()
+        if not stats:
+            await ctx.send('No REST calls have been scheduled yet.')
+            return
+
+        lines: list[str] = [f'**Waiting:** `{self.bot.rest.waiting}`\n']
+        for route, stat in stats.items():
+            lines.append(
+                f'**{route}** ({stat["calls"]} calls): '
+                f'p50 `{stat["p50"]:.1f}ms` | p95 `{stat["p95"]:.1f}ms` | p99 `{stat["p99"]:.1f}ms` | max `{stat["max"]:.1f}ms`'
+            )
+
+        await ctx.send('\n'.join(lines))
+
+    @commands.command(name='loop')
+    @commands.is_owner()
+    async def loop_(self, ctx: commands.Context) -> None:
+        """Show event loop lag from the recent samples, and how often the loop has stalled."""
+        stats: dict[str, float] = self.bot.loop_monitor.stats()
+
+        await ctx.send(
+            f'**Lag:** p50 `{stats["p50"]:.1f}ms` | p95 `{stats["p95"]:.1f}ms` | p99 `{stats["p99"]:.1f}ms` | '
+            f'max `{stats["max"]:.1f}ms`\n'
+            f'**Stalls:** `{stats["stalls"]}` (worst `{stats["worst"]:.0f}ms`)'
+        )
+
+    @commands.command()
+    @commands.is_owner()
+    async def profile(self, ctx: commands.Context, seconds: float = 30.0, *names: str) -> None:
+        """Profile the bot for a number of seconds, optionally only the given app commands. E.g. "team join"."""
+        available: dict[str, app_commands.Command] = {
+            command.qualified_name: command for command in self.bot.tree.walk_commands()
+            if isinstance(command, app_commands.Command)
+        }
+
+        unknown: list[str] = [name for name in names if name not in available]
+        if unknown:
+            await ctx.send(f'Unknown app commands: `{", ".join(unknown)}`')
+            return
+
+        # Commands are traced, so the code we look for is the callback under the decorator...
+        scope: list[Any] = [inspect.unwrap(available[name].callback).__code__ for name in names]
+        await ctx.send(f'Profiling for `{seconds:g}s`{" (" + ", ".join(names) + ")" if names else ""}...')
+
+        try:
+            profile: universal.Profile = await self.bot.profiler.profile(seconds, name='bot', scope=scope)
+        except RuntimeError as e:
+            await ctx.send(str(e))
+            return
+
+        message: str = f'Wrote `{profile.path}` ({profile.kept}/{profile.samples} samples).'
+        if profile.path.stat().st_size < 8 * 1024 * 1024:
+            await ctx.send(message, file=discord.File(profile.path))
+        else:
+            await ctx.send(message)
+
 
 async def setup(bot: Bot) -> None:
     await bot.add_cog(Admin(bot))
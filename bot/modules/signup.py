@@ -23,11 +23,12 @@ SOFTWARE.
 """
 import asyncio
 import datetime
+import io
 import re
 import traceback
-from typing import Any, Union
+from collections.abc import Awaitable
+from typing import Any, Literal, NamedTuple, Union
 
-import aiohttp
 import asyncpg
 import discord
 from discord import app_commands
@@ -58,6 +59,25 @@ ERROR_CHANNEL: int = 1112358404992802906
 TEAM_ANNOUNCEMENTS_CHANNEL: int = ...
 
 
+# Every team role and channel name starts with this...
+TEAM_PREFIX: str = '\u2B50-'
+
+# How often (in seconds) a teardown edits its progress report. Interaction tokens only last 15 minutes...
+TEARDOWN_PROGRESS: float = 5.0
+TEARDOWN_REPORT_LIMIT: float = 14 * 60
+
+# How many reconcile fixes are committed to the outbox per transaction...
+RECONCILE_BATCH: int = 100
+
+
+NAME_TAKEN_MESSAGE: str = 'A team with the name: `{name}` already exists. Please try a new name and try again.'
+
+
+def is_name_taken(error: asyncpg.UniqueViolationError, /) -> bool:
+    """Whether a unique failure is from a team name constraint. E.g. teams_1_name_lower_idx on PostgreSQL."""
+    return '_name_' in (error.constraint_name or '')
+
+
 SIGNUP_MESSAGE: str = 'Please select your desired preferences from below:\n\n' \
                       '**1 - Timezone:** Your timezone to nearest hour.\n' \
                       '**2 - Languages:** The languages you would prefer to use (Up to 5).\n' \
@@ -113,29 +133,126 @@ def name_validator():
             message: str = 'Your team name can only contain letters, spaces, numbers and underscores.'
             raise NameViolationError(message)
 
-        teams: list[asyncpg.Record] = await interaction.client.database.fetch_teams()
-        team_names: list[str] = [t['name'].lower() for t in teams]
-
-        if name.lower() in team_names:
-            message: str = f'A team with the name: `{name}` already exists. Please try a new name and try again.'
-            raise NameViolationError(message)
+        # Only a fast pre-check, the database has the final say when the team is created...
+        if interaction.client.database.has_team_name(name):
+            raise NameViolationError(NAME_TAKEN_MESSAGE.format(name=name))
 
         return True
     return app_commands.check(predicate)
 
 
-async def update_backend(bot: Bot, /) -> None:
-    headers: dict[str, str] = {'Authorization': universal.CONFIG['TOKENS']['backend']}
-    url: str = 'https://codejam.timeenjoyed.dev/api/teams/update'
+def raise_first(results: list[Any], /) -> None:
+    """Raise the first exception in the results of asyncio.gather(..., return_exceptions=True), if any."""
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def delete_all(
+        bot: Bot,
+        objects: list[discord.Role | discord.abc.GuildChannel | None],
+        /,
+        *,
+        reason: str,
+        step: str
+) -> None:
+    """Concurrently delete the given roles and channels, recording the latency of each under '<step>.<kind>'.
+
+    Objects which are None (E.g. already deleted) are skipped. Failures are logged instead of raised,
+    so one failed delete does not prevent the others.
+    """
+    objects = [o for o in objects if o is not None]
+
+    def kind(obj: discord.Role | discord.abc.GuildChannel) -> str:
+        return 'role' if isinstance(obj, discord.Role) else str(obj.type)
+
+    async def delete(obj: discord.Role | discord.abc.GuildChannel) -> None:
+        route: str = 'delete_role' if isinstance(obj, discord.Role) else 'delete_channel'
+        call = bot.rest.call(obj.delete(reason=reason), route=route, bucket=obj.guild.id, lane=Lane.COMMAND)
+
+        await bot.timings.timed(f'{step}.{kind(obj)}', call)
+
+    results: list[Any] = await asyncio.gather(*(delete(o) for o in objects), return_exceptions=True)
+
+    for obj, result in zip(objects, results):
+        if isinstance(result, Exception) and not isinstance(result, discord.NotFound):
+            logger.warning(f'Unable to delete ({obj.id}): {result}')
+
+
+# Signup components carry the whole signup state in their custom_id, so nothing is held in memory per user...
+SIGNUP_PREFIX: str = 'SIGNUP'
+
+
+class SignupState(NamedTuple):
+    """The choices made so far in an in-progress Signup.
+
+    The state is encoded into the custom_id of every Signup component as ``<timezone>.<languages>.<preference>``,
+    with languages joined by ``-`` and unset fields left empty. E.g. ``12.1-2.0``.
+
+    Because every interaction sends the state back, signups survive restarts and abandoned forms cost nothing.
+    """
+
+    timezone: int | None = None
+    languages: tuple[int, ...] = ()
+    preference: int | None = None
+
+    def encode(self) -> str:
+        timezone: str = '' if self.timezone is None else str(self.timezone)
+        preference: str = '' if self.preference is None else str(self.preference)
 
-    try:
-        async with bot.session.post(url, headers=headers) as resp:
-            if resp.status != 200:
-                logger.warning(f'Unable to reach backend server. Failed with status code: {resp.status}')
-            else:
-                logger.info('Successfully updated backend server.')
-    except aiohttp.ClientConnectorError:
-        logger.warning('Unable to reach backend server. Fatal exception occurred.')
+        return f'{timezone}.{"-".join(map(str, self.languages))}.{preference}'
+
+    @classmethod
+    def decode(cls, raw: str, /) -> 'SignupState':
+        """Decode a state from a custom_id. Raises ValueError if the state is malformed."""
+        timezone, languages_, preference = raw.split('.')
+
+        state: SignupState = cls(
+            timezone=int(timezone) if timezone else None,
+            languages=tuple(int(l) for l in languages_.split('-') if l),
+            preference=int(preference) if preference else None
+        )
+
+        if state.timezone is not None and state.timezone not in timezones:
+            raise ValueError(f'Unknown timezone: {state.timezone}')
+
+        if any(l not in languages for l in state.languages) or len(state.languages) > 5:
+            raise ValueError(f'Unknown languages: {state.languages}')
+
+        if state.preference is not None and state.preference not in preferences:
+            raise ValueError(f'Unknown preference: {state.preference}')
+
+        return state
+
+    def select(self, field: str, values: list[str], /) -> 'SignupState':
+        """Return a new state with the values chosen in the given select menu."""
+        chosen: list[int] = [int(v) for v in values]
+
+        if field == 'TZSELECT':
+            return self._replace(timezone=chosen[0])
+        elif field == 'LANGSELECT':
+            return self._replace(languages=tuple(chosen))
+        elif field == 'SOLOSELECT':
+            return self._replace(preference=chosen[0])
+
+        raise ValueError(f'Unknown signup field: {field}')
+
+    @property
+    def complete(self) -> bool:
+        return self.timezone is not None and bool(self.languages) and self.preference is not None
+
+    def message(self) -> str:
+        timezone: str = '`Not Set`'
+        if self.timezone is not None:
+            timezone = f'`{timezones[self.timezone]["name"]}`'
+
+        solo: str = '`Not Set`'
+        if self.preference is not None:
+            solo = f'`{preferences[self.preference]["name"]}`'
+
+        languages_: str = '\n'.join(f'{languages[l]["emoji"]} - **`{languages[l]["name"]}`**' for l in self.languages)
+
+        return SIGNUP_MESSAGE.format(TIMEZONE=timezone, LANGUAGES=languages_ or '`Not Set`', PREFERENCES=solo)
 
 
 class SignupButtonSelect(discord.ui.Select):
@@ -153,6 +270,10 @@ class SignupButtonSelect(discord.ui.Select):
     /
     id_: str
         The menu type. 'TZSELECT', 'LANGSELECT', 'SOLOSELECT'.
+    state: SignupState
+        The current signup state. Encoded into the custom_id, and used to mark the already selected options.
+    selected: tuple[int, ...]
+        The values of this menu that have already been selected.
     placeholder: str
         The placeholder text for the select menu.
     row: int
@@ -161,98 +282,80 @@ class SignupButtonSelect(discord.ui.Select):
         The maximum amount of options that could be selected. Defaults to 1.
 
     Note: The select menus minimum selection is 1. This can not be changed.
+    Selections are handled by Signup.on_signup_interaction, not by a callback on this menu.
     """
 
-    def __init__(self, items: dict[Any, Any], /, *, id_: str, placeholder: str, row: int, max_selects: int = 1) -> None:
-        super().__init__(placeholder=placeholder, row=row, max_values=max_selects, min_values=1)
-
-        self._items = items
-        self._id = id_
-
-        self.selected_items: list[dict[Any, Any]] = []
-
-        for key, data in items.items():
-            self.add_option(label=data['name'], emoji=data['emoji'], value=str(data['value']))
-
-    async def callback(self, interaction: discord.Interaction) -> None:
-        """Coroutine called when a selection has been made."""
-        view: SignupSelectView = self.view
-
-        try:
-            timezone: str = f'{view.timezone_s.selected_items[0]["name"]}'
-        except IndexError:
-            timezone = '`Not Set`'
-
-        try:
-            solo: str = f'`{view.solo_s.selected_items[0]["name"]}`'
-        except IndexError:
-            solo = '`Not Set`'
-
-        languages: str = '\n'.join(f'{l["emoji"]} - **`{l["name"]}`**' for l in view.languages_s.selected_items)
-        if not languages:
-            languages = '`Not Set`'
-
-        self.selected_items = [self._items[int(v)] for v in self.values]
-
-        if self._id == 'TZSELECT':
-            timezone: str = f'`{self.selected_items[0]["name"]}`'
-        elif self._id == 'LANGSELECT':
-            languages: str = '\n'.join(f'{l["emoji"]} - **`{l["name"]}`**' for l in self.selected_items)
-        else:
-            solo: str = f'`{self.selected_items[0]["name"]}`'
-
-        # Resend the message with updated values...
-        message: str = SIGNUP_MESSAGE.format(TIMEZONE=timezone, LANGUAGES=languages, PREFERENCES=solo)
-        await interaction.response.edit_message(content=message, view=view)
-
-
-class SignupSelectView(discord.ui.View):
-    """Select View for Signups. This view holds the Select Menus."""
-
-    def __init__(self) -> None:
-        super().__init__(timeout=None)
-
-        self.all_done: bool = False
-
-        self.timezone_s = SignupButtonSelect(
-            timezones,
-            placeholder='Please select your timezone...',
-            row=0,
-            id_='TZSELECT'
-        )
-        self.languages_s = SignupButtonSelect(
-            languages,
-            placeholder='Please select your preferred languages...',
-            max_selects=5,
-            row=1,
-            id_='LANGSELECT'
-        )
-        self.solo_s = SignupButtonSelect(
-            preferences,
-            placeholder='Please select your team preferences...',
-            max_selects=1,
-            row=2,
-            id_='SOLOSELECT'
+    def __init__(
+            self,
+            items: dict[Any, Any],
+            /,
+            *,
+            id_: str,
+            state: SignupState,
+            selected: tuple[int, ...],
+            placeholder: str,
+            row: int,
+            max_selects: int = 1
+    ) -> None:
+        super().__init__(
+            custom_id=f'{SIGNUP_PREFIX}:{id_}:{state.encode()}',
+            placeholder=placeholder,
+            row=row,
+            max_values=max_selects,
+            min_values=1
         )
 
-        self.add_item(self.timezone_s)
-        self.add_item(self.languages_s)
-        self.add_item(self.solo_s)
+        for key, data in items.items():
+            self.add_option(
+                label=data['name'],
+                emoji=data['emoji'],
+                value=str(data['value']),
+                default=data['value'] in selected
+            )
 
-    @discord.ui.button(label='Confirm', style=discord.ButtonStyle.green, row=3)
-    async def confirm_button(self, interaction: discord.Interaction, button: discord.Button) -> None:
-        """Button pressed to confirm Select Menu choices."""
 
-        # Check all our children, E.g. each SignupButtonSelect; to see if they have been selected...
-        all_done: bool = all(s.selected_items for s in self.children if isinstance(s, SignupButtonSelect))
+def signup_select_view(state: SignupState, /) -> discord.ui.View:
+    """Build the Select View for Signups. This view holds the Select Menus and the Confirm button.
 
-        if all_done:
-            # All menus have had a selection... Stop the view and set all_done
-            self.all_done = True
-            self.stop()
-        else:
-            # Not all menus have been selected...
-            await interaction.response.send_message('Please finish selecting the required options.', ephemeral=True)
+    The view is stopped before it is returned, so discord.py never stores it.
+    Every component interaction is instead routed through Signup.on_signup_interaction by its custom_id.
+    """
+    view: discord.ui.View = discord.ui.View(timeout=None)
+
+    view.add_item(SignupButtonSelect(
+        timezones,
+        id_='TZSELECT',
+        state=state,
+        selected=() if state.timezone is None else (state.timezone,),
+        placeholder='Please select your timezone...',
+        row=0
+    ))
+    view.add_item(SignupButtonSelect(
+        languages,
+        id_='LANGSELECT',
+        state=state,
+        selected=state.languages,
+        placeholder='Please select your preferred languages...',
+        max_selects=5,
+        row=1
+    ))
+    view.add_item(SignupButtonSelect(
+        preferences,
+        id_='SOLOSELECT',
+        state=state,
+        selected=() if state.preference is None else (state.preference,),
+        placeholder='Please select your team preferences...',
+        row=2
+    ))
+    view.add_item(discord.ui.Button(
+        label='Confirm',
+        style=discord.ButtonStyle.green,
+        custom_id=f'{SIGNUP_PREFIX}:CONFIRM:{state.encode()}',
+        row=3
+    ))
+
+    view.stop()
+    return view
 
 
 class SignupView(discord.ui.View):
@@ -279,37 +382,87 @@ class SignupView(discord.ui.View):
     async def signup_button(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
         """Start the Signup process for the user.
 
-        This sends the SignupSelectView which holds all our select menus.
-        When the SignupSelectView has completed, enter the data into the database, and give them a role.
+        This sends the Select View which holds all our select menus.
+        Selections and the Confirm button are handled by Signup.on_signup_interaction.
         """
-        select_view: SignupSelectView = SignupSelectView()
+        state: SignupState = SignupState()
+        await interaction.response.send_message(content=state.message(), view=signup_select_view(state), ephemeral=True)
+
+
+class Signup(commands.Cog):
+    """Signup Cog. This holds all the Application Commands for the Signup/Management of the CodeJam."""
 
-        message: str = SIGNUP_MESSAGE.format(TIMEZONE='`Not Set`', LANGUAGES='`Not Set`', PREFERENCES='`Not Set`')
-        await interaction.response.send_message(content=message, view=select_view, ephemeral=True)
+    group = app_commands.Group(name="team", description="Team Management related commands")
+    jam = app_commands.Group(name="jam", description="CodeJam Manager commands")
 
-        await select_view.wait()
-        if not select_view.all_done:
+    def __init__(self, bot: Bot) -> None:
+        self.bot = bot
+
+        # Background work started by commands, referenced until done so it is not garbage collected...
+        self._tasks: set[asyncio.Task] = set()
+
+    async def cog_load(self) -> None:
+        self.bot.members.keep_roles.add(MANAGER_ID)
+        self.bot.backend.notify()
+
+        view: int = universal.CONFIG['BOT']['view']
+        if view == 0:
+            return
+
+        self.bot.add_view(SignupView(), message_id=view)
+
+    @commands.Cog.listener('on_interaction')
+    async def on_signup_interaction(self, interaction: discord.Interaction) -> None:
+        """Handle the stateless Signup select menus and Confirm button.
+
+        The custom_id is ``SIGNUP:<field>:<state>``. See SignupState for the state format.
+        Each selection re-renders the menus with the new state encoded, so no view is held between interactions.
+        """
+        if interaction.type is not discord.InteractionType.component:
+            return
+
+        custom_id: str = interaction.data.get('custom_id', '')
+        if not custom_id.startswith(f'{SIGNUP_PREFIX}:'):
+            return
+
+        try:
+            _, field, raw = custom_id.split(':', 2)
+            state: SignupState = SignupState.decode(raw)
+
+            if field != 'CONFIRM':
+                state = state.select(field, interaction.data.get('values', []))
+        except (ValueError, IndexError):
+            logger.warning(f'Received a malformed signup custom_id: {custom_id}')
+            await interaction.response.send_message('Something went wrong, please start again.', ephemeral=True)
+            return
+
+        if field == 'CONFIRM':
+            with command_span(self.bot.timings, 'signup confirm'):
+                await self.confirm_signup(interaction, state)
+        else:
+            await interaction.response.edit_message(content=state.message(), view=signup_select_view(state))
+
+    async def confirm_signup(self, interaction: discord.Interaction, state: SignupState, /) -> None:
+        """Enter the completed Signup into the database, and give the member a role."""
+        if not state.complete:
+            # Not all menus have been selected...
+            await interaction.response.send_message('Please finish selecting the required options.', ephemeral=True)
             return
 
         member: discord.Member = interaction.user
-        timezone: datetime.timedelta = select_view.timezone_s.selected_items[0]['delta']
-        languages: list[int] = [v['value'] for v in select_view.languages_s.selected_items]
-        solo: bool = select_view.solo_s.selected_items[0]['bool']
 
         try:
-            await interaction.client.database.create_member(
+            await self.bot.database.create_member(
                 member_id=member.id,
-                languages=languages,
-                timezone=timezone,
-                solo=solo
+                languages=list(state.languages),
+                timezone=timezones[state.timezone]['delta'],
+                solo=preferences[state.preference]['bool']
             )
         except asyncpg.UniqueViolationError:
-            await interaction.delete_original_response()
+            await interaction.response.edit_message(content='You are already signed up!', view=None)
             return
 
-        role: discord.Role = interaction.guild.get_role(ANNOUNCEMENTS_ID)
-        if role not in interaction.user.roles:
-            await interaction.user.add_roles(role)
+        self.bot.backend.notify()
 
         message: str = "You've Successfully registered for the CodeJam! Next up:\n\n" \
                        "**Creating teams:**\n" \
@@ -330,28 +483,17 @@ class SignupView(discord.ui.View):
                        "`/team join <code>` - Join a team with the provided invite code.\n" \
                        "`/team leave` - Leave your current team."
 
-        await interaction.delete_original_response()
-        await interaction.followup.send(message, ephemeral=True)
-
-        await update_backend(interaction.client)
-
-
-class Signup(commands.Cog):
-    """Signup Cog. This holds all the Application Commands for the Signup/Management of the CodeJam."""
-
-    group = app_commands.Group(name="team", description="Team Management related commands")
-
-    def __init__(self, bot: Bot) -> None:
-        self.bot = bot
+        await interaction.response.edit_message(content=message, view=None)
 
-    async def cog_load(self) -> None:
-        await update_backend(self.bot)
-
-        view: int = universal.CONFIG['BOT']['view']
-        if view == 0:
-            return
+        # Participants are kept in the member cache. This is a gateway request, so it is not awaited before replying...
+        task: asyncio.Task = asyncio.create_task(self.bot.members.ensure(interaction.guild, [member.id]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
 
-        self.bot.add_view(SignupView(), message_id=view)
+        role: discord.Role = interaction.guild.get_role(ANNOUNCEMENTS_ID)
+        if role not in member.roles:
+            call = member.add_roles(role)
+            await self.bot.rest.call(call, route='add_role', bucket=member.guild.id, lane=Lane.COMMAND)
 
     async def interaction_check(self, interaction: discord.Interaction, /) -> bool:
         """Global CodeJam command check.
@@ -457,6 +599,15 @@ class Signup(commands.Cog):
         team: list[asyncpg.Record] = await self.bot.database.fetch_team(team_id=member['team_id'])
         return team
 
+    async def reply(self, interaction: discord.Interaction, /, *args: Any, **kwargs: Any) -> discord.WebhookMessage:
+        """Send a followup to a deferred interaction, ahead of any background REST calls."""
+        return await self.bot.rest.call(
+            interaction.followup.send(*args, **kwargs),
+            route='followup',
+            bucket=interaction.id,
+            lane=Lane.INTERACTION
+        )
+
     async def create_team_(self, interaction: discord.Interaction, name: str, owner: discord.Member) -> CTeamPayload:
         """Create a CodeJam Team. This should only be called via the App Command.
 
@@ -472,50 +623,111 @@ class Signup(commands.Cog):
         Returns
         -------
         CTeamPayload
+
+        Raises
+        ------
+        asyncpg.UniqueViolationError
+            Another team was created with this name (see is_name_taken), or this owner, concurrently.
+            Nothing is left behind.
+
+        Any other failure is re-raised too, after whatever had already been created is rolled back.
+        The role is created first, as the channel permissions need it. Independent steps then run concurrently.
         """
         category: discord.CategoryChannel = interaction.guild.get_channel(CODEJAM_CATEGORY)
         reason: str = f'CodeJam Team Creation: ({owner})'
+        timings: Timings = self.bot.timings
+        guild: int = interaction.guild.id
 
-        # Create Team Role...
-        role: discord.Role = await interaction.guild.create_role(name=f'\u2B50-{name}', colour=0xF0B7B1, reason=reason)
-
-        # Channel Permissions...
-        overwrites = {
-            interaction.guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            interaction.guild.me: discord.PermissionOverwrite(read_messages=True),
-            interaction.guild.get_role(MANAGER_ID): discord.PermissionOverwrite(
-                read_messages=True,
-                send_messages=True,
-                manage_messages=True,
-                manage_channels=True
-            ),
-            role: discord.PermissionOverwrite(read_messages=True)
-        }
-
-        # Create appropriate Team Channels...
-        cname: str = f'\u2B50-{name}'
-        text: discord.TextChannel = await category.create_text_channel(cname, reason=reason, overwrites=overwrites)
-        voice: discord.VoiceChannel = await category.create_voice_channel(cname, reason=reason, overwrites=overwrites)
-
-        # ADd Team to Database...
-        row: asyncpg.Record = await interaction.client.database.create_team(
-            name=name,
-            owner=owner.id,
-            role_id=role.id,
-            text_id=text.id,
-            voice_id=voice.id
-        )
+        def rest(awaitable: Awaitable[Any], route: str) -> Awaitable[Any]:
+            # The member is waiting on these before we can reply...
+            return self.bot.rest.call(awaitable, route=route, bucket=guild, lane=Lane.COMMAND)
 
-        # The member needs to have their new team id assigned...
-        await self.bot.database.edit_member_team(member_id=owner.id, team_id=row['team_id'])
+        # Everything created so far, so it can be undone if a later step fails...
+        created: list[discord.Role | discord.abc.GuildChannel] = []
+        row: asyncpg.Record | None = None
 
-        # Add role to creator...
-        await owner.add_roles(role, reason=reason)
+        try:
+            with timings.time('team_create'):
+                # The channels need the role for their permissions, so the role has to be created first...
+                call = interaction.guild.create_role(name=f'\u2B50-{name}', colour=0xF0B7B1, reason=reason)
+                role: discord.Role = await timings.timed('team_create.role', rest(call, 'create_role'))
+                created.append(role)
+
+                # Channel Permissions...
+                overwrites = {
+                    interaction.guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                    interaction.guild.me: discord.PermissionOverwrite(read_messages=True),
+                    interaction.guild.get_role(MANAGER_ID): discord.PermissionOverwrite(
+                        read_messages=True,
+                        send_messages=True,
+                        manage_messages=True,
+                        manage_channels=True
+                    ),
+                    role: discord.PermissionOverwrite(read_messages=True)
+                }
+
+                # Create appropriate Team Channels... These do not depend on each other, so create them together.
+                cname: str = f'\u2B50-{name}'
+                text_call = category.create_text_channel(cname, reason=reason, overwrites=overwrites)
+                voice_call = category.create_voice_channel(cname, reason=reason, overwrites=overwrites)
+
+                channels: list[Any] = await asyncio.gather(
+                    timings.timed('team_create.text', rest(text_call, 'create_channel')),
+                    timings.timed('team_create.voice', rest(voice_call, 'create_channel')),
+                    return_exceptions=True
+                )
+                created.extend(c for c in channels if not isinstance(c, BaseException))
+                raise_first(channels)
+
+                text: discord.TextChannel = channels[0]
+                voice: discord.VoiceChannel = channels[1]
+
+                # Add Team to Database...
+                row = await timings.timed('team_create.database', self.bot.database.create_team(
+                    name=name,
+                    owner=owner.id,
+                    role_id=role.id,
+                    text_id=text.id,
+                    voice_id=voice.id
+                ))
+
+                # The member needs to have their new team id assigned, and the role added...
+                results: list[Any] = await asyncio.gather(
+                    timings.timed(
+                        'team_create.member',
+                        self.bot.database.edit_member_team(member_id=owner.id, team_id=row['team_id'])
+                    ),
+                    timings.timed('team_create.add_role', rest(owner.add_roles(role, reason=reason), 'add_role')),
+                    return_exceptions=True
+                )
+                raise_first(results)
+        except Exception:
+            # Undo whatever was created before the failure. E.g. another team took this name since it was validated...
+            await self.rollback_team_(created, row, reason=reason)
+            raise
 
         # Send back Team Creation Payload...
         data: CTeamPayload = {'role': role, 'text': text, 'voice': voice, 'team': row}
         return data
 
+    async def rollback_team_(
+            self,
+            created: list[discord.Role | discord.abc.GuildChannel],
+            row: asyncpg.Record | None,
+            /,
+            *,
+            reason: str
+    ) -> None:
+        """Undo a partially created team. Failures are logged, so every step is still attempted."""
+        with self.bot.timings.time('team_create.rollback'):
+            if row is not None:
+                try:
+                    await self.bot.database.delete_team(team_id=row['team_id'])
+                except Exception as e:
+                    logger.warning(f'Unable to remove team ({row["team_id"]}) during rollback: {e}')
+
+            await delete_all(self.bot, created, reason=reason, step='team_create.rollback')
+
     """
     async def change_name_(self, interaction: discord.Interaction, name: str, owner: discord.Member) -> asyncpg.Record:
         reason: str = f'CodeJam Team Edit: ({owner})'
@@ -537,6 +749,7 @@ class Signup(commands.Cog):
     @group.command(name='create', description='Create a team for the CodeJam')
     @app_commands.checks.cooldown(1, 60 * 60)
     @name_validator()
+    @traced
     async def create_team(self, interaction: discord.Interaction, *, name: str) -> None:
         """Command for '/team create'
 
@@ -545,18 +758,27 @@ class Signup(commands.Cog):
         # Since we have to call the database a few times, defer this command...
         await interaction.response.defer(ephemeral=True, thinking=True)
 
-        member: asyncpg.Record = await self.bot.database.fetch_member(member_id=interaction.user.id)
+        # We are about to write based on this member, so read our own writes from the primary...
+        member: asyncpg.Record = await self.bot.database.fetch_member(member_id=interaction.user.id, primary=True)
         if interaction.user.get_role(MANAGER_ID) and not member:
-            await interaction.followup.send('You are unable to create a team until you register.', ephemeral=True)
+            await self.reply(interaction, 'You are unable to create a team until you register.', ephemeral=True)
             return
 
         if member['team_id']:
             message: str = 'You can not create a team because you are already in one. Please use `/team leave` first.'
 
-            await interaction.followup.send(message, ephemeral=True)
+            await self.reply(interaction, message, ephemeral=True)
             return
 
-        payload: CTeamPayload = await self.create_team_(interaction=interaction, name=name, owner=interaction.user)
+        try:
+            payload: CTeamPayload = await self.create_team_(interaction=interaction, name=name, owner=interaction.user)
+        except asyncpg.UniqueViolationError as e:
+            # Any other constraint (E.g. the owner, after a concurrent create) is a real failure...
+            if not is_name_taken(e):
+                raise
+
+            await self.reply(interaction, NAME_TAKEN_MESSAGE.format(name=name), ephemeral=True)
+            return
 
         message: str = f'{payload["role"].mention}\n' \
                        f'Successfully created the team: `{name}`\n\n' \
@@ -573,18 +795,29 @@ class Signup(commands.Cog):
                        f'`/team leave` - Leave this team.\n\n' \
                        f'Please note there are very strict rate limits on creating and leaving teams.'
 
-        # Send this message to the newly created team channel...
-        # Pin the message...
-        response: discord.Message = await payload['text'].send(message)
-        await response.pin(reason=f'CodeJam Team Creation: ({interaction.user})')
+        # Send this message to the newly created team channel, and pin it...
+        welcome: universal.Job = universal.Job(
+            'send_message',
+            {
+                'channel_id': payload['text'].id,
+                'content': message,
+                'pin': True,
+                'reason': f'CodeJam Team Creation: ({interaction.user})'
+            },
+            key=f'{interaction.id}:welcome'
+        )
+
+        await self.bot.database.enqueue_jobs([welcome])
+        self.bot.outbox.notify()
 
         # We need to send this in order for the command to know it's done...
-        await interaction.followup.send('Successfully created team!', ephemeral=True)
+        await self.reply(interaction, 'Successfully created team!', ephemeral=True)
 
-        await update_backend(self.bot)
+        self.bot.backend.notify()
 
     @group.command(name='leave', description='Leave your current CodeJam team')
     @app_commands.checks.cooldown(1, 60 * 60)
+    @traced
     async def leave_team(self, interaction: discord.Interaction) -> None:
         """Command for '/team leave'
 
@@ -593,40 +826,57 @@ class Signup(commands.Cog):
         # Since we have to call the database a few times, defer this command...
         await interaction.response.defer(ephemeral=True, thinking=True)
 
-        member: asyncpg.Record = await self.bot.database.fetch_member(member_id=interaction.user.id)
+        # We are about to write based on this member, so read our own writes from the primary...
+        member: asyncpg.Record = await self.bot.database.fetch_member(member_id=interaction.user.id, primary=True)
         if interaction.user.get_role(MANAGER_ID) and not member:
-            await interaction.followup.send('You are unable to leave a team until you register.', ephemeral=True)
+            await self.reply(interaction, 'You are unable to leave a team until you register.', ephemeral=True)
             return
 
         if not member['team_id']:
             message: str = 'You can not leave a team because you are not already in one.'
 
-            await interaction.followup.send(message, ephemeral=True)
+            await self.reply(interaction, message, ephemeral=True)
             return
 
-        team_members: list[asyncpg.Record] = await self.bot.database.fetch_team(team_id=member['team_id'])
+        team_members: list[asyncpg.Record] = await self.bot.database.fetch_team(
+            team_id=member['team_id'],
+            primary=True
+        )
         team: asyncpg.Record = team_members[0]
 
+        # Discord side effects are committed with the database change, and run by the outbox workers...
         if len(team_members) == 1:
-            role: discord.Role = interaction.guild.get_role(team['role_id'])
-            text: discord.TextChannel = interaction.guild.get_channel(team['text_id'])
-            voice: discord.VoiceChannel = interaction.guild.get_channel(team['voice_id'])
-
-            # Delete the team from the database...
-            await self.bot.database.delete_team(team_id=team['team_id'])
-
-            # Delete all associated channels and roles with the team...
             reason: str = f'CodeJam Team Deletion: ({interaction.user})'
-            await role.delete(reason=reason)
-            await text.delete(reason=reason)
-            await voice.delete(reason=reason)
+            guild: int = interaction.guild.id
+
+            jobs: list[universal.Job] = [
+                universal.Job(
+                    'delete_role',
+                    {'guild_id': guild, 'role_id': team['role_id'], 'reason': reason},
+                    key=f'{interaction.id}:delete_role'
+                ),
+                universal.Job(
+                    'delete_channel',
+                    {'guild_id': guild, 'channel_id': team['text_id'], 'reason': reason},
+                    key=f'{interaction.id}:delete_text'
+                ),
+                universal.Job(
+                    'delete_channel',
+                    {'guild_id': guild, 'channel_id': team['voice_id'], 'reason': reason},
+                    key=f'{interaction.id}:delete_voice'
+                )
+            ]
+
+            # Delete the team from the database, along with all associated channels and roles...
+            await self.bot.database.delete_team(team['team_id'], jobs=jobs)
+            self.bot.outbox.notify()
 
             try:
-                await interaction.followup.send(f'Successfully left the team: `{team["name"]}`')
+                await self.reply(interaction, f'Successfully left the team: `{team["name"]}`')
             except discord.HTTPException:
                 pass
 
-            await update_backend(self.bot)
+            self.bot.backend.notify()
 
             return
 
@@ -635,25 +885,38 @@ class Signup(commands.Cog):
             new: int = [m['member_id'] for m in team_members if m['member_id'] != interaction.user.id][0]
             await self.bot.database.edit_team_owner(member_id=new, team_id=member['team_id'])
 
-        # Get role and remove it...
-        role: discord.Role = interaction.guild.get_role(team['role_id'])
-        await interaction.user.remove_roles(role, reason=f'CodeJam Team Leave: ({interaction.user})')
-
-        # Remove team from this member...
-        await self.bot.database.edit_member_team(member_id=interaction.user.id, team_id=None)
+        jobs: list[universal.Job] = [
+            universal.Job(
+                'remove_role',
+                {
+                    'guild_id': interaction.guild.id,
+                    'member_id': interaction.user.id,
+                    'role_id': team['role_id'],
+                    'reason': f'CodeJam Team Leave: ({interaction.user})'
+                },
+                key=f'{interaction.id}:remove_role'
+            ),
+            universal.Job(
+                'send_message',
+                {'channel_id': team['text_id'], 'content': f'{interaction.user.mention} just left the team.'},
+                key=f'{interaction.id}:notify'
+            )
+        ]
 
-        channel: discord.TextChannel = interaction.guild.get_channel(team['text_id'])
-        await channel.send(f'{interaction.user.mention} just left the team.')
+        # Remove team from this member, then remove their role and notify the team...
+        await self.bot.database.edit_member_team(member_id=interaction.user.id, team_id=None, jobs=jobs)
+        self.bot.outbox.notify()
 
         try:
-            await interaction.followup.send(f'Successfully left the team: `{team["name"]}`')
+            await self.reply(interaction, f'Successfully left the team: `{team["name"]}`')
         except discord.HTTPException:
             pass
 
-        await update_backend(self.bot)
+        self.bot.backend.notify()
 
     @group.command(name='join', description='Join a CodeJam team with an invite code')
     @app_commands.checks.cooldown(3, 60 * 10)
+    @traced
     async def join_team(self, interaction: discord.Interaction, *, code: str) -> None:
         """Command for '/team join'
 
@@ -662,42 +925,63 @@ class Signup(commands.Cog):
         # Since we need to call the database a few times we should defer this command...
         await interaction.response.defer(ephemeral=True, thinking=True)
 
-        member: asyncpg.Record = await self.bot.database.fetch_member(member_id=interaction.user.id)
+        # We are about to write based on this member, so read our own writes from the primary...
+        member: asyncpg.Record = await self.bot.database.fetch_member(member_id=interaction.user.id, primary=True)
         if interaction.user.get_role(MANAGER_ID) and not member:
-            await interaction.followup.send('You are unable to join a team until you register.')
+            await self.reply(interaction, 'You are unable to join a team until you register.')
             return
 
         if member['team_id']:
             message: str = 'You can not join a team because you are already in one. Please use `/team leave` first.'
-            await interaction.followup.send(message, ephemeral=True)
+            await self.reply(interaction, message, ephemeral=True)
             return
 
         team: list[asyncpg.Record] = await self.bot.database.fetch_team(invite=code)
         if not team:
             message: str = f'The code: `{code}` is invalid or does not match any current team.'
-            await interaction.followup.send(message, ephemeral=True)
+            await self.reply(interaction, message, ephemeral=True)
             return
 
-        # Update the database...
         team: asyncpg.Record = team[0]
-        await self.bot.database.edit_member_team(member_id=interaction.user.id, team_id=team['team_id'])
 
-        # Give the team role to our new team member, so they can see channels etc...
-        role: discord.Role = interaction.guild.get_role(team['role_id'])
-        await interaction.user.add_roles(role, reason=f'CodeJam Team Joined: ({interaction.user})')
+        # Give the team role to our new team member, so they can see channels etc... And let the team know.
+        jobs: list[universal.Job] = [
+            universal.Job(
+                'add_role',
+                {
+                    'guild_id': interaction.guild.id,
+                    'member_id': interaction.user.id,
+                    'role_id': team['role_id'],
+                    'reason': f'CodeJam Team Joined: ({interaction.user})'
+                },
+                key=f'{interaction.id}:add_role'
+            ),
+            universal.Job(
+                'send_message',
+                {
+                    'channel_id': team['text_id'],
+                    'content': f'{interaction.user.mention} has just joined the team.',
+                    'silent': True
+                },
+                key=f'{interaction.id}:notify'
+            )
+        ]
 
-        # Channels for mentioning...
-        text: discord.TextChannel = interaction.guild.get_channel(team['text_id'])
-        voice: discord.VoiceChannel = interaction.guild.get_channel(team['voice_id'])
+        # Update the database... The jobs are committed with it, and run by the outbox workers.
+        await self.bot.database.edit_member_team(member_id=interaction.user.id, team_id=team['team_id'], jobs=jobs)
+        self.bot.outbox.notify()
 
-        message: str = f'Successfully joined the team: `{team["name"]}`\n\n**Channels:**\n{text.mention}\n{voice.mention}'
-        await interaction.followup.send(message, ephemeral=True)
+        # Channels for mentioning...
+        text: str = f'<#{team["text_id"]}>'
+        voice: str = f'<#{team["voice_id"]}>'
 
-        await text.send(f'{interaction.user.mention} has just joined the team.', silent=True)
+        message: str = f'Successfully joined the team: `{team["name"]}`\n\n**Channels:**\n{text}\n{voice}'
+        await self.reply(interaction, message, ephemeral=True)
 
-        await update_backend(self.bot)
+        self.bot.backend.notify()
 
     @group.command(name='invite', description='Generate an invite for someone to join your team')
+    @traced
     async def invite(self, interaction: discord.Interaction) -> None:
         """Command for '/team invite'
 
@@ -807,6 +1091,7 @@ class Signup(commands.Cog):
 
     @app_commands.command(name='error', description='Fetch an error from the Error Log.')
     @is_manager()
+    @traced
     async def fetch_error(self, interaction: discord.Interaction, *, identifier: int) -> None:
         """Command for '/error'
 
@@ -818,7 +1103,7 @@ class Signup(commands.Cog):
             await interaction.response.send_message(f'No error with id: `{identifier}` could be found.', ephemeral=True)
             return
 
-        invoker: discord.Member = interaction.guild.get_member(log['invoker'])
+        invoker: discord.Member | None = await self.bot.members.get(interaction.guild, log['invoker'])
         channel: discord.TextChannel | discord.VoiceChannel = interaction.guild.get_channel(log['channel'])
         tb: str = log['traceback'].replace('```', '')
         timestamp: str = discord.utils.format_dt(log['created'], style='F')
@@ -835,6 +1120,262 @@ class Signup(commands.Cog):
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    def teardown_jobs(
+            self,
+            guild: discord.Guild,
+            teams: list[asyncpg.Record],
+            /,
+            *,
+            mode: Literal['delete', 'archive'],
+            reason: str,
+            key: str
+    ) -> tuple[dict[int, list[universal.Job]], list[universal.Job]]:
+        """Plan the outbox jobs of a teardown.
+
+        Returns the jobs for each team (by team_id), and the jobs for orphaned team roles and channels.
+        Orphans are roles and channels named like a team, which no team in the database owns.
+        E.g. left behind by a partial failure.
+
+        Archiving keeps the text channels. Once the team role is deleted only managers can see them.
+        """
+        def role_job(role_id: int) -> universal.Job:
+            return universal.Job(
+                'delete_role',
+                {'guild_id': guild.id, 'role_id': role_id, 'reason': reason},
+                key=f'{key}:role:{role_id}'
+            )
+
+        def channel_job(channel_id: int) -> universal.Job:
+            return universal.Job(
+                'delete_channel',
+                {'guild_id': guild.id, 'channel_id': channel_id, 'reason': reason},
+                key=f'{key}:channel:{channel_id}'
+            )
+
+        jobs: dict[int, list[universal.Job]] = {}
+        owned: set[int] = set()
+
+        for team in teams:
+            owned.update((team['role_id'], team['text_id'], team['voice_id']))
+
+            jobs[team['team_id']] = [role_job(team['role_id']), channel_job(team['voice_id'])]
+            if mode == 'delete':
+                jobs[team['team_id']].append(channel_job(team['text_id']))
+
+        orphans: list[universal.Job] = []
+        for role in guild.roles:
+            if role.name.startswith(TEAM_PREFIX) and role.id not in owned:
+                orphans.append(role_job(role.id))
+
+        category: discord.CategoryChannel | None = guild.get_channel(CODEJAM_CATEGORY)
+        for channel in category.channels if category else []:
+            if not channel.name.startswith(TEAM_PREFIX) or channel.id in owned:
+                continue
+
+            if mode == 'delete' or isinstance(channel, discord.VoiceChannel):
+                orphans.append(channel_job(channel.id))
+
+        return jobs, orphans
+
+    @app_commands.command(name='stats', description='Show how long CodeJam commands have been taking.')
+    @is_manager()
+    @traced
+    async def stats(self, interaction: discord.Interaction) -> None:
+        """Command for '/stats'
+
+        Shows p50/p95/p99 (in milliseconds) of every traced command from its most recent runs,
+        split into database, Discord REST and other time (E.g. defer and replies).
+        """
+        totals: list[str] = [step for step in self.bot.timings.steps() if step.startswith('cmd.')]
+        names: list[str] = [step[4:-6] for step in totals if step.endswith('.total')]
+
+        if not names:
+            await interaction.response.send_message('No commands have been run yet.', ephemeral=True)
+            return
+
+        lines: list[str] = [f'{"":<6} {"p50":>8} {"p95":>8} {"p99":>8}']
+        for name in names:
+            runs: int = len(self.bot.timings.samples(f'cmd.{name}.total'))
+            lines.append(f'\n/{name} ({runs} runs)')
+
+            for part in SPAN_PARTS:
+                values: list[float] = self.bot.timings.percentiles(f'cmd.{name}.{part}', 50, 95, 99)
+                lines.append(f'{part:<6} ' + ' '.join(f'{v * 1000:>8.1f}' for v in values))
+
+        content: str = '\n'.join(lines)
+        if len(content) > 1900:
+            file: discord.File = discord.File(io.BytesIO(content.encode()), filename='stats.txt')
+            await interaction.response.send_message('**Command latency (ms)**', file=file, ephemeral=True)
+        else:
+            await interaction.response.send_message(f'**Command latency (ms)**\n```\n{content}\n```', ephemeral=True)
+
+    @jam.command(name='teardown', description='Remove the roles, channels and teams of every CodeJam team')
+    @app_commands.describe(
+        mode='delete removes everything. archive keeps text channels (managers only) and the team rows.',
+        concurrency='How many teams are written to the database at once. The outbox workers do the Discord deletes.'
+    )
+    @is_manager()
+    @traced
+    async def teardown(
+            self,
+            interaction: discord.Interaction,
+            mode: Literal['delete', 'archive'] = 'delete',
+            concurrency: app_commands.Range[int, 1, 50] = 10
+    ) -> None:
+        """Command for '/jam teardown'
+
+        Queues the deletion of every team role and channel (and team row, when deleting) as outbox jobs,
+        which the outbox workers run with retries. concurrency only bounds the database writes queueing them, the
+        Discord deletes are bounded by the outbox workers and the RestScheduler's background lane.
+        Progress of this run's jobs is reported by editing the reply, including any team which failed to queue.
+
+        This is resumable. The teardown is planned from what is left in the database and the guild,
+        so running it again after an interruption only queues what remains, and retries anything that failed.
+        """
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        reason: str = f'CodeJam Teardown: ({interaction.user})'
+        teams: list[asyncpg.Record] = await self.bot.database.fetch_teams(primary=True)
+
+        jobs, orphans = self.teardown_jobs(interaction.guild, teams, mode=mode, reason=reason, key=f'{interaction.id}')
+        queued: int = 0
+
+        # Every job of this run has a key starting with this, so older jobs are not counted...
+        prefix: str = f'{interaction.id}:'
+
+        # Teams whose database write failed. They are reported as they fail, instead of once every team is queued...
+        failed: list[int] = []
+
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+
+        async def queue(team_id: int, team_jobs: list[universal.Job]) -> None:
+            nonlocal queued
+
+            try:
+                async with semaphore:
+                    if mode == 'delete':
+                        # The row and its jobs are committed together, so a resumed teardown never loses either...
+                        await self.bot.database.delete_team(team_id, jobs=team_jobs)
+                    else:
+                        await self.bot.database.enqueue_jobs(team_jobs)
+            except Exception as e:
+                # Nothing of this team was committed, so running the teardown again picks it up...
+                logger.warning(f'Unable to queue the teardown of team ({team_id}): {e!r}')
+                failed.append(team_id)
+                return
+
+            queued += 1
+            self.bot.outbox.notify()
+
+        async def progress(final: bool = False) -> None:
+            depth: dict[str, int] = await self.bot.outbox.depth(prefix=prefix)
+            status: str = 'complete' if final else 'running'
+
+            message: str = f'**Teardown ({mode}) {status}**\n' \
+                           f'Teams queued: `{queued}/{len(jobs)}` | `{len(failed)}` failed to queue\n' \
+                           f'Orphaned roles and channels queued: `{len(orphans)}`\n' \
+                           f'Outbox: `{depth["pending"]}` pending | `{depth["running"]}` running | ' \
+                           f'`{depth["failed"]}` failed'
+
+            if final and (depth['failed'] or failed):
+                message += '\n\nSome jobs failed. Run this command again to retry what is left.'
+            elif failed:
+                message += '\n\nSome teams failed to queue. Run this command again once it finishes to retry them.'
+
+            await self.bot.rest.call(
+                interaction.edit_original_response(content=message),
+                route='followup',
+                bucket=interaction.id,
+                lane=Lane.INTERACTION
+            )
+
+        await self.bot.database.enqueue_jobs(orphans)
+        tasks: asyncio.Future = asyncio.gather(*(queue(id_, team_jobs) for id_, team_jobs in jobs.items()))
+
+        started: float = asyncio.get_running_loop().time()
+        while asyncio.get_running_loop().time() - started < TEARDOWN_REPORT_LIMIT:
+            await asyncio.sleep(TEARDOWN_PROGRESS)
+
+            depth: dict[str, int] = await self.bot.outbox.depth(prefix=prefix)
+            if tasks.done() and not depth['pending'] and not depth['running']:
+                break
+
+            await progress()
+        else:
+            message: str = 'This teardown is still running in the background. Use `??outbox` to follow it, ' \
+                           'or run this command again once it has finished to check nothing is left.'
+            await self.reply(interaction, message, ephemeral=True)
+
+            # Jobs are still pending, and the interaction token is about to expire, so there is no final report...
+            await tasks
+            self.bot.backend.notify()
+            return
+
+        await tasks
+        await progress(final=True)
+
+        self.bot.backend.notify()
+
+    @jam.command(name='reconcile', description='Find and fix differences between the database and Discord')
+    @app_commands.describe(dry_run='Only report the differences, without fixing anything. Defaults to True.')
+    @is_manager()
+    @traced
+    async def reconcile_(self, interaction: discord.Interaction, dry_run: bool = True) -> None:
+        """Command for '/jam reconcile'
+
+        Loads both sides in bulk (every member and team, and a snapshot of the guild roles, channels and members)
+        and compares them in memory. Fixes are committed to the outbox in batches, and run by the outbox workers.
+        A full report is attached either way.
+        """
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        guild: discord.Guild = interaction.guild
+
+        # Role holders need every member of the guild. They are requested without filling the member cache...
+        guild_members: list[discord.Member] = guild.members if guild.chunked else await guild.chunk(cache=False)
+
+        with self.bot.timings.time('reconcile.snapshot'):
+            members: list[asyncpg.Record] = await self.bot.database.fetch_members(primary=True)
+            teams: list[asyncpg.Record] = await self.bot.database.fetch_teams(primary=True)
+            category: discord.CategoryChannel | None = guild.get_channel(CODEJAM_CATEGORY)
+
+            drift: Drift = reconcile(
+                members,
+                teams,
+                roles={role.id: role.name for role in guild.roles},
+                channels={channel.id: channel.name for channel in guild.channels},
+                category={channel.id for channel in category.channels} if category else set(),
+                holders={member.id: {role.id for role in member.roles} for member in guild_members},
+                prefix=TEAM_PREFIX
+            )
+
+        queued: int = 0
+        if not dry_run:
+            reason: str = f'CodeJam Reconcile: ({interaction.user})'
+            jobs: list[universal.Job] = drift.jobs(guild_id=guild.id, reason=reason, key=f'{interaction.id}')
+
+            for start in range(0, len(jobs), RECONCILE_BATCH):
+                await self.bot.database.enqueue_jobs(jobs[start:start + RECONCILE_BATCH])
+                self.bot.outbox.notify()
+
+            queued = len(jobs)
+
+        message: str = f'**Reconcile {"(dry run)" if dry_run else "applied"}**\n' \
+                       f'Members missing their team role: `{len(drift.add_roles)}`\n' \
+                       f'Members holding another team role: `{len(drift.remove_roles)}`\n' \
+                       f'Orphaned team roles: `{len(drift.orphan_roles)}`\n' \
+                       f'Orphaned team channels: `{len(drift.orphan_channels)}`\n' \
+                       f'Teams missing their role: `{len(drift.missing_roles)}`\n' \
+                       f'Team channels missing: `{len(drift.missing_channels)}`\n' \
+                       f'Registered members no longer in the server: `{len(drift.departed)}`\n\n'
+
+        if dry_run:
+            message += f'Run with `dry_run: False` to fix `{drift.fixable}` differences.'
+        else:
+            message += f'Queued `{queued}` fixes. Use `??outbox` to follow them.'
+
+        report: discord.File = discord.File(io.BytesIO(drift.report().encode()), filename='reconcile.txt')
+        await self.reply(interaction, message, file=report, ephemeral=True)
+
     @commands.command()
     @commands.is_owner()
     async def send_signup(self, ctx: commands.Context) -> None:
@@ -1,4 +1,5 @@
 const feed = new EventSource('https://codejam.timeenjoyed.dev/api/teams/feed_event');
+const summaryUrl = 'https://codejam.timeenjoyed.dev/api/teams/summary';
 
 const langs = {
     0: 'No Preference',
@@ -24,6 +25,9 @@ const langs = {
 
 let memberContainerWatches = [];
 
+// team name -> summary from the server (member counts, all solo), kept when a fetch fails
+let teamSummaries = {};
+
 window.addEventListener('resize', resizeHandler);
 window.addEventListener('load', () => {
     resizeHandler();
@@ -153,11 +157,30 @@ function updateLookingForGroupData(data) {
     }
 }
 
-function isTeamAllSolo(team) {
-    return team.reduce((acc, curr) => acc && curr['solo'], true);
+// the server keeps team level facts up to date, so they don't have to be recomputed from every member per event
+async function fetchTeamSummaries() {
+    try {
+        const response = await fetch(summaryUrl);
+        if (!response.ok) {
+            throw new Error(`status ${response.status}`);
+        }
+
+        let summaries = {};
+        for (let summary of await response.json()) {
+            summaries[summary['name']] = summary;
+        }
+        teamSummaries = summaries;
+    } catch (e) {
+        console.error('Unable to fetch team summaries:', e);
+    }
+    return teamSummaries;
+}
+
+function isAllSoloTeam(summaries, team) {
+    return summaries[team] !== undefined && summaries[team]['all_solo'];
 }
 
-function updateTeamData(data) {
+function updateTeamData(data, summaries) {
     const container = document.querySelector('.teamsInnerContainer');
     container.innerHTML = '';
 
@@ -166,8 +189,7 @@ function updateTeamData(data) {
 
         if ((team !== "None") && (team !== "CodeJam Managers")) {
             // teams that consist of only one member that's a "solo" member, doesn't count as a team
-            let allSoloTeam = isTeamAllSolo(members);
-            if (!allSoloTeam) {
+            if (!isAllSoloTeam(summaries, team)) {
                 const teamDiv = document.createElement('div');
                 teamDiv.className = 'teamContainer';
                 teamDiv.insertAdjacentHTML('beforeend', `<header>${team}</header>`);
@@ -180,7 +202,7 @@ function updateTeamData(data) {
     }
 }
 
-function updateSoloData(data) {
+function updateSoloData(data, summaries) {
     const container = document.querySelector('.soloInnerContainer');
     container.innerHTML = '';
 
@@ -191,11 +213,7 @@ function updateSoloData(data) {
             continue;
         }
 
-        let allSoloTeam = true;
-        if (team !== "None") {
-            allSoloTeam = isTeamAllSolo(members);
-        }
-        if (allSoloTeam) {
+        if ((team === "None") || isAllSoloTeam(summaries, team)) {
             for (let member of members) {
                 if (member['solo'] === true) {
                     createMemberContainer(container, member);
@@ -220,36 +238,33 @@ function updateCodeJamManagers(data) {
     }
 }
 
-function updateStats(data) {
+function updateStats(data, summaries) {
     let stats = document.querySelector('#stats');
     let teamMemberCount = 0;
     let teamCount = 0;
     let lfgCount = 0;
     let soloCount = 0;
 
-    for (let team in data) {
+    for (let team in summaries) {
         if (team === 'CodeJam Managers') {
             continue;
         }
-        const members = data[team];
-        if (isTeamAllSolo(members)) {
-            soloCount += 1;
+        const summary = summaries[team];
+        if (summary['all_solo']) {
+            soloCount += summary['members'];
             continue;
         }
-        if (team !== 'None') {
-            teamCount += 1;
-        }
+        teamCount += 1;
+        soloCount += summary['solo'];
+        teamMemberCount += summary['members'] - summary['solo'];
+    }
 
-        for (let member of members) {
-            if (member['solo'] === true) {
-                soloCount += 1;
-            } else {
-                if (team === 'None') {
-                    lfgCount += 1;
-                } else {
-                    teamMemberCount += 1;
-                }
-            }
+    // members without a team have no summary
+    for (let member of data['None'] || []) {
+        if (member['solo'] === true) {
+            soloCount += 1;
+        } else {
+            lfgCount += 1;
         }
     }
     let totalCount = teamMemberCount + lfgCount + soloCount;
@@ -281,13 +296,22 @@ function fadeInMembers() {
     }, 25);
 }
 
+// events can arrive while the summaries of an earlier one are still being fetched, only the latest is drawn
+let latestEvent = 0;
+
 feed.onmessage = async (ev) => {
-    memberContainerWatches = [];
+    const eventNumber = ++latestEvent;
     const data = JSON.parse(ev.data);
-    updateTeamData(data);
+    const summaries = await fetchTeamSummaries();
+    if (eventNumber !== latestEvent) {
+        return;
+    }
+
+    memberContainerWatches = [];
+    updateTeamData(data, summaries);
     updateLookingForGroupData(data);
-    updateSoloData(data);
+    updateSoloData(data, summaries);
     updateCodeJamManagers(data);
-    updateStats(data);
+    updateStats(data, summaries);
     fadeInMembers();
 }
\ No newline at end of file
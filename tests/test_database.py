@@ -0,0 +1,361 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+"""Conformance cases, run against every storage backend. See the database fixture in conftest.py."""
+import csv
+import datetime
+import gzip
+import itertools
+import pathlib
+import sqlite3
+from collections.abc import Callable
+from typing import Any
+
+import asyncpg
+import pytest
+
+import universal
+
+
+MEMBER_COLUMNS: set[str] = {'event_id', 'member_id', 'languages', 'timezone', 'solo', 'team_id', 'registered'}
+TEAM_COLUMNS: set[str] = {
+    'event_id', 'team_id', 'token', 'invite', 'name', 'github', 'owner', 'role_id', 'text_id', 'voice_id', 'created'
+}
+
+# Unique Discord IDs for every team created in a test...
+snowflakes: itertools.count = itertools.count(10 ** 17)
+
+
+async def create_team(database: universal.DatabaseProtocol, name: str, owner: int, /) -> universal.Row:
+    return await database.create_team(
+        name=name,
+        owner=owner,
+        role_id=next(snowflakes),
+        text_id=next(snowflakes),
+        voice_id=next(snowflakes)
+    )
+
+
+async def create_member(database: universal.DatabaseProtocol, member_id: int, /, **kwargs: Any) -> universal.Row:
+    options: dict[str, Any] = {'languages': [1, 2], 'timezone': datetime.timedelta(hours=1), 'solo': False}
+    options.update(kwargs)
+
+    return await database.create_member(member_id=member_id, **options)
+
+
+def test_unique_member(database: universal.DatabaseProtocol, run: Callable) -> None:
+    run(create_member(database, 1))
+
+    with pytest.raises(asyncpg.UniqueViolationError):
+        run(create_member(database, 1))
+
+
+def test_unique_team_name_ignores_case(database: universal.DatabaseProtocol, run: Callable) -> None:
+    run(create_team(database, 'Kroden Warriors', 1))
+
+    with pytest.raises(asyncpg.UniqueViolationError) as error:
+        run(create_team(database, 'kroden warriors', 2))
+
+    assert '_name_' in error.value.constraint_name
+
+
+def test_unique_team_owner(database: universal.DatabaseProtocol, run: Callable) -> None:
+    run(create_team(database, 'First', 1))
+
+    with pytest.raises(asyncpg.UniqueViolationError) as error:
+        run(create_team(database, 'Second', 1))
+
+    assert '_name_' not in error.value.constraint_name
+
+
+@pytest.mark.parametrize('languages, timezone', [
+    ([1, 18, 3], datetime.timedelta(hours=-12)),
+    ([0], datetime.timedelta(hours=5, minutes=30)),
+    ([], datetime.timedelta(0)),
+])
+def test_member_round_trip(
+        database: universal.DatabaseProtocol,
+        run: Callable,
+        languages: list[int],
+        timezone: datetime.timedelta
+) -> None:
+    created: universal.Row = run(create_member(database, 1, languages=languages, timezone=timezone, solo=True))
+    fetched: universal.Row = run(database.fetch_member(member_id=1))
+
+    for row in (created, fetched):
+        assert list(row['languages']) == languages
+        assert row['timezone'] == timezone
+        assert row['solo'] is True
+
+
+def test_missing_member(database: universal.DatabaseProtocol, run: Callable) -> None:
+    assert run(database.fetch_member(member_id=1)) is None
+
+
+def test_delete_team_sets_members_null(database: universal.DatabaseProtocol, run: Callable) -> None:
+    team: universal.Row = run(create_team(database, 'Doomed', 1))
+    run(create_member(database, 1))
+    run(database.edit_member_team(member_id=1, team_id=team['team_id']))
+
+    run(database.delete_team(team['team_id']))
+
+    member: universal.Row = run(database.fetch_member(member_id=1))
+    assert member['team_id'] is None
+    assert member['name'] is None
+    assert run(database.fetch_team(team_id=team['team_id'])) == []
+    assert run(database.fetch_team_summaries()) == []
+
+
+def test_fetch_members_shape(database: universal.DatabaseProtocol, run: Callable) -> None:
+    team: universal.Row = run(create_team(database, 'Joined', 1))
+    run(create_member(database, 1))
+    run(create_member(database, 2))
+    run(database.edit_member_team(member_id=1, team_id=team['team_id']))
+
+    rows: list[universal.Row] = sorted(run(database.fetch_members()), key=lambda r: r['member_id'])
+
+    assert [row['member_id'] for row in rows] == [1, 2]
+    for row in rows:
+        assert set(row.keys()) == MEMBER_COLUMNS | TEAM_COLUMNS
+
+    assert rows[0]['name'] == 'Joined'
+    assert rows[0]['token'] == team['token']
+    assert rows[1]['name'] is None
+
+
+def test_fetch_team_shape(database: universal.DatabaseProtocol, run: Callable) -> None:
+    team: universal.Row = run(create_team(database, 'Pair', 1))
+    empty: universal.Row = run(create_team(database, 'Empty', 2))
+
+    for member_id in (1, 2):
+        run(create_member(database, member_id))
+        run(database.edit_member_team(member_id=member_id, team_id=team['team_id']))
+
+    # One row per member, with the team repeated on each...
+    rows: list[universal.Row] = run(database.fetch_team(invite=team['invite']))
+    assert sorted(row['member_id'] for row in rows) == [1, 2]
+    for row in rows:
+        assert set(row.keys()) == MEMBER_COLUMNS | TEAM_COLUMNS
+        assert row['name'] == 'Pair'
+        assert row['owner'] == 1
+
+    # A team without members is a single row without member data...
+    rows = run(database.fetch_team(text_id=empty['text_id']))
+    assert len(rows) == 1
+    assert rows[0]['name'] == 'Empty'
+    assert rows[0]['member_id'] is None
+
+
+def test_team_summary(database: universal.DatabaseProtocol, run: Callable) -> None:
+    team: universal.Row = run(create_team(database, 'Summed', 1))
+    run(create_member(database, 1, languages=[2, 1], timezone=datetime.timedelta(hours=-3), solo=True))
+    run(create_member(database, 2, languages=[3, 1], timezone=datetime.timedelta(hours=2), solo=False))
+
+    for member_id in (1, 2):
+        run(database.edit_member_team(member_id=member_id, team_id=team['team_id']))
+
+    summary: universal.Row = run(database.fetch_team_summaries())[0]
+    assert summary['name'] == 'Summed'
+    assert summary['member_count'] == 2
+    assert summary['solo_count'] == 1
+    assert list(summary['languages']) == [1, 2, 3]
+    assert summary['min_timezone'] == datetime.timedelta(hours=-3)
+    assert summary['max_timezone'] == datetime.timedelta(hours=2)
+    assert summary['all_solo'] is False
+
+    run(database.edit_member_team(member_id=2, team_id=None))
+
+    summary = run(database.fetch_team_summaries())[0]
+    assert summary['member_count'] == 1
+    assert summary['all_solo'] is True
+
+
+def test_log_round_trip(database: universal.DatabaseProtocol, run: Callable) -> None:
+    identifier: int = run(database.create_log(channel=1, invoker=2, command='join', error='E', traceback='T'))
+    log: universal.Row = run(database.fetch_log(identifier))
+
+    assert (log['channel'], log['invoker'], log['command'], log['error'], log['traceback']) == (1, 2, 'join', 'E', 'T')
+
+
+def test_outbox(database: universal.DatabaseProtocol, run: Callable) -> None:
+    job: universal.Job = universal.Job('send_message', {'channel_id': 1, 'content': 'Hi'}, key='test:1')
+
+    # The same key is only enqueued once...
+    run(database.enqueue_jobs([job]))
+    run(database.enqueue_jobs([job]))
+
+    claimed: list[dict[str, Any]] = run(database.claim_jobs(limit=5, lease=60))
+    assert len(claimed) == 1
+    assert claimed[0]['payload'] == {'channel_id': 1, 'content': 'Hi'}
+    assert claimed[0]['attempts'] == 1
+
+    # A leased job is not claimed again...
+    assert run(database.claim_jobs(limit=5, lease=60)) == []
+
+    run(database.update_job_payload(claimed[0]['job_id'], {'message_id': 5}))
+    run(database.retry_job(claimed[0]['job_id'], delay=0, error='RateLimited'))
+
+    claimed = run(database.claim_jobs(limit=5, lease=60))
+    assert claimed[0]['payload'] == {'channel_id': 1, 'content': 'Hi', 'message_id': 5}
+    assert claimed[0]['attempts'] == 2
+
+    run(database.complete_job(claimed[0]['job_id']))
+    assert run(database.fetch_outbox_depth()) == {'pending': 0, 'running': 0, 'failed': 0}
+
+
+def test_outbox_depth_prefix(database: universal.DatabaseProtocol, run: Callable) -> None:
+    jobs: list[universal.Job] = [
+        universal.Job('delete_role', {'guild_id': 1, 'role_id': 1}, key='100:role:1'),
+        universal.Job('delete_role', {'guild_id': 1, 'role_id': 2}, key='100:role:2'),
+        universal.Job('delete_role', {'guild_id': 1, 'role_id': 3}, key='1000:role:3'),
+    ]
+    run(database.enqueue_jobs(jobs))
+
+    assert run(database.fetch_outbox_depth())['pending'] == 3
+    assert run(database.fetch_outbox_depth(prefix='100:'))['pending'] == 2
+    assert run(database.fetch_outbox_depth(prefix='200:'))['pending'] == 0
+
+
+async def start_event(database: universal.DatabaseProtocol, event_id: int, /) -> None:
+    """Make an event the active event, creating what setup would for a new jam."""
+    if isinstance(database, universal.Database):
+        async with database._pool.acquire() as connection:
+            await universal.Database._create_partitions(connection, event_id)
+    else:
+        await database._fetch("""INSERT OR IGNORE INTO events(event_id) VALUES (?)""", event_id)
+
+    database.event = event_id
+
+
+async def event_tables(database: universal.DatabaseProtocol, event_id: int, /) -> list[str]:
+    """The event tables which still hold data (or a partition) of an event."""
+    if isinstance(database, universal.Database):
+        query: str = """SELECT to_regclass($1)"""
+        tables: tuple[str, ...] = universal.database.PARTITIONED_TABLES
+
+        return [t for t in tables if await database._pool.fetchval(query, f'{t}_{event_id}') is not None]
+
+    tables = universal.sqlite.EVENT_TABLES
+    return [t for t in tables if await database._fetch(f'SELECT 1 FROM {t} WHERE event_id = ?', event_id)]
+
+
+def test_archive_event(database: universal.DatabaseProtocol, run: Callable, tmp_path: pathlib.Path) -> None:
+    active: int = database.event
+    archived: int = active + 1
+
+    run(create_team(database, 'Staying', 1))
+
+    # A finished jam with a team and a member, so every foreign key between the partitions is in use...
+    run(start_event(database, archived))
+    team: universal.Row = run(create_team(database, 'Archived', 2))
+    run(create_member(database, 2))
+    run(database.edit_member_team(member_id=2, team_id=team['team_id']))
+    run(database.create_log(channel=1, invoker=2, command='team', error='E', traceback='T'))
+    database.event = active
+
+    with pytest.raises(ValueError):
+        run(database.archive_event(active, directory=tmp_path))
+
+    files: list[pathlib.Path] = run(database.archive_event(archived, directory=tmp_path))
+
+    assert sorted(f.name for f in files) == sorted(
+        f'event_{archived}_{table}.csv.gz' for table in ('teams', 'members', 'error_log', 'team_summary')
+    )
+
+    with gzip.open(tmp_path / f'event_{archived}_teams.csv.gz', 'rt', newline='') as fp:
+        rows: list[dict[str, str]] = list(csv.DictReader(fp))
+
+    assert [r['name'] for r in rows] == ['Archived']
+    assert run(event_tables(database, archived)) == []
+
+    # The active event is untouched...
+    assert [s['name'] for s in run(database.fetch_team_summaries())] == ['Staying']
+
+
+# The SQLite schema from before events existed, with the objects a migration has to replace...
+LEGACY_SQLITE_SCHEMA: str = """
+CREATE TABLE teams(
+    team_id INTEGER PRIMARY KEY,
+    token TEXT UNIQUE NOT NULL,
+    invite TEXT UNIQUE NOT NULL,
+    name TEXT UNIQUE NOT NULL,
+    github TEXT,
+    owner INTEGER UNIQUE NOT NULL,
+    role_id INTEGER UNIQUE NOT NULL,
+    text_id INTEGER UNIQUE NOT NULL,
+    voice_id INTEGER UNIQUE NOT NULL,
+    created TIMESTAMP DEFAULT (datetime('now'))
+);
+
+CREATE TABLE members(
+    member_id INTEGER PRIMARY KEY,
+    languages JSON,
+    timezone INTERVAL,
+    solo BOOLEAN,
+    team_id INTEGER,
+    registered TIMESTAMP DEFAULT (datetime('now')),
+    FOREIGN KEY (team_id) REFERENCES teams (team_id) ON DELETE SET NULL
+);
+
+CREATE INDEX members_team_id_idx ON members (team_id);
+
+CREATE TABLE error_log(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel INTEGER,
+    invoker INTEGER,
+    command TEXT,
+    error TEXT,
+    traceback TEXT,
+    created TIMESTAMP DEFAULT (datetime('now'))
+);
+
+INSERT INTO teams(team_id, token, invite, name, owner, role_id, text_id, voice_id)
+VALUES (1, 'token', 'invite', 'Legacy', 1, 2, 3, 4);
+
+INSERT INTO members(member_id, languages, timezone, solo, team_id) VALUES (1, '[1]', 3600, 0, 1);
+"""
+
+
+def test_sqlite_legacy_migration(
+        run: Callable,
+        tmp_path: pathlib.Path,
+        monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path: pathlib.Path = tmp_path / 'legacy.sqlite3'
+
+    connection: sqlite3.Connection = sqlite3.connect(path)
+    connection.executescript(LEGACY_SQLITE_SCHEMA)
+    connection.close()
+
+    monkeypatch.chdir(pathlib.Path(__file__).parent.parent)
+    monkeypatch.setitem(universal.CONFIG['DATABASE'], 'path', str(path))
+    database: universal.SQLiteDatabase = run(universal.SQLiteDatabase.setup())
+
+    member: universal.Row = run(database.fetch_member(member_id=1))
+    assert member['event_id'] == database.event
+    assert member['team_id'] == 1
+    assert member['name'] == 'Legacy'
+
+    # The index of the old members table must not stop the new one from being created...
+    query: str = """SELECT tbl_name FROM sqlite_master WHERE type = 'index' AND name = 'members_team_id_idx'"""
+    assert run(database._fetch(query)) == [{'tbl_name': 'members'}]
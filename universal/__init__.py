@@ -21,5 +21,14 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-from .database import Database, CONFIG
+from .backends import BACKENDS, setup_database
+from .database import Database, CONFIG, EVENT
 from .logger import Formatter, Handler
+from .loop import LoopMonitor, install_uvloop
+from .members import MEMBER_CACHE, MemberCache, member_cache_options, ready_report
+from .metrics import Counter, Gauge, Histogram, MetricsRegistry, PROMETHEUS_CONTENT_TYPE
+from .outbox import Job, JOB_STATUSES
+from .profiler import Profile, SamplingProfiler
+from .recorder import CAPTURE_KINDS, TrafficRecorder, read_capture
+from .protocol import DatabaseProtocol, Row
+from .sqlite import SQLiteDatabase
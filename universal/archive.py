@@ -0,0 +1,49 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import argparse
+import asyncio
+import pathlib
+
+from .backends import setup_database
+
+
+async def archive(event_id: int, directory: pathlib.Path, /) -> None:
+    database = await setup_database()
+    files: list[pathlib.Path] = await database.archive_event(event_id, directory=directory)
+
+    for file in files:
+        print(file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Export a finished event to compressed files and drop it.')
+    parser.add_argument('event', type=int, help='The event to archive. This can not be the active event.')
+    parser.add_argument('--directory', type=pathlib.Path, default=pathlib.Path('archives'))
+
+    args: argparse.Namespace = parser.parse_args()
+    asyncio.run(archive(args.event, args.directory))
+
+
+if __name__ == '__main__':
+    main()
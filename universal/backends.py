@@ -0,0 +1,55 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from .database import CONFIG, Database
+from .protocol import DatabaseProtocol
+from .sqlite import SQLiteDatabase
+
+
+__all__ = ('BACKENDS', 'setup_database')
+
+
+BACKENDS: dict[str, type[DatabaseProtocol]] = {
+    'postgres': Database,
+    'sqlite': SQLiteDatabase
+}
+
+
+async def setup_database() -> DatabaseProtocol:
+    """Setup the storage backend selected by `backend` under [DATABASE] in config.toml.
+
+    Defaults to 'postgres' when no backend is set.
+
+    Raises
+    ------
+    ValueError
+        The configured backend does not exist.
+    """
+    backend: str = CONFIG['DATABASE'].get('backend', 'postgres')
+
+    try:
+        cls: type[DatabaseProtocol] = BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f'Unknown database backend "{backend}". Expected one of: {", ".join(BACKENDS)}')
+
+    return await cls.setup()
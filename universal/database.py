@@ -21,15 +21,22 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+import asyncio
 import datetime
+import gzip
+import json
 import logging
+import pathlib
 import secrets
+import time
 import tomllib
+from collections.abc import Sequence
 from typing import Any, Self
 
 import asyncpg
 
 from .logger import Handler
+from .outbox import JOB_STATUSES, Job
 
 # We have to do this for testing purposes, unfortunately...
 try:
@@ -47,10 +54,41 @@ logger.addHandler(Handler(level=logging_level))
 logger.propagate = False
 
 
+# Errors which mean a replica could not serve a read, rather than the query itself being bad...
+REPLICA_ERRORS: tuple[type[Exception], ...] = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.CannotConnectNowError,
+    asyncpg.InterfaceError
+)
+
+# How long (in seconds) an unhealthy replica is skipped before we try it again...
+REPLICA_COOLDOWN: float = 30.0
+
+# The active event (jam). Every query only reads and writes the data of this event...
+EVENT: int = CONFIG.get('EVENT', {}).get('id', 1)
+
+# Tables partitioned by event_id, in the order their partitions are created. They are dropped in reverse...
+PARTITIONED_TABLES: tuple[str, ...] = ('teams', 'members', 'error_log', 'team_summary')
+
+# The columns of tables from before events existed, which are migrated into the active event...
+LEGACY_COLUMNS: dict[str, str] = {
+    'teams': 'team_id, token, invite, name, github, owner, role_id, text_id, voice_id, created',
+    'members': 'member_id, languages, timezone, solo, team_id, registered',
+    'error_log': 'id, channel, invoker, command, error, traceback, created'
+}
+
+
 class Database:
 
     def __init__(self) -> None:
         self._pool: asyncpg.Pool | None = None
+        self.event: int = EVENT
+
+        self._replicas: list[asyncpg.Pool] = []
+        self._replica_index: int = 0
+        self._unhealthy: dict[int, float] = {}
 
     @classmethod
     async def setup(cls) -> Self:
@@ -59,6 +97,12 @@ class Database:
         logger.info('Setting up Database.')
         self_._pool = await asyncpg.create_pool(CONFIG['DATABASE']['dsn'])
 
+        for dsn in CONFIG['DATABASE'].get('replicas', []):
+            try:
+                self_._replicas.append(await asyncpg.create_pool(dsn))
+            except REPLICA_ERRORS as e:
+                logger.warning(f'Unable to connect to a read replica, it will not be used: {e}')
+
         async with self_._pool.acquire() as connection:
             # We have to do this for testing purposes, unfortunately...
             try:
@@ -68,12 +112,107 @@ class Database:
                 with open('SCHEMA.sql', 'r') as schema:
                     sql: str = schema.read()
 
-            await connection.execute(sql)
+            async with connection.transaction():
+                query: str = """SELECT relkind FROM pg_class WHERE oid = to_regclass('teams')"""
+                kind: str | None = await connection.fetchval(query)
+
+                # An ordinary (not partitioned) teams table is from before events existed...
+                legacy: bool = kind == 'r'
+                if legacy:
+                    logger.warning(f'Migrating tables from before events existed into event ({self_.event}).')
 
-        logger.info('Completed Database Setup.')
+                    for table in (*LEGACY_COLUMNS, 'team_summary'):
+                        await connection.execute(f'ALTER TABLE IF EXISTS {table} RENAME TO {table}_legacy')
+
+                await connection.execute(sql)
+                await self_._create_partitions(connection, self_.event)
+
+                if legacy:
+                    for table, columns in LEGACY_COLUMNS.items():
+                        query = f'INSERT INTO {table} (event_id, {columns}) SELECT $1, {columns} FROM {table}_legacy'
+                        await connection.execute(query, self_.event)
+
+                    query = """SELECT setval(pg_get_serial_sequence('error_log', 'id'), max(id)) FROM error_log"""
+                    await connection.execute(query)
+
+                    legacy_tables: str = ', '.join(f'{t}_legacy' for t in (*LEGACY_COLUMNS, 'team_summary'))
+                    await connection.execute(f'DROP TABLE IF EXISTS {legacy_tables} CASCADE')
+
+        replicas: int = len(self_._replicas)
+        logger.info(f'Completed Database Setup. Event: ({self_.event}). Using ({replicas}) read replicas.')
 
         return self_
 
+    @staticmethod
+    async def _create_partitions(connection: asyncpg.Connection, event_id: int, /) -> None:
+        """Register an event and create its partition of every event table, if they don't already exist."""
+        await connection.execute("""INSERT INTO events(event_id) VALUES ($1) ON CONFLICT DO NOTHING""", event_id)
+
+        for table in PARTITIONED_TABLES:
+            partition: str = f'{table}_{int(event_id)}'
+            await connection.execute(
+                f'CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table} FOR VALUES IN ({int(event_id)})'
+            )
+
+        # Team names are unique per event regardless of case. Each partition holds one event, so index it directly...
+        await connection.execute(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS teams_{int(event_id)}_name_lower_idx '
+            f'ON teams_{int(event_id)} (lower(name))'
+        )
+
+    def _next_replica(self) -> int | None:
+        """Return the index of the next healthy replica in round-robin order, or None if there are none."""
+        now: float = time.monotonic()
+
+        for _ in range(len(self._replicas)):
+            index: int = self._replica_index
+            self._replica_index = (index + 1) % len(self._replicas)
+
+            if self._unhealthy.get(index, 0.0) <= now:
+                return index
+
+        return None
+
+    async def _read(self, method: str, query: str, *args: Any, primary: bool = False) -> Any:
+        """Run a read-only query on a replica, falling back to the primary.
+
+        Parameters
+        ----------
+        method: str
+            The connection method to use. E.g. 'fetch' or 'fetchrow'.
+        query: str
+            The read-only query.
+        *args: Any
+            The query arguments.
+        primary: bool
+            Skip the replicas and read from the primary. Use this when reading data that was just written.
+        """
+        index: int | None = None if primary else self._next_replica()
+
+        if index is not None:
+            try:
+                async with self._replicas[index].acquire() as connection:
+                    return await getattr(connection, method)(query, *args)
+            except REPLICA_ERRORS as e:
+                self._unhealthy[index] = time.monotonic() + REPLICA_COOLDOWN
+                logger.warning(f'Read replica ({index}) is unhealthy, falling back to the primary: {e}')
+
+        async with self._pool.acquire() as connection:
+            return await getattr(connection, method)(query, *args)
+
+    async def _enqueue(self, connection: asyncpg.Connection, jobs: Sequence[Job], /) -> None:
+        """Insert jobs into the outbox on the given connection, ignoring any idempotency key already enqueued."""
+        if not jobs:
+            return
+
+        query: str = """
+        INSERT INTO outbox(event_id, idempotency_key, kind, payload)
+        VALUES ($1, $2, $3, $4::jsonb)
+        ON CONFLICT (idempotency_key) DO NOTHING
+        """
+
+        await connection.executemany(query, [(self.event, job.key, job.kind, job.dumps()) for job in jobs])
+
     async def create_team(
             self,
             *,
@@ -81,7 +220,8 @@ class Database:
             owner: int,
             role_id: int,
             text_id: int,
-            voice_id: int
+            voice_id: int,
+            jobs: Sequence[Job] = ()
     ) -> asyncpg.Record:
         """Create a CodeJam team.
 
@@ -90,7 +230,7 @@ class Database:
         Parameters
         ----------
         name: str
-            The teams unique name. This must be unique.
+            The teams unique name. This must be unique, ignoring case.
         owner: int
             The Discord Member ID. This must be unique.
         role_id: int
@@ -99,30 +239,41 @@ class Database:
             The Discord TextChannel ID the bot has generated. This must be unique.
         voice_id: int
             The Discord VoiceChannel ID the bot has generated. This must be unique.
+        jobs: Sequence[universal.Job]
+            Outbox jobs committed in the same transaction as the team. Defaults to none.
 
         Returns
         -------
         asyncpg.Record
             A record containing the data of the created team.
+
+        Raises
+        ------
+        asyncpg.UniqueViolationError
+            The name, owner or a Discord ID is already used by another team.
         """
         id_: int = secrets.randbits(32)
         token: str = secrets.token_urlsafe(32)
         invite: str = secrets.token_urlsafe(4)
 
-        query: str = """INSERT INTO teams(team_id, token, invite, name, owner, role_id, text_id, voice_id)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8) RETURNING *"""
+        query: str = """INSERT INTO teams(event_id, team_id, token, invite, name, owner, role_id, text_id, voice_id)
+                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9) RETURNING *"""
         async with self._pool.acquire() as connection:
-            row: asyncpg.Record = await connection.fetchrow(
-                query,
-                id_,
-                token,
-                invite,
-                name,
-                owner,
-                role_id,
-                text_id,
-                voice_id
-            )
+            async with connection.transaction():
+                row: asyncpg.Record = await connection.fetchrow(
+                    query,
+                    self.event,
+                    id_,
+                    token,
+                    invite,
+                    name,
+                    owner,
+                    role_id,
+                    text_id,
+                    voice_id
+                )
+
+                await self._enqueue(connection, jobs)
 
         return row
 
@@ -157,15 +308,29 @@ class Database:
         asyncpg.Record
             A record containing the data of the created member.
         """
-        query: str = """INSERT INTO members(member_id, languages, timezone, solo, team_id)
-                        VALUES ($1, $2, $3, $4, $5) RETURNING *"""
+        query: str = """INSERT INTO members(event_id, member_id, languages, timezone, solo, team_id)
+                        VALUES ($1, $2, $3, $4, $5, $6) RETURNING *"""
 
         async with self._pool.acquire() as connection:
-            row: asyncpg.Record = await connection.fetchrow(query, member_id, languages, timezone, solo, team_id)
+            row: asyncpg.Record = await connection.fetchrow(
+                query,
+                self.event,
+                member_id,
+                languages,
+                timezone,
+                solo,
+                team_id
+            )
 
         return row
 
-    async def edit_member_team(self, *, member_id: int, team_id: int | None) -> asyncpg.Record:
+    async def edit_member_team(
+            self,
+            *,
+            member_id: int,
+            team_id: int | None,
+            jobs: Sequence[Job] = ()
+    ) -> asyncpg.Record:
         """Set a members team.
 
         Parameters
@@ -174,6 +339,8 @@ class Database:
             The Discord member ID.
         team_id: int | None
             The unique team identifier. Could be None to remove this member from a team.
+        jobs: Sequence[universal.Job]
+            Outbox jobs committed in the same transaction as the update. Defaults to none.
 
         Returns
         -------
@@ -182,13 +349,15 @@ class Database:
         """
         query: str = """
         UPDATE members
-        SET team_id = $2
-        WHERE member_id = $1
+        SET team_id = $3
+        WHERE event_id = $1 AND member_id = $2
         RETURNING *
         """
 
         async with self._pool.acquire() as connection:
-            row: asyncpg.Record = await connection.fetchrow(query, member_id, team_id)
+            async with connection.transaction():
+                row: asyncpg.Record = await connection.fetchrow(query, self.event, member_id, team_id)
+                await self._enqueue(connection, jobs)
 
         return row
 
@@ -209,23 +378,25 @@ class Database:
         """
         query: str = """
         UPDATE teams
-        SET owner = $1
-        WHERE team_id = $2
+        SET owner = $2
+        WHERE event_id = $1 AND team_id = $3
         RETURNING *
         """
 
         async with self._pool.acquire() as connection:
-            row: asyncpg.Record = await connection.fetchrow(query, member_id, team_id)
+            row: asyncpg.Record = await connection.fetchrow(query, self.event, member_id, team_id)
 
         return row
 
-    async def fetch_member(self, *, member_id: int) -> asyncpg.Record | None:
+    async def fetch_member(self, *, member_id: int, primary: bool = False) -> asyncpg.Record | None:
         """Fetch a member from the database.
 
         Parameters
         ----------
         member_id: int
             The Discord Member ID of the participant.
+        primary: bool
+            Whether to read from the primary instead of a replica. Defaults to False.
 
         Returns
         -------
@@ -234,18 +405,21 @@ class Database:
         """
         query: str = """
         SELECT * FROM members
-        LEFT OUTER JOIN teams ON members.team_id = teams.team_id
-        WHERE member_id = $1
+        LEFT OUTER JOIN teams ON (members.event_id = teams.event_id AND members.team_id = teams.team_id)
+        WHERE members.event_id = $1 AND member_id = $2
         """
 
-        async with self._pool.acquire() as connection:
-            row: asyncpg.Record | None = await connection.fetchrow(query, member_id)
-
+        row: asyncpg.Record | None = await self._read('fetchrow', query, self.event, member_id, primary=primary)
         return row
 
-    async def fetch_members(self) -> list[asyncpg.Record]:
+    async def fetch_members(self, *, primary: bool = False) -> list[asyncpg.Record]:
         """Fetch all members and their team from the database.
 
+        Parameters
+        ----------
+        primary: bool
+            Whether to read from the primary instead of a replica. Defaults to False.
+
         Returns
         -------
         list[asyncpg.Record]
@@ -253,12 +427,11 @@ class Database:
         """
         query: str = """
         SELECT * FROM members
-        LEFT OUTER JOIN teams ON (members.team_id = teams.team_id)
+        LEFT OUTER JOIN teams ON (members.event_id = teams.event_id AND members.team_id = teams.team_id)
+        WHERE members.event_id = $1
         """
 
-        async with self._pool.acquire() as connection:
-            rows: list[asyncpg.Record] = await connection.fetch(query)
-
+        rows: list[asyncpg.Record] = await self._read('fetch', query, self.event, primary=primary)
         return rows
 
     async def fetch_team(
@@ -271,7 +444,8 @@ class Database:
             name: str | None = None,
             text_id: int | None = None,
             voice_id: int | None = None,
-            role_id: int | None = None
+            role_id: int | None = None,
+            primary: bool = False
     ) -> list[asyncpg.Record]:
         """Fetch a CodeJam team and it's participants from the database.
 
@@ -301,6 +475,8 @@ class Database:
             The unique Discord VoiceChannel ID of the team.
         role_id: int | None
             The unique Discord Role ID of the team.
+        primary: bool
+            Whether to read from the primary instead of a replica. Defaults to False.
 
         Returns
         -------
@@ -309,42 +485,71 @@ class Database:
         """
         query: str = """
         SELECT * FROM teams
-        LEFT OUTER JOIN members ON (teams.team_id = members.team_id)
-        WHERE teams.team_id = $1 
-        OR token = $2 
-        OR invite = $3 
-        OR owner = $4 
-        OR name = $5 
-        OR text_id = $6
-        OR voice_id = $7
-        OR role_id = $8
+        LEFT OUTER JOIN members ON (teams.event_id = members.event_id AND teams.team_id = members.team_id)
+        WHERE teams.event_id = $1 AND (
+            teams.team_id = $2
+            OR token = $3
+            OR invite = $4
+            OR owner = $5
+            OR name = $6
+            OR text_id = $7
+            OR voice_id = $8
+            OR role_id = $9
+        )
         """
 
-        async with self._pool.acquire() as connection:
-            rows: list[asyncpg.Record] = await connection.fetch(
-                query,
-                team_id,
-                token,
-                invite,
-                owner,
-                name,
-                text_id,
-                voice_id,
-                role_id
-            )
+        rows: list[asyncpg.Record] = await self._read(
+            'fetch',
+            query,
+            self.event,
+            team_id,
+            token,
+            invite,
+            owner,
+            name,
+            text_id,
+            voice_id,
+            role_id,
+            primary=primary
+        )
 
         return rows
 
-    async def fetch_teams(self) -> list[asyncpg.Record]:
+    async def fetch_teams(self, *, primary: bool = False) -> list[asyncpg.Record]:
         """Fetch all teams from the database.
 
         This does not fetch any member data.
+
+        Parameters
+        ----------
+        primary: bool
+            Whether to read from the primary instead of a replica. Defaults to False.
         """
-        query: str = """SELECT * FROM teams"""
+        query: str = """SELECT * FROM teams WHERE event_id = $1"""
 
-        async with self._pool.acquire() as connection:
-            rows: list[asyncpg.Record] = await connection.fetch(query)
+        rows: list[asyncpg.Record] = await self._read('fetch', query, self.event, primary=primary)
+        return rows
+
+    async def fetch_team_summaries(self, *, primary: bool = False) -> list[asyncpg.Record]:
+        """Fetch the summary of every team.
+
+        Summaries are kept current by triggers on the members and teams tables,
+        so this reads one row per team instead of every member.
 
+        Parameters
+        ----------
+        primary: bool
+            Whether to read from the primary instead of a replica. Defaults to False.
+
+        Returns
+        -------
+        list[asyncpg.Record]
+            A list of team summaries. Each has a member_count, solo_count, languages (the union of all members),
+            min_timezone, max_timezone and all_solo.
+        """
+        query: str = """SELECT * FROM team_summary WHERE event_id = $1 ORDER BY name"""
+
+        rows: list[asyncpg.Record] = await self._read('fetch', query, self.event, primary=primary)
         return rows
 
     async def edit_team_name(self, *, team_id: int, name: str) -> asyncpg.Record:
@@ -365,21 +570,21 @@ class Database:
         Raises
         ------
         asyncpg.UniqueViolationError
-            The new name was identical to another teams name.
+            The new name was identical to another teams name, ignoring case.
         """
         query: str = """
         UPDATE teams
-        SET name = $2
-        WHERE team_id = $1
+        SET name = $3
+        WHERE event_id = $1 AND team_id = $2
         RETURNING *
         """
 
         async with self._pool.acquire() as connection:
-            row: asyncpg.Record = await connection.fetchrow(query, team_id, name)
+            row: asyncpg.Record = await connection.fetchrow(query, self.event, team_id, name)
 
         return row
 
-    async def delete_team(self, team_id: int) -> asyncpg.Record:
+    async def delete_team(self, team_id: int, *, jobs: Sequence[Job] = ()) -> asyncpg.Record:
         """Delete a team from the database.
 
         This will also remove the team_id data from every associated member of this team.
@@ -388,16 +593,20 @@ class Database:
         ----------
         team_id: int
             The unique team identifier.
+        jobs: Sequence[universal.Job]
+            Outbox jobs committed in the same transaction as the delete. E.g. deleting the team channels.
 
         Returns
         -------
         asyncpg.Record
             A record of data containing information of the deleted team.
         """
-        query: str = """DELETE FROM teams WHERE team_id = $1 RETURNING *"""
+        query: str = """DELETE FROM teams WHERE event_id = $1 AND team_id = $2 RETURNING *"""
 
         async with self._pool.acquire() as connection:
-            row: asyncpg.Record = await connection.fetchrow(query, team_id)
+            async with connection.transaction():
+                row: asyncpg.Record = await connection.fetchrow(query, self.event, team_id)
+                await self._enqueue(connection, jobs)
 
         return row
 
@@ -425,31 +634,216 @@ class Database:
             The error log identifier.
         """
         query: str = """
-        INSERT INTO error_log(channel, invoker, command, error, traceback)
-        VALUES ($1, $2, $3, $4, $5) RETURNING *
+        INSERT INTO error_log(event_id, channel, invoker, command, error, traceback)
+        VALUES ($1, $2, $3, $4, $5, $6) RETURNING *
         """
 
         async with self._pool.acquire() as connection:
-            row: asyncpg.Record = await connection.fetchrow(query, channel, invoker, command, error, traceback)
+            row: asyncpg.Record = await connection.fetchrow(
+                query,
+                self.event,
+                channel,
+                invoker,
+                command,
+                error,
+                traceback
+            )
 
         return row['id']
 
-    async def fetch_log(self, identifier: int) -> asyncpg.Record | None:
+    async def fetch_log(self, identifier: int, *, primary: bool = False) -> asyncpg.Record | None:
         """Fetch an error log from the database, with the given identifier.
 
         Parameters
         ----------
         identifier: int
             The ID of the error log to fetch.
+        primary: bool
+            Whether to read from the primary instead of a replica. Defaults to False.
 
         Returns
         -------
         asyncpg.Record
             A record of data containing information about the error. Could be None if no error matches that identifier.
         """
-        query: str = """SELECT * FROM error_log WHERE id = $1"""
+        query: str = """SELECT * FROM error_log WHERE event_id = $1 AND id = $2"""
+
+        row: asyncpg.Record = await self._read('fetchrow', query, self.event, identifier, primary=primary)
+        return row
+
+    async def enqueue_jobs(self, jobs: Sequence[Job], /) -> None:
+        """Commit outbox jobs which are not tied to another change.
 
+        Jobs with an idempotency key that has already been enqueued are ignored.
+        """
         async with self._pool.acquire() as connection:
-            row: asyncpg.Record = await connection.fetchrow(query, identifier)
+            async with connection.transaction():
+                await self._enqueue(connection, jobs)
 
-        return row
+    async def claim_jobs(self, *, limit: int, lease: float) -> list[dict[str, Any]]:
+        """Claim outbox jobs which are ready to run, oldest first.
+
+        Claimed jobs are leased to the caller. If they are not completed, retried or failed before the lease runs out,
+        E.g. the bot crashed, they can be claimed again. Concurrent callers never claim the same job.
+
+        Parameters
+        ----------
+        limit: int
+            The maximum amount of jobs to claim.
+        lease: float
+            How long (in seconds) the jobs are leased for.
+
+        Returns
+        -------
+        list[dict[str, Any]]
+            The claimed jobs, with their payload decoded.
+        """
+        query: str = """
+        UPDATE outbox
+        SET status = 'running',
+            attempts = attempts + 1,
+            available = (now() at time zone 'utc') + make_interval(secs => $2)
+        WHERE job_id IN (
+            SELECT job_id FROM outbox
+            WHERE status IN ('pending', 'running') AND available <= (now() at time zone 'utc')
+            ORDER BY available, job_id
+            LIMIT $1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING *
+        """
+
+        async with self._pool.acquire() as connection:
+            rows: list[asyncpg.Record] = await connection.fetch(query, limit, lease)
+
+        return [{**row, 'payload': json.loads(row['payload'])} for row in rows]
+
+    async def complete_job(self, job_id: int, /) -> None:
+        """Mark an outbox job as done."""
+        query: str = """
+        UPDATE outbox SET status = 'done', completed = (now() at time zone 'utc'), last_error = NULL
+        WHERE job_id = $1
+        """
+
+        async with self._pool.acquire() as connection:
+            await connection.execute(query, job_id)
+
+    async def extend_job(self, job_id: int, /, *, lease: float) -> None:
+        """Renew the lease of a running outbox job, so it is not claimed again while it is still running."""
+        query: str = """
+        UPDATE outbox SET available = (now() at time zone 'utc') + make_interval(secs => $2)
+        WHERE job_id = $1 AND status = 'running'
+        """
+
+        async with self._pool.acquire() as connection:
+            await connection.execute(query, job_id, lease)
+
+    async def update_job_payload(self, job_id: int, /, values: dict[str, Any]) -> None:
+        """Merge values into the payload of an outbox job. E.g. to record a step it has done, so a repeat skips it."""
+        query: str = """UPDATE outbox SET payload = payload || $2::jsonb WHERE job_id = $1"""
+
+        async with self._pool.acquire() as connection:
+            await connection.execute(query, job_id, json.dumps(values))
+
+    async def retry_job(self, job_id: int, /, *, delay: float, error: str) -> None:
+        """Release an outbox job to be claimed again after delay seconds."""
+        query: str = """
+        UPDATE outbox
+        SET status = 'pending', available = (now() at time zone 'utc') + make_interval(secs => $2), last_error = $3
+        WHERE job_id = $1
+        """
+
+        async with self._pool.acquire() as connection:
+            await connection.execute(query, job_id, delay, error)
+
+    async def fail_job(self, job_id: int, /, *, error: str) -> None:
+        """Mark an outbox job as failed. It is kept, but never claimed again."""
+        query: str = """
+        UPDATE outbox SET status = 'failed', completed = (now() at time zone 'utc'), last_error = $2
+        WHERE job_id = $1
+        """
+
+        async with self._pool.acquire() as connection:
+            await connection.execute(query, job_id, error)
+
+    async def fetch_outbox_depth(self, *, prefix: str | None = None) -> dict[str, int]:
+        """Count the outbox jobs which are not done, by status. E.g. {'pending': 3, 'running': 1, 'failed': 0}.
+
+        Parameters
+        ----------
+        prefix: str | None
+            Only count jobs whose idempotency key starts with this. E.g. the jobs of a single command.
+        """
+        query: str = """
+        SELECT status, count(*) AS count FROM outbox
+        WHERE status <> 'done' AND ($1::text IS NULL OR starts_with(idempotency_key, $1))
+        GROUP BY status
+        """
+
+        async with self._pool.acquire() as connection:
+            rows: list[asyncpg.Record] = await connection.fetch(query, prefix)
+
+        depth: dict[str, int] = {status: 0 for status in JOB_STATUSES if status != 'done'}
+        depth.update({row['status']: row['count'] for row in rows})
+
+        return depth
+
+    async def archive_event(self, event_id: int, *, directory: pathlib.Path) -> list[pathlib.Path]:
+        """Archive a finished event.
+
+        Every partition of the event is exported to a gzip compressed CSV file, and then detached and dropped.
+        This is done in a single transaction, so nothing is dropped if an export fails.
+
+        Parameters
+        ----------
+        event_id: int
+            The event to archive. This can not be the active event.
+        directory: pathlib.Path
+            The directory to write the archive files to. This is created if it does not exist.
+
+        Returns
+        -------
+        list[pathlib.Path]
+            The archive files written. One per table.
+
+        Raises
+        ------
+        ValueError
+            Tried to archive the active event.
+        """
+        if event_id == self.event:
+            raise ValueError('The active event can not be archived.')
+
+        directory.mkdir(parents=True, exist_ok=True)
+        files: list[pathlib.Path] = []
+
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                partitions: dict[str, str] = {}
+
+                for table in PARTITIONED_TABLES:
+                    partition: str = f'{table}_{int(event_id)}'
+                    if await connection.fetchval("""SELECT to_regclass($1)""", partition) is None:
+                        continue
+
+                    path: pathlib.Path = directory / f'event_{event_id}_{table}.csv.gz'
+                    with gzip.open(path, 'wb') as fp:
+                        await connection.copy_from_table(partition, output=fp, format='csv', header=True)
+
+                    partitions[table] = partition
+                    files.append(path)
+
+                # A partition of a table referenced by a foreign key (teams) can not be dropped while it is attached.
+                # Detaching it checks nothing still references its rows, so the referencing partitions go first...
+                for table in reversed(PARTITIONED_TABLES):
+                    if table not in partitions:
+                        continue
+
+                    await connection.execute(f'ALTER TABLE {table} DETACH PARTITION {partitions[table]}')
+                    await connection.execute(f'DROP TABLE {partitions[table]}')
+
+                query: str = """UPDATE events SET archived = (now() at time zone 'utc') WHERE event_id = $1"""
+                await connection.execute(query, event_id)
+
+        logger.info(f'Archived event ({event_id}) to {directory}.')
+        return files
@@ -21,15 +21,33 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+import atexit
+import copy
+import datetime
+import gzip
+import json
 import logging
+import os
+import pathlib
+import queue
+import shutil
+import sys
+import threading
+import time
+from typing import Any, TextIO
 
 from colorama import init, Fore, Back, Style
 
 
-__all__ = ('Handler', 'Formatter')
+__all__ = ('Handler', 'Formatter', 'ConsoleSink', 'JSONSink', 'Repeats', 'COLOUR')
 
 
-init(autoreset=True)
+# Colour escapes are only written to a terminal. Piped or redirected output (E.g. a service log) stays plain...
+COLOUR: bool = sys.stdout.isatty() and 'NO_COLOR' not in os.environ
+
+if COLOUR:
+    init(autoreset=True)
+
 LEVEL_COLOURS = {
     'CRITICAL': {'highlight': Back.RED, 'base': Fore.RED},
     'ERROR': {'highlight': Back.RED, 'base': Fore.RED},
@@ -38,31 +56,33 @@ LEVEL_COLOURS = {
     'DEBUG': {'highlight': Back.GREEN, 'base': Fore.LIGHTGREEN_EX}
 }
 
+# Loggers of our own services, highlighted in coloured output...
+OWN_LOGGERS: tuple[str, ...] = ('universal', 'api', 'core', 'bot', 'server')
+
+DATE_FORMAT: str = '%Y-%m-%d %H:%M:%S'
+PLAIN_FORMAT: str = '[{asctime}] [{levelname:<8}] {name:<20}: {message}'
+
 
 class Formatter:
+    """Formats records as a single line, optionally coloured by level.
 
-    def colour_format(self, record: logging.LogRecord) -> str:
-        colours: dict[str, str] = LEVEL_COLOURS[record.levelname]
-
-        name_back = Back.MAGENTA if record.name.startswith(
-            (
-                'universal',
-                'api',
-                'core',
-                'bot',
-                'server'
-            )
-        ) else Back.BLACK
-
-        name_fore = Fore.BLACK if record.name.startswith(
-            (
-                'universal',
-                'api',
-                'core',
-                'bot',
-                'server'
-            )
-        ) else Fore.WHITE
+    The underlying logging.Formatter objects are built once for each level (and for our own loggers or not),
+    then reused for every record.
+    """
+
+    def __init__(self) -> None:
+        self._plain: logging.Formatter = logging.Formatter(fmt=PLAIN_FORMAT, datefmt=DATE_FORMAT, style='{')
+        self._colour: dict[tuple[str, bool], logging.Formatter] = {}
+
+    def _colour_formatter(self, levelname: str, own: bool, /) -> logging.Formatter:
+        try:
+            return self._colour[(levelname, own)]
+        except KeyError:
+            pass
+
+        colours: dict[str, str] = LEVEL_COLOURS.get(levelname, LEVEL_COLOURS['INFO'])
+        name_back: str = Back.MAGENTA if own else Back.BLACK
+        name_fore: str = Fore.BLACK if own else Fore.WHITE
 
         fmt: str = Back.BLACK + \
                    '[{asctime}] ' + \
@@ -77,26 +97,349 @@ class Formatter:
                    colours['base'] + \
                    ': {message}'
 
-        formatter = logging.Formatter(fmt=fmt, datefmt='%Y-%m-%d %H:%M:%S', style='{')
-        return formatter.format(record)
+        formatter = self._colour[(levelname, own)] = logging.Formatter(fmt=fmt, datefmt=DATE_FORMAT, style='{')
+        return formatter
+
+    def colour_format(self, record: logging.LogRecord) -> str:
+        own: bool = record.name.startswith(OWN_LOGGERS)
+        return self._colour_formatter(record.levelname, own).format(record) + Style.RESET_ALL
 
     def format(self, record: logging.LogRecord) -> str:
-        fmt: str = '[{asctime}] [{levelname:<8}] {name:<20}: {message}'
+        return self._plain.format(record)
+
+
+class ConsoleSink:
+    """Writes formatted lines to a stream. Coloured when the stream is a terminal."""
+
+    def __init__(self, stream: TextIO, /) -> None:
+        self.stream = stream
+
+    def write(self, items: list[tuple[Formatter, logging.LogRecord]], /) -> None:
+        lines: list[str] = []
+        for formatter, record in items:
+            try:
+                lines.append(formatter.colour_format(record) if COLOUR else formatter.format(record))
+            except Exception:
+                lines.append(f'Unable to format log record: {record!r}')
+
+        self.stream.write('\n'.join(lines) + '\n')
+        self.stream.flush()
+
+    def close(self) -> None:
+        pass
+
+
+class JSONSink:
+    """Writes one JSON object per record to a file, rotating it by size and by time.
+
+    Rotated files are gzipped next to the log as ``<name>.<timestamp>.gz``, and only the newest ``backups`` are kept.
+
+    Parameters
+    ----------
+    path: str | pathlib.Path
+        The log file. Its directory is created if needed.
+    max_bytes: int
+        Rotate once the file grows past this size. 0 disables size rotation. Defaults to 10MB.
+    interval: float
+        Rotate when a write falls into a new interval (in seconds, aligned to UTC) than the previous write.
+        E.g. 86400 rotates daily at midnight UTC. 0 disables time rotation. Defaults to 86400.
+    backups: int
+        How many rotated files are kept. Defaults to 14.
+    """
+
+    def __init__(
+            self,
+            path: str | pathlib.Path,
+            /,
+            *,
+            max_bytes: int = 10_000_000,
+            interval: float = 86400,
+            backups: int = 14
+    ) -> None:
+        self.path = pathlib.Path(path)
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backups = backups
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: TextIO = open(self.path, 'a', encoding='utf-8')
+
+        # A file left by a previous run may belong to an earlier interval...
+        self._last_write: float = self.path.stat().st_mtime if self.path.stat().st_size else time.time()
+
+    @staticmethod
+    def serialize(record: logging.LogRecord, /) -> str:
+        created: datetime.datetime = datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc)
+        data: dict[str, Any] = {
+            'time': created.isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+
+        if record.exc_text:
+            data['exception'] = record.exc_text
+
+        repeated: int | None = getattr(record, 'repeated', None)
+        if repeated:
+            data['repeated'] = repeated
+
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+    def _due(self, now: float, /) -> bool:
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            return True
+
+        if self.interval and now // self.interval != self._last_write // self.interval:
+            return self._file.tell() > 0
+
+        return False
+
+    def rotate(self) -> None:
+        """Close the file, gzip it as a rotated file, delete the oldest rotated files and start a new file."""
+        self._file.close()
+
+        stamp: str = datetime.datetime.now(tz=datetime.timezone.utc).strftime('%Y%m%dT%H%M%S%f')
+        rotated: pathlib.Path = self.path.with_name(f'{self.path.name}.{stamp}.gz')
+
+        with open(self.path, 'rb') as source, gzip.open(rotated, 'wb') as target:
+            shutil.copyfileobj(source, target)
+
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+        # Timestamps sort in the order they were written...
+        old: list[pathlib.Path] = sorted(self.path.parent.glob(f'{self.path.name}.*.gz'))
+        for path in old[:max(0, len(old) - self.backups)]:
+            path.unlink(missing_ok=True)
+
+    def write(self, items: list[tuple[Formatter, logging.LogRecord]], /) -> None:
+        now: float = time.time()
+        if self._due(now):
+            self.rotate()
+
+        lines: list[str] = []
+        for _, record in items:
+            try:
+                lines.append(self.serialize(record))
+            except Exception:
+                lines.append(json.dumps({'message': f'Unable to serialize log record: {record!r}'}))
+
+        self._file.write('\n'.join(lines) + '\n')
+        self._file.flush()
+        self._last_write = now
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class Repeats:
+    """Collapses identical messages (same logger, level and message) within a window.
+
+    The first occurrence is written straight away. Repeats within ``window`` seconds of it are counted instead,
+    and written once the window has passed as a single record, with the amount of repeats in its ``repeated``.
+
+    Parameters
+    ----------
+    window: float
+        How long (in seconds) repeats are collapsed for.
+    limit: int
+        The most distinct messages tracked at once. Past this, new messages are simply not collapsed.
+    """
+
+    def __init__(self, window: float, /, *, limit: int = 1000) -> None:
+        self.window = window
+        self.limit = limit
+
+        # key: [window start, repeats, last repeat]...
+        self._seen: dict[tuple[str, int, str], list[Any]] = {}
 
-        formatter = logging.Formatter(fmt=fmt, datefmt='%Y-%m-%d %H:%M:%S', style='{')
-        return formatter.format(record)
+    def check(self, record: logging.LogRecord, now: float, /) -> bool:
+        """Whether the record should be written now."""
+        key: tuple[str, int, str] = (record.name, record.levelno, record.getMessage())
+
+        try:
+            entry: list[Any] = self._seen[key]
+        except KeyError:
+            if len(self._seen) < self.limit:
+                self._seen[key] = [now, 0, None]
+            return True
+
+        entry[1] += 1
+        entry[2] = record
+        return False
+
+    def expired(self, now: float, /) -> list[logging.LogRecord]:
+        """Summary records of every window that has passed. Messages without repeats are simply forgotten."""
+        summaries: list[logging.LogRecord] = []
+
+        for key, (started, repeats, last) in list(self._seen.items()):
+            if now - started < self.window:
+                continue
+
+            del self._seen[key]
+            if repeats:
+                summary: logging.LogRecord = copy.copy(last)
+                summary.repeated = repeats
+                summary.msg = summary.message = f'{last.getMessage()} (repeated {repeats} times in {self.window:g}s)'
+                summaries.append(summary)
+
+        return summaries
+
+    def flush(self) -> list[logging.LogRecord]:
+        """Summary records of every window, whether it has passed or not."""
+        return self.expired(float('inf'))
+
+
+class _Writer:
+    """The background thread writing queued records to a sink, so logging never blocks on I/O in the calling thread.
+
+    There is a single writer per process, shared by every Handler, so lines from different loggers stay in order.
+    """
+
+    def __init__(self, sink: ConsoleSink | JSONSink, /, *, repeat_window: float = 0) -> None:
+        self.sink = sink
+        self.queue: queue.Queue[tuple[Formatter, logging.LogRecord] | None] = queue.Queue()
+        self.repeats: Repeats | None = Repeats(repeat_window) if repeat_window > 0 else None
+
+        self._formatter: Formatter = Formatter()
+        self._thread: threading.Thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+        atexit.register(self.close)
+
+    def _summaries(self, records: list[logging.LogRecord], /) -> list[tuple[Formatter, logging.LogRecord]]:
+        return [(self._formatter, record) for record in records]
+
+    def _run(self) -> None:
+        # Wake up now and then while idle, so collapsed repeats are written once their window passes...
+        timeout: float | None = max(1.0, self.repeats.window / 4) if self.repeats else None
+
+        while True:
+            try:
+                item: tuple[Formatter, logging.LogRecord] | None = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                self._write(self._summaries(self.repeats.expired(time.time())))
+                continue
+
+            items: list[tuple[Formatter, logging.LogRecord]] = []
+            now: float = time.time()
+
+            # Write everything waiting in one go, instead of a write and flush per record...
+            while True:
+                if item is None:
+                    if self.repeats:
+                        items.extend(self._summaries(self.repeats.flush()))
+
+                    self._write(items)
+                    self.queue.task_done()
+                    self.sink.close()
+                    return
+
+                if self.repeats is None or self.repeats.check(item[1], now):
+                    items.append(item)
+
+                self.queue.task_done()
+
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if self.repeats:
+                items.extend(self._summaries(self.repeats.expired(now)))
+
+            self._write(items)
+
+    def _write(self, items: list[tuple[Formatter, logging.LogRecord]], /) -> None:
+        if not items:
+            return
+
+        try:
+            self.sink.write(items)
+        except (OSError, ValueError):
+            # The sink went away (E.g. a closed pipe or a full disk). There is nowhere left to log to...
+            pass
+
+    def flush(self) -> None:
+        """Block until every queued record has been written."""
+        if self._thread.is_alive():
+            self.queue.join()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join(timeout=5)
+
+
+_writer: _Writer | None = None
+_writer_lock: threading.Lock = threading.Lock()
+
+
+def _get_writer() -> _Writer:
+    global _writer
+
+    with _writer_lock:
+        if _writer is None:
+            # Imported here, as the config is loaded by a module which itself uses this handler...
+            from .database import CONFIG
+
+            config: dict[str, Any] = CONFIG.get('LOGGING', {})
+            sink: ConsoleSink | JSONSink
+
+            if config.get('sink', 'console') == 'json':
+                sink = JSONSink(
+                    config.get('path', 'logs/codejam.jsonl'),
+                    max_bytes=config.get('max_bytes', 10_000_000),
+                    interval=config.get('rotate_interval', 86400),
+                    backups=config.get('backups', 14)
+                )
+            else:
+                sink = ConsoleSink(sys.stdout)
+
+            _writer = _Writer(sink, repeat_window=config.get('repeat_window', 0))
+
+    return _writer
 
 
 class Handler(logging.Handler):
+    """Queues records for the shared background writer thread.
+
+    emit() only prepares the record and puts it on a queue, so logging from the event loop never waits on I/O.
+    Records are formatted and written in order by the writer, which is flushed on exit.
+    """
 
     def __init__(self, level: int) -> None:
         super().__init__(level=level)
 
         self._level = level
         self._formatter: Formatter = Formatter()
+        self._writer: _Writer = _get_writer()
+
+    def prepare(self, record: logging.LogRecord, /) -> logging.LogRecord:
+        """Resolve the message in the calling thread, as its arguments may have changed by the time it is written.
+
+        A copy is queued, so other handlers of the same record see it unchanged.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self._formatter._plain.formatException(record.exc_info)
+
+        # The traceback is already text, and holding onto the frames would keep their locals alive...
+        record.exc_info = None
+        return record
 
     def emit(self, record: logging.LogRecord) -> None:
-        if record.levelno >= self._level:
-            print(self._formatter.colour_format(record))
+        if record.levelno < self._level:
+            return
+
+        try:
+            self._writer.queue.put_nowait((self._formatter, self.prepare(record)))
+        except Exception:
+            self.handleError(record)
 
-        self.flush()
+    def flush(self) -> None:
+        self._writer.flush()
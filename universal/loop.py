@@ -0,0 +1,199 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Any
+
+from .database import CONFIG
+from .logger import Handler
+
+
+__all__ = ('LoopMonitor', 'install_uvloop')
+
+
+logging_level: int = CONFIG['LOGGING']['level']
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(level=logging_level)
+logger.addHandler(Handler(level=logging_level))
+logger.propagate = False
+
+
+# Frames of asyncio itself are the same for every stall, so they are left out of the logged stack...
+ASYNCIO_PATH: str = os.path.dirname(asyncio.__file__)
+
+
+def install_uvloop(enabled: bool, /) -> bool:
+    """Use uvloop for every event loop created after this, when enabled and installed.
+
+    uvloop is optional. When it is enabled but not installed a warning is logged, and the default loop is used.
+    Returns whether uvloop is in use.
+    """
+    if not enabled:
+        return False
+
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning('uvloop is enabled in config.toml, but not installed. Using the default event loop.')
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info(f'Using uvloop ({uvloop.__version__}).')
+    return True
+
+
+class LoopMonitor:
+    """Measures event loop scheduling lag, and logs what was running while the loop stalled.
+
+    A heartbeat task sleeps for ``interval`` seconds at a time. How much later than asked it wakes up is the lag:
+    the time the loop spent running other callbacks before it could get back to the heartbeat.
+
+    A watchdog thread watches the heartbeat. When the loop has not come back for ``threshold`` seconds past
+    the interval, it captures the stack of the loop thread, which is the code responsible for the stall,
+    and logs it once the stall is over (with how long it lasted).
+
+    Parameters
+    ----------
+    interval: float
+        How often (in seconds) lag is sampled. Defaults to 0.25.
+    threshold: float
+        How much lag (in seconds) counts as a stall. Defaults to 0.1.
+    maxlen: int
+        The amount of recent lag samples kept for percentiles. Defaults to 2400, 10 minutes at the default interval.
+    """
+
+    def __init__(self, *, interval: float = 0.25, threshold: float = 0.1, maxlen: int = 2400) -> None:
+        self.interval = interval
+        self.threshold = threshold
+
+        self.samples: collections.deque[float] = collections.deque(maxlen=maxlen)
+        self.stalls: int = 0
+        self.worst: float = 0.0
+
+        self._beat: float = time.monotonic()
+        # The stack captured by the watchdog, with the beat it was captured after...
+        self._stack: tuple[float, list[str]] | None = None
+        self._loop_thread: int | None = None
+
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped: threading.Event = threading.Event()
+
+    def start(self) -> None:
+        """Start monitoring the running loop."""
+        if self._task is not None:
+            return
+
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected: float = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+
+            now: float = time.monotonic()
+            previous: float = self._beat
+            self._beat = now
+
+            # Cleared on every beat, a stack from a beat which was only just under the threshold is never reused...
+            captured: tuple[float, list[str]] | None = self._stack
+            self._stack = None
+
+            lag: float = max(0.0, now - expected)
+            self.samples.append(lag)
+            self.worst = max(self.worst, lag)
+
+            if lag < self.threshold:
+                continue
+
+            self.stalls += 1
+            stack: list[str] | None = captured[1] if captured and captured[0] == previous else None
+
+            message: str = f'Event loop stalled for {lag * 1000:.0f}ms.'
+            if stack:
+                message += ' The loop thread was running:\n' + ''.join(stack).rstrip()
+
+            logger.warning(message)
+
+    def _watch(self) -> None:
+        # Checked a few times per threshold, so even short stalls are caught in the act...
+        period: float = max(0.01, self.threshold / 4)
+
+        while not self._stopped.wait(period):
+            beat: float = self._beat
+
+            # Only one stack per stall. One captured after an older beat is stale, and replaced...
+            if self._stack is not None and self._stack[0] == beat:
+                continue
+
+            if time.monotonic() - beat < self.interval + self.threshold:
+                continue
+
+            frame: Any = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+
+            frames: traceback.StackSummary = traceback.extract_stack(frame)
+            own: list[traceback.FrameSummary] = [f for f in frames if not f.filename.startswith(ASYNCIO_PATH)]
+            self._stack = (beat, traceback.StackSummary.from_list(own or frames).format())
+
+    def percentiles(self, *percentiles: float) -> list[float]:
+        """The given percentiles (0 to 100) of the recent lag samples in seconds, by nearest rank."""
+        samples: list[float] = sorted(self.samples)
+        if not samples:
+            return [0.0 for _ in percentiles]
+
+        return [samples[min(len(samples) - 1, int(len(samples) * p / 100))] for p in percentiles]
+
+    def stats(self) -> dict[str, float]:
+        """Lag statistics (in milliseconds) from the recent samples, and the amount of stalls since starting."""
+        p50, p95, p99 = self.percentiles(50, 95, 99)
+
+        return {
+            'p50': p50 * 1000,
+            'p95': p95 * 1000,
+            'p99': p99 * 1000,
+            'max': max(self.samples, default=0.0) * 1000,
+            'worst': self.worst * 1000,
+            'stalls': self.stalls
+        }
@@ -0,0 +1,179 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import collections
+import logging
+import time
+from collections.abc import Iterable
+from typing import Any
+
+import discord
+
+from .database import CONFIG
+from .logger import Handler
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, peak memory is simply not reported there...
+    resource = None
+
+
+__all__ = ('MemberCache', 'member_cache_options', 'ready_report', 'MEMBER_CACHE')
+
+
+logging_level: int = CONFIG['LOGGING']['level']
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(level=logging_level)
+logger.addHandler(Handler(level=logging_level))
+logger.propagate = False
+
+
+# 'participants' only caches registered members (and managers). 'all' chunks and caches the whole guild, as before...
+MEMBER_CACHE: str = CONFIG.get('DISCORD', {}).get('member_cache', 'participants')
+
+# Discord answers a member request with at most 100 members...
+QUERY_LIMIT: int = 100
+
+# Used to report the time it took to become ready...
+STARTED: float = time.perf_counter()
+
+
+def member_cache_options(intents: discord.Intents, /) -> dict[str, Any]:
+    """The keyword arguments passed to the client, for the configured member cache policy.
+
+    With the 'participants' policy the guild is not chunked at login, and members are not cached when they join,
+    update or speak. Instead a :class:`MemberCache` fills the cache with the members we actually care about.
+    """
+    if MEMBER_CACHE == 'all':
+        return {'chunk_guild_at_startup': True, 'member_cache_flags': discord.MemberCacheFlags.from_intents(intents)}
+
+    return {'chunk_guild_at_startup': False, 'member_cache_flags': discord.MemberCacheFlags.none()}
+
+
+def ready_report(client: discord.Client, /) -> str:
+    """A one line summary of startup time, cached members and peak memory. Logged on ready to compare policies."""
+    elapsed: float = time.perf_counter() - STARTED
+    cached: int = sum(len(guild.members) for guild in client.guilds)
+
+    report: str = f'Ready in {elapsed:.2f}s with ({cached}) members cached, policy: {MEMBER_CACHE}'
+    if resource is not None:
+        # ru_maxrss is in kilobytes on Linux...
+        report += f', peak memory: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB'
+
+    return report + '.'
+
+
+class MemberCache:
+    """The participant-only member cache policy.
+
+    Registered participants (and members holding one of the ``keep_roles``) are kept in discord.py's own member
+    cache, so their roles stay up to date through gateway events. Anyone else is fetched on demand and held in a
+    small LRU, which is never updated by the gateway and so is only used for display purposes (E.g. names).
+
+    Parameters
+    ----------
+    size: int
+        How many on demand members are kept. Defaults to 256.
+    keep_roles: Iterable[int]
+        Role IDs whose holders are kept in the member cache once seen. E.g. the manager role.
+    """
+
+    def __init__(self, *, size: int = 256, keep_roles: Iterable[int] = ()) -> None:
+        self.size = size
+        self.keep_roles: set[int] = set(keep_roles)
+
+        self._lru: collections.OrderedDict[tuple[int, int], discord.Member] = collections.OrderedDict()
+
+        # Every member requested so far, including those who were not in the guild (E.g. they left)...
+        self._requested: set[tuple[int, int]] = set()
+
+    async def ensure(self, guild: discord.Guild, member_ids: Iterable[int], /) -> int:
+        """Bring the given members into the guild's member cache, if they are not already.
+
+        Members are requested over the gateway in batches, which is far cheaper than fetching them one by one.
+        Each member is only requested once. Members who were not in the guild are not requested again until
+        :meth:`forget` is called for them (E.g. when they join). Returns the amount of members that were requested.
+        """
+        missing: list[int] = [
+            id_ for id_ in dict.fromkeys(member_ids)
+            if (guild.id, id_) not in self._requested and guild.get_member(id_) is None
+        ]
+
+        # Marked before requesting, so concurrent calls do not request the same members...
+        self._requested.update((guild.id, id_) for id_ in missing)
+
+        for start in range(0, len(missing), QUERY_LIMIT):
+            batch: list[int] = missing[start:start + QUERY_LIMIT]
+
+            try:
+                await guild.query_members(user_ids=batch, limit=len(batch), cache=True)
+            except TimeoutError as e:
+                # Requested again by the next call...
+                self._requested.difference_update((guild.id, id_) for id_ in batch)
+                logger.warning(f'Timed out requesting ({len(batch)}) members from {guild}: {e}')
+
+        for id_ in missing:
+            self._lru.pop((guild.id, id_), None)
+
+        return len(missing)
+
+    def forget(self, guild_id: int, member_id: int, /) -> None:
+        """Allow a member to be requested again by :meth:`ensure`. Call this when a member joins the guild."""
+        self._requested.discard((guild_id, member_id))
+
+    async def keep(self, member: discord.Member | discord.User, /) -> None:
+        """Keep a member seen in an interaction cached, when they hold one of the keep roles."""
+        if not isinstance(member, discord.Member) or member.guild.get_member(member.id) is not None:
+            return
+
+        if any(role.id in self.keep_roles for role in member.roles):
+            await self.ensure(member.guild, [member.id])
+
+    async def get(self, guild: discord.Guild, member_id: int, /) -> discord.Member | None:
+        """Get a member from the cache, or the LRU, fetching them when they are in neither.
+
+        Returns None when the member is not in the guild.
+        """
+        member: discord.Member | None = guild.get_member(member_id)
+        if member is not None:
+            return member
+
+        key: tuple[int, int] = (guild.id, member_id)
+
+        try:
+            self._lru.move_to_end(key)
+            return self._lru[key]
+        except KeyError:
+            pass
+
+        try:
+            member = await guild.fetch_member(member_id)
+        except discord.NotFound:
+            return None
+
+        self._lru[key] = member
+        while len(self._lru) > self.size:
+            self._lru.popitem(last=False)
+
+        return member
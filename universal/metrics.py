@@ -0,0 +1,234 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import contextlib
+import math
+import time
+from collections.abc import Iterator, Sequence
+
+
+__all__ = ('Counter', 'Gauge', 'Histogram', 'MetricsRegistry', 'PROMETHEUS_CONTENT_TYPE')
+
+
+PROMETHEUS_CONTENT_TYPE: str = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Default histogram buckets (in seconds), from a fast cache hit to a slow Discord or database call...
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str, /, *, quotes: bool = True) -> str:
+    value = value.replace('\\', r'\\').replace('\n', r'\n')
+    return value.replace('"', r'\"') if quotes else value
+
+
+def _number(value: float, /) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """The base of every metric. Values are kept per combination of label values.
+
+    Parameters
+    ----------
+    name: str
+        The metric name. E.g. 'codejam_team_feed_seconds'.
+    documentation: str
+        The HELP text.
+    labels: Sequence[str]
+        The label names. Every update must pass a value for each of them, as keyword arguments.
+    """
+
+    type: str = 'untyped'
+
+    def __init__(self, name: str, documentation: str, *, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels: tuple[str, ...] = tuple(labels)
+
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def _key(self, labels: dict[str, object], /) -> tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f'{self.name} expects the labels {self.labels}, got {tuple(labels)}.')
+
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _labels(self, key: tuple[str, ...], /, **extra: str) -> str:
+        pairs: list[tuple[str, str]] = [*zip(self.labels, key), *extra.items()]
+        if not pairs:
+            return ''
+
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f'{self.name}{self._labels(key)} {_number(value)}'
+
+    def render(self) -> str:
+        lines: list[str] = [
+            f'# HELP {self.name} {_escape(self.documentation, quotes=False)}',
+            f'# TYPE {self.name} {self.type}',
+            *self.samples()
+        ]
+
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """A value which only goes up. E.g. the amount of webhooks received."""
+
+    type = 'counter'
+
+    def inc(self, amount: float = 1.0, /, **labels: object) -> None:
+        if amount < 0:
+            raise ValueError('Counters can only be increased.')
+
+        key: tuple[str, ...] = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """A value which goes up and down. E.g. the amount of connected SSE subscribers."""
+
+    type = 'gauge'
+
+    def set(self, value: float, /, **labels: object) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, /, **labels: object) -> None:
+        key: tuple[str, ...] = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, /, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets. E.g. request latencies in seconds.
+
+    Parameters
+    ----------
+    buckets: Sequence[float]
+        The upper bounds of the buckets. +Inf is always added.
+    """
+
+    type = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            *,
+            labels: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labels=labels)
+
+        if 'le' in self.labels:
+            raise ValueError('Histograms can not have a label named le.')
+
+        self.buckets: tuple[float, ...] = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+
+    def observe(self, value: float, /, **labels: object) -> None:
+        key: tuple[str, ...] = self._key(labels)
+        counts: list[int] = self._counts.setdefault(key, [0] * len(self.buckets))
+
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+
+        self._values[key] = self._values.get(key, 0.0) + value
+
+    @contextlib.contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """Observe how long (in seconds) the body of a with block takes, even when it raises."""
+        start: float = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def value(self, **labels: object) -> float:
+        """The amount of observations."""
+        return float(sum(self._counts.get(self._key(labels), ())))
+
+    def samples(self) -> Iterator[str]:
+        for key, counts in sorted(self._counts.items()):
+            cumulative: int = 0
+
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f'{self.name}_bucket{self._labels(key, le=_number(bound))} {cumulative}'
+
+            yield f'{self.name}_sum{self._labels(key)} {_number(self._values[key])}'
+            yield f'{self.name}_count{self._labels(key)} {cumulative}'
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text format.
+
+    Metrics are created through the registry, and asking for a name twice returns the same metric.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def _get(self, cls: type[Metric], name: str, /, *args, **kwargs) -> Metric:
+        try:
+            metric: Metric = self._metrics[name]
+        except KeyError:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+
+        if type(metric) is not cls:
+            raise ValueError(f'{name} is already registered as a {metric.type}.')
+
+        return metric
+
+    def counter(self, name: str, documentation: str, *, labels: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, documentation, labels=labels)
+
+    def gauge(self, name: str, documentation: str, *, labels: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, documentation, labels=labels)
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            *,
+            labels: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get(Histogram, name, documentation, labels=labels, buckets=buckets)
+
+    def render(self) -> str:
+        """Every metric, in the Prometheus text exposition format."""
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
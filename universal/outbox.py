@@ -0,0 +1,54 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import json
+from typing import Any, NamedTuple
+
+
+__all__ = ('Job', 'JOB_STATUSES')
+
+
+# pending: waiting to run. running: claimed by a worker until its lease runs out. done / failed: finished...
+JOB_STATUSES: tuple[str, ...] = ('pending', 'running', 'done', 'failed')
+
+
+class Job(NamedTuple):
+    """A Discord side effect, committed to the outbox in the same transaction as the change that caused it.
+
+    Parameters
+    ----------
+    kind: str
+        What the job does. E.g. 'add_role' or 'delete_channel'. See bot.core.Outbox for every kind.
+    payload: dict[str, Any]
+        The JSON serializable data the job needs. E.g. {'guild_id': ..., 'role_id': ...}.
+    key: str
+        The idempotency key. A job with a key that has already been enqueued is ignored,
+        so a retried command can never enqueue the same side effect twice.
+    """
+
+    kind: str
+    payload: dict[str, Any]
+    key: str
+
+    def dumps(self) -> str:
+        return json.dumps(self.payload)
@@ -0,0 +1,205 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import asyncio
+import collections
+import datetime
+import logging
+import os
+import pathlib
+import re
+import sys
+import threading
+import time
+from collections.abc import Iterable
+from types import CodeType, FrameType
+from typing import NamedTuple
+
+from .database import CONFIG
+from .logger import Handler
+
+
+__all__ = ('Profile', 'SamplingProfiler')
+
+
+logging_level: int = CONFIG['LOGGING']['level']
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(level=logging_level)
+logger.addHandler(Handler(level=logging_level))
+logger.propagate = False
+
+
+# Characters which would break the collapsed stack format, or a file name...
+UNSAFE_FRAME: re.Pattern = re.compile(r'[;\n]')
+UNSAFE_NAME: re.Pattern = re.compile(r'[^\w.-]+')
+
+
+class Profile(NamedTuple):
+    """A finished profile.
+
+    Attributes
+    ----------
+    path: pathlib.Path
+        The collapsed stack file. Each line is ``frame;frame;frame count``, outermost frame first, which
+        flamegraph.pl, speedscope and most flame graph tools read directly.
+    samples: int
+        The amount of samples taken.
+    kept: int
+        The amount of samples written. Fewer than samples when the profile was scoped.
+    """
+
+    path: pathlib.Path
+    samples: int
+    kept: int
+
+
+class SamplingProfiler:
+    """Samples the stack of the event loop thread from a background thread, for a limited time.
+
+    Nothing is installed while no profile is running: no thread, no trace or profile hooks.
+    While running, a thread reads the loop thread's current frame ``1 / interval`` times a second.
+
+    A profile can be scoped to code objects (E.g. of route handlers or command callbacks). Only samples with
+    one of them somewhere on the stack are kept, so other work sharing the loop is left out.
+
+    Parameters
+    ----------
+    directory: str | pathlib.Path
+        Where profiles are written. Defaults to 'profiles'.
+    interval: float
+        Seconds between samples. Defaults to 0.01 (100 samples a second).
+    max_seconds: float
+        The longest a profile may run for. Defaults to 300.
+    """
+
+    def __init__(
+            self,
+            *,
+            directory: str | pathlib.Path = 'profiles',
+            interval: float = 0.01,
+            max_seconds: float = 300.0
+    ) -> None:
+        self.directory = pathlib.Path(directory)
+        self.interval = interval
+        self.max_seconds = max_seconds
+
+        self._running: bool = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @staticmethod
+    def _frame_name(code: CodeType, lineno: int, /) -> str:
+        name: str = f'{code.co_qualname} ({os.path.basename(code.co_filename)}:{lineno})'
+        return UNSAFE_FRAME.sub('_', name)
+
+    def _sample(
+            self,
+            thread_id: int,
+            stop: threading.Event,
+            stacks: collections.Counter[str],
+            scope: frozenset[CodeType],
+            totals: list[int],
+            /
+    ) -> None:
+        while not stop.wait(self.interval):
+            frame: FrameType | None = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+
+            totals[0] += 1
+            names: list[str] = []
+            scoped: bool = not scope
+
+            while frame is not None:
+                names.append(self._frame_name(frame.f_code, frame.f_lineno))
+                scoped = scoped or frame.f_code in scope
+                frame = frame.f_back
+
+            if scoped:
+                stacks[';'.join(reversed(names))] += 1
+
+    def _write(self, name: str, stacks: collections.Counter[str], /) -> pathlib.Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        stamp: str = datetime.datetime.now(tz=datetime.timezone.utc).strftime('%Y%m%dT%H%M%S')
+        path: pathlib.Path = self.directory / f'{UNSAFE_NAME.sub("_", name)}-{stamp}.folded'
+
+        with open(path, 'w', encoding='utf-8') as fp:
+            for stack, count in stacks.most_common():
+                fp.write(f'{stack} {count}\n')
+
+        return path
+
+    async def profile(self, seconds: float, /, *, name: str, scope: Iterable[CodeType] = ()) -> Profile:
+        """Profile the running event loop for the given amount of seconds, and write the result.
+
+        Parameters
+        ----------
+        seconds: float
+            How long to profile for. Capped at max_seconds.
+        name: str
+            Used in the file name. E.g. 'api' or 'bot'.
+        scope: Iterable[CodeType]
+            Only keep samples with one of these code objects on the stack. Keeps everything when empty.
+
+        Raises
+        ------
+        RuntimeError
+            A profile is already running.
+        """
+        if self._running:
+            raise RuntimeError('A profile is already running.')
+
+        self._running = True
+        seconds = max(0.1, min(seconds, self.max_seconds))
+
+        stop: threading.Event = threading.Event()
+        stacks: collections.Counter[str] = collections.Counter()
+        totals: list[int] = [0]
+
+        sampler: threading.Thread = threading.Thread(
+            target=self._sample,
+            args=(threading.get_ident(), stop, stacks, frozenset(scope), totals),
+            name='profiler',
+            daemon=True
+        )
+
+        logger.info(f'Profiling "{name}" for {seconds:g}s.')
+        start: float = time.perf_counter()
+
+        try:
+            sampler.start()
+            await asyncio.sleep(seconds)
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.join)
+            self._running = False
+
+        path: pathlib.Path = await asyncio.to_thread(self._write, name, stacks)
+        profile: Profile = Profile(path=path, samples=totals[0], kept=sum(stacks.values()))
+
+        elapsed: float = time.perf_counter() - start
+        logger.info(f'Wrote profile "{name}" ({profile.kept}/{profile.samples} samples, {elapsed:.1f}s) to {path}.')
+        return profile
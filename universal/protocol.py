@@ -0,0 +1,154 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import datetime
+import pathlib
+from collections.abc import Sequence
+from typing import Any, Protocol, Self, TypeAlias
+
+import asyncpg
+
+from .outbox import Job
+
+
+__all__ = ('DatabaseProtocol', 'Row')
+
+
+# A single row of data. Backends return either an asyncpg.Record or a dict, both are indexed by column name...
+Row: TypeAlias = asyncpg.Record | dict[str, Any]
+
+
+class DatabaseProtocol(Protocol):
+    """The public surface every CodeJam storage backend implements.
+
+    See universal.Database for the full documentation of each method.
+    Backends must keep the same semantics as PostgreSQL, for example:
+        - Unique constraint failures raise asyncpg.UniqueViolationError, with the failed constraint's name in
+          constraint_name. A team name constraint's name contains '_name_' on both backends.
+        - Deleting a team sets team_id to None for its members.
+        - languages are returned as a list of ints and timezone as a datetime.timedelta.
+        - Every method only reads and writes the data of the active event.
+        - Outbox jobs passed to a write are committed in the same transaction as the write.
+    """
+
+    # The active event...
+    event: int
+
+    @classmethod
+    async def setup(cls) -> Self:
+        ...
+
+    async def create_team(
+            self,
+            *,
+            name: str,
+            owner: int,
+            role_id: int,
+            text_id: int,
+            voice_id: int,
+            jobs: Sequence[Job] = ()
+    ) -> Row:
+        ...
+
+    async def create_member(
+            self,
+            *,
+            member_id: int,
+            languages: list[int],
+            timezone: datetime.timedelta,
+            solo: bool,
+            team_id: int | None = None
+    ) -> Row:
+        ...
+
+    async def edit_member_team(self, *, member_id: int, team_id: int | None, jobs: Sequence[Job] = ()) -> Row:
+        ...
+
+    async def edit_team_owner(self, *, member_id: int, team_id: int | None) -> Row:
+        ...
+
+    async def fetch_member(self, *, member_id: int, primary: bool = False) -> Row | None:
+        ...
+
+    async def fetch_members(self, *, primary: bool = False) -> list[Row]:
+        ...
+
+    async def fetch_team(
+            self,
+            *,
+            team_id: int | None = None,
+            token: str | None = None,
+            invite: str | None = None,
+            owner: int | None = None,
+            name: str | None = None,
+            text_id: int | None = None,
+            voice_id: int | None = None,
+            role_id: int | None = None,
+            primary: bool = False
+    ) -> list[Row]:
+        ...
+
+    async def fetch_teams(self, *, primary: bool = False) -> list[Row]:
+        ...
+
+    async def fetch_team_summaries(self, *, primary: bool = False) -> list[Row]:
+        ...
+
+    async def edit_team_name(self, *, team_id: int, name: str) -> Row:
+        ...
+
+    async def delete_team(self, team_id: int, *, jobs: Sequence[Job] = ()) -> Row:
+        ...
+
+    async def create_log(self, *, channel: int, invoker: int, command: str, error: str, traceback: str) -> int:
+        ...
+
+    async def fetch_log(self, identifier: int, *, primary: bool = False) -> Row | None:
+        ...
+
+    async def enqueue_jobs(self, jobs: Sequence[Job], /) -> None:
+        ...
+
+    async def claim_jobs(self, *, limit: int, lease: float) -> list[dict[str, Any]]:
+        ...
+
+    async def complete_job(self, job_id: int, /) -> None:
+        ...
+
+    async def extend_job(self, job_id: int, /, *, lease: float) -> None:
+        ...
+
+    async def update_job_payload(self, job_id: int, /, values: dict[str, Any]) -> None:
+        ...
+
+    async def retry_job(self, job_id: int, /, *, delay: float, error: str) -> None:
+        ...
+
+    async def fail_job(self, job_id: int, /, *, error: str) -> None:
+        ...
+
+    async def fetch_outbox_depth(self, *, prefix: str | None = None) -> dict[str, int]:
+        ...
+
+    async def archive_event(self, event_id: int, *, directory: pathlib.Path) -> list[pathlib.Path]:
+        ...
@@ -0,0 +1,179 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import asyncio
+import json
+import logging
+import os
+import pathlib
+from collections.abc import Iterator
+from typing import IO, Any
+
+from .database import CONFIG
+from .logger import Handler
+
+
+__all__ = ('CAPTURE_KINDS', 'TrafficRecorder', 'read_capture')
+
+
+logging_level: int = CONFIG['LOGGING']['level']
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(level=logging_level)
+logger.addHandler(Handler(level=logging_level))
+logger.propagate = False
+
+
+# 'github' is a push webhook, 'update' is a team feed update signal from the bot...
+CAPTURE_KINDS: tuple[str, ...] = ('github', 'update')
+
+
+class TrafficRecorder:
+    """Appends incoming webhooks and team feed update signals to a capture file, to be replayed later.
+
+    Each request is one compact JSON line, with the keys:
+
+    - ``t``: When the request arrived, as a unix timestamp in seconds.
+    - ``k``: The kind of request. One of CAPTURE_KINDS.
+    - ``s``: The status code it was answered with.
+    - ``team``: The team id of a webhook.
+    - ``b``: The raw body of a webhook.
+
+    Tokens are never recorded. Lines are buffered and flushed every flush_interval seconds, and on close.
+    The recorder does nothing while path is empty.
+
+    Parameters
+    ----------
+    path: str | os.PathLike | None
+        The capture file. Appended to when it exists already.
+    max_bytes: int
+        Recording stops once the file is this large. 0 for no limit.
+    flush_interval: float
+        How often (in seconds) buffered lines are written out.
+    """
+
+    def __init__(
+            self,
+            path: str | os.PathLike | None,
+            /,
+            *,
+            max_bytes: int = 0,
+            flush_interval: float = 1.0
+    ) -> None:
+        self.path: pathlib.Path | None = pathlib.Path(path) if path else None
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+
+        self.recorded: int = 0
+        self._file: IO[str] | None = None
+        self._size: int = 0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether requests are being recorded."""
+        return self._file is not None
+
+    def start(self) -> None:
+        """Open the capture file and start flushing. Must be called from a running event loop."""
+        if self.path is None or self._file is not None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open('a', encoding='utf-8', buffering=2 ** 16)
+        self._size = self.path.stat().st_size
+        self._task = asyncio.create_task(self._flush_loop())
+
+        logger.info(f'Recording webhook and team feed traffic to "{self.path}".')
+
+    def record(self, kind: str, /, *, at: float, status: int, team: int | None = None, body: bytes = b'') -> None:
+        """Append a request to the capture.
+
+        Parameters
+        ----------
+        kind: str
+            One of CAPTURE_KINDS.
+        at: float
+            When the request arrived, from time.time().
+        status: int
+            The status code the request was answered with.
+        team: int | None
+            The team id of a webhook.
+        body: bytes
+            The raw body of a webhook.
+        """
+        if self._file is None:
+            return
+
+        entry: dict[str, Any] = {'t': round(at, 3), 'k': kind, 's': status}
+        if team is not None:
+            entry['team'] = team
+        if body:
+            entry['b'] = body.decode('utf-8', errors='replace')
+
+        line: str = json.dumps(entry, separators=(',', ':')) + '\n'
+        self._size += len(line)
+
+        if self.max_bytes and self._size > self.max_bytes:
+            logger.warning(f'Stopped recording, "{self.path}" reached {self.max_bytes} bytes.')
+            self._stop()
+            return
+
+        self._file.write(line)
+        self.recorded += 1
+
+    async def _flush_loop(self) -> None:
+        while self._file is not None:
+            await asyncio.sleep(self.flush_interval)
+
+            if self._file is not None:
+                self._file.flush()
+
+    def _stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    async def close(self) -> None:
+        """Stop recording, writing out any buffered lines."""
+        if self._file is None:
+            return
+
+        self._stop()
+        logger.info(f'Recorded {self.recorded} requests to "{self.path}".')
+
+
+def read_capture(path: str | os.PathLike, /) -> Iterator[dict[str, Any]]:
+    """Read a capture written by TrafficRecorder, skipping a line left half written by a crash."""
+    with open(path, 'r', encoding='utf-8') as fp:
+        for line in fp:
+            try:
+                entry: dict[str, Any] = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            if entry.get('k') in CAPTURE_KINDS:
+                yield entry
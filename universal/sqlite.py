@@ -0,0 +1,481 @@
+"""
+MIT License
+
+Copyright (c) 2023 EvieePy
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import asyncio
+import concurrent.futures
+import contextlib
+import csv
+import datetime
+import gzip
+import json
+import logging
+import pathlib
+import secrets
+import sqlite3
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any, Self, TypeVar
+
+import asyncpg
+
+from .database import CONFIG, EVENT, LEGACY_COLUMNS
+from .logger import Handler
+from .outbox import JOB_STATUSES, Job
+
+
+__all__ = ('SQLiteDatabase',)
+
+
+logging_level: int = CONFIG['LOGGING']['level']
+logger: logging.Logger = logging.getLogger(__name__)
+logger.setLevel(level=logging_level)
+logger.addHandler(Handler(level=logging_level))
+logger.propagate = False
+
+
+T = TypeVar('T')
+
+
+# Convert our custom column types back into the same Python types asyncpg returns...
+sqlite3.register_converter('JSON', json.loads)
+sqlite3.register_converter('INTERVAL', lambda b: datetime.timedelta(seconds=int(b)))
+sqlite3.register_converter('BOOLEAN', lambda b: bool(int(b)))
+sqlite3.register_converter('TIMESTAMP', lambda b: datetime.datetime.fromisoformat(b.decode()))
+
+
+# The schema objects from before events existed, which are dropped so they can be recreated...
+# An index keeps its name when its table is renamed, so it has to go too or the new index would never be created...
+LEGACY_OBJECTS: tuple[str, ...] = (
+    'DROP INDEX IF EXISTS members_team_id_idx',
+    'DROP VIEW IF EXISTS team_summary_source',
+    'DROP TRIGGER IF EXISTS team_summary_members_insert',
+    'DROP TRIGGER IF EXISTS team_summary_members_update',
+    'DROP TRIGGER IF EXISTS team_summary_members_delete',
+    'DROP TRIGGER IF EXISTS team_summary_teams_insert',
+    'DROP TRIGGER IF EXISTS team_summary_teams_update',
+    'DROP TABLE IF EXISTS team_summary'
+)
+
+# Event tables in the order they are archived. Rows are deleted in reverse...
+EVENT_TABLES: tuple[str, ...] = ('teams', 'members', 'error_log', 'team_summary')
+
+
+def row_factory(cursor: sqlite3.Cursor, row: tuple[Any, ...]) -> dict[str, Any]:
+    # Like asyncpg, when a joined column name is duplicated the last column wins...
+    return {description[0]: value for description, value in zip(cursor.description, row)}
+
+
+def constraint_name(message: str, /) -> str:
+    """Return the name of the constraint in a SQLite unique failure, named the way PostgreSQL names it.
+
+    SQLite only names expression indexes (E.g. "UNIQUE constraint failed: index 'teams_name_lower_idx'"),
+    other failures list their columns instead (E.g. "UNIQUE constraint failed: teams.event_id, teams.name"),
+    which become '<table>_<column>_..._key'.
+    """
+    failed: str = message.removeprefix('UNIQUE constraint failed: ')
+
+    if failed.startswith('index '):
+        return failed.removeprefix('index ').strip("'")
+
+    columns: list[str] = [c.strip() for c in failed.split(',')]
+    table: str = columns[0].split('.')[0]
+
+    return '_'.join([table, *(c.split('.')[-1] for c in columns), 'key'])
+
+
+@contextlib.contextmanager
+def unique_violations() -> Iterator[None]:
+    """Raise unique constraint failures as asyncpg.UniqueViolationError, like the PostgreSQL backend.
+
+    The error's constraint_name is set, so callers can tell which constraint failed on either backend.
+    """
+    try:
+        yield
+    except sqlite3.IntegrityError as e:
+        if str(e).startswith('UNIQUE'):
+            error: asyncpg.UniqueViolationError = asyncpg.UniqueViolationError(str(e))
+            error.constraint_name = constraint_name(str(e))
+
+            raise error from e
+        raise
+
+
+class SQLiteDatabase:
+    """Embedded SQLite storage backend, for small jams that don't want to run a PostgreSQL server.
+
+    The database runs in WAL mode on a single connection. Every query runs on one worker thread,
+    so queries are serialized and never block the event loop.
+    """
+
+    def __init__(self) -> None:
+        self._connection: sqlite3.Connection | None = None
+        self.event: int = EVENT
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite')
+
+    @classmethod
+    async def setup(cls) -> Self:
+        self_: Self = cls()
+
+        logger.info('Setting up SQLite Database.')
+
+        # We have to do this for testing purposes, unfortunately...
+        try:
+            with open('../SCHEMA.sqlite.sql', 'r') as schema:
+                sql: str = schema.read()
+        except FileNotFoundError:
+            with open('SCHEMA.sqlite.sql', 'r') as schema:
+                sql: str = schema.read()
+
+        path: str = CONFIG['DATABASE'].get('path', 'codejam.sqlite3')
+
+        def connect() -> sqlite3.Connection:
+            connection = sqlite3.connect(
+                path,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            connection.row_factory = row_factory
+
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+            connection.execute('PRAGMA foreign_keys = ON')
+
+            columns: list[str] = [c['name'] for c in connection.execute('PRAGMA table_info(teams)').fetchall()]
+            legacy: bool = bool(columns) and 'event_id' not in columns
+
+            # Tables from before events existed are migrated into the active event...
+            if legacy:
+                logger.warning(f'Migrating tables from before events existed into event ({self_.event}).')
+
+                connection.execute('PRAGMA foreign_keys = OFF')
+                for statement in LEGACY_OBJECTS:
+                    connection.execute(statement)
+
+                for table in LEGACY_COLUMNS:
+                    connection.execute(f'ALTER TABLE {table} RENAME TO {table}_legacy')
+
+            connection.executescript(sql)
+            connection.execute('INSERT OR IGNORE INTO events(event_id) VALUES (?)', (self_.event,))
+
+            if legacy:
+                connection.execute('BEGIN')
+                for table, columns_ in LEGACY_COLUMNS.items():
+                    query: str = f'INSERT INTO {table} (event_id, {columns_}) SELECT ?, {columns_} FROM {table}_legacy'
+                    connection.execute(query, (self_.event,))
+
+                for table in ('members', 'error_log', 'teams'):
+                    connection.execute(f'DROP TABLE {table}_legacy')
+                connection.execute('COMMIT')
+
+                connection.execute('PRAGMA foreign_keys = ON')
+
+            return connection
+
+        self_._connection = await self_._run(connect)
+        logger.info(f'Completed SQLite Database Setup. Event: ({self_.event}). Using file: {path}')
+
+        return self_
+
+    async def _run(self, func: Callable[[], T], /) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func)
+
+    async def _fetch(self, query: str, *args: Any) -> list[dict[str, Any]]:
+        def execute() -> list[dict[str, Any]]:
+            with unique_violations():
+                # Always fetch every row, a RETURNING statement is not finished until it has been fully read...
+                return self._connection.execute(query, args).fetchall()
+
+        return await self._run(execute)
+
+    async def _fetchrow(self, query: str, *args: Any) -> dict[str, Any] | None:
+        rows: list[dict[str, Any]] = await self._fetch(query, *args)
+        return rows[0] if rows else None
+
+    def _enqueue(self, jobs: Sequence[Job], /) -> None:
+        # Only called on the worker thread, inside a transaction...
+        query: str = """
+        INSERT INTO outbox(event_id, idempotency_key, kind, payload) VALUES (?, ?, ?, ?)
+        ON CONFLICT (idempotency_key) DO NOTHING
+        """
+
+        self._connection.executemany(query, [(self.event, job.key, job.kind, job.dumps()) for job in jobs])
+
+    async def _write(self, query: str, *args: Any, jobs: Sequence[Job] = ()) -> dict[str, Any] | None:
+        """Run a write returning a single row, committing any outbox jobs in the same transaction."""
+        if not jobs:
+            return await self._fetchrow(query, *args)
+
+        def execute() -> dict[str, Any] | None:
+            self._connection.execute('BEGIN')
+
+            try:
+                with unique_violations():
+                    rows: list[dict[str, Any]] = self._connection.execute(query, args).fetchall()
+                self._enqueue(jobs)
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+
+            self._connection.execute('COMMIT')
+            return rows[0] if rows else None
+
+        return await self._run(execute)
+
+    async def create_team(
+            self,
+            *,
+            name: str,
+            owner: int,
+            role_id: int,
+            text_id: int,
+            voice_id: int,
+            jobs: Sequence[Job] = ()
+    ) -> dict[str, Any]:
+        id_: int = secrets.randbits(32)
+        token: str = secrets.token_urlsafe(32)
+        invite: str = secrets.token_urlsafe(4)
+
+        query: str = """INSERT INTO teams(event_id, team_id, token, invite, name, owner, role_id, text_id, voice_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) RETURNING *"""
+
+        args: tuple[Any, ...] = (self.event, id_, token, invite, name, owner, role_id, text_id, voice_id)
+        return await self._write(query, *args, jobs=jobs)
+
+    async def create_member(
+            self,
+            *,
+            member_id: int,
+            languages: list[int],
+            timezone: datetime.timedelta,
+            solo: bool,
+            team_id: int | None = None
+    ) -> dict[str, Any]:
+        query: str = """INSERT INTO members(event_id, member_id, languages, timezone, solo, team_id)
+                        VALUES (?, ?, ?, ?, ?, ?) RETURNING *"""
+
+        seconds: int = int(timezone.total_seconds())
+        return await self._fetchrow(query, self.event, member_id, json.dumps(languages), seconds, solo, team_id)
+
+    async def edit_member_team(
+            self,
+            *,
+            member_id: int,
+            team_id: int | None,
+            jobs: Sequence[Job] = ()
+    ) -> dict[str, Any]:
+        query: str = """UPDATE members SET team_id = ? WHERE event_id = ? AND member_id = ? RETURNING *"""
+        return await self._write(query, team_id, self.event, member_id, jobs=jobs)
+
+    async def edit_team_owner(self, *, member_id: int, team_id: int | None) -> dict[str, Any]:
+        query: str = """UPDATE teams SET owner = ? WHERE event_id = ? AND team_id = ? RETURNING *"""
+        return await self._fetchrow(query, member_id, self.event, team_id)
+
+    async def fetch_member(self, *, member_id: int, primary: bool = False) -> dict[str, Any] | None:
+        query: str = """
+        SELECT * FROM members
+        LEFT OUTER JOIN teams ON members.team_id = teams.team_id
+        WHERE members.event_id = ? AND member_id = ?
+        """
+
+        return await self._fetchrow(query, self.event, member_id)
+
+    async def fetch_members(self, *, primary: bool = False) -> list[dict[str, Any]]:
+        query: str = """
+        SELECT * FROM members
+        LEFT OUTER JOIN teams ON (members.team_id = teams.team_id)
+        WHERE members.event_id = ?
+        """
+
+        return await self._fetch(query, self.event)
+
+    async def fetch_team(
+            self,
+            *,
+            team_id: int | None = None,
+            token: str | None = None,
+            invite: str | None = None,
+            owner: int | None = None,
+            name: str | None = None,
+            text_id: int | None = None,
+            voice_id: int | None = None,
+            role_id: int | None = None,
+            primary: bool = False
+    ) -> list[dict[str, Any]]:
+        query: str = """
+        SELECT * FROM teams
+        LEFT OUTER JOIN members ON (teams.team_id = members.team_id)
+        WHERE teams.event_id = ? AND (
+            teams.team_id = ?
+            OR token = ?
+            OR invite = ?
+            OR owner = ?
+            OR name = ?
+            OR text_id = ?
+            OR voice_id = ?
+            OR role_id = ?
+        )
+        """
+
+        return await self._fetch(query, self.event, team_id, token, invite, owner, name, text_id, voice_id, role_id)
+
+    async def fetch_teams(self, *, primary: bool = False) -> list[dict[str, Any]]:
+        return await self._fetch("""SELECT * FROM teams WHERE event_id = ?""", self.event)
+
+    async def fetch_team_summaries(self, *, primary: bool = False) -> list[dict[str, Any]]:
+        query: str = """SELECT * FROM team_summary WHERE event_id = ? ORDER BY name"""
+        return await self._fetch(query, self.event)
+
+    async def edit_team_name(self, *, team_id: int, name: str) -> dict[str, Any]:
+        query: str = """UPDATE teams SET name = ? WHERE event_id = ? AND team_id = ? RETURNING *"""
+        return await self._fetchrow(query, name, self.event, team_id)
+
+    async def delete_team(self, team_id: int, *, jobs: Sequence[Job] = ()) -> dict[str, Any]:
+        query: str = """DELETE FROM teams WHERE event_id = ? AND team_id = ? RETURNING *"""
+        return await self._write(query, self.event, team_id, jobs=jobs)
+
+    async def create_log(self, *, channel: int, invoker: int, command: str, error: str, traceback: str) -> int:
+        query: str = """
+        INSERT INTO error_log(event_id, channel, invoker, command, error, traceback)
+        VALUES (?, ?, ?, ?, ?, ?) RETURNING *
+        """
+
+        row: dict[str, Any] = await self._fetchrow(query, self.event, channel, invoker, command, error, traceback)
+        return row['id']
+
+    async def fetch_log(self, identifier: int, *, primary: bool = False) -> dict[str, Any] | None:
+        query: str = """SELECT * FROM error_log WHERE event_id = ? AND id = ?"""
+        return await self._fetchrow(query, self.event, identifier)
+
+    async def enqueue_jobs(self, jobs: Sequence[Job], /) -> None:
+        def execute() -> None:
+            self._connection.execute('BEGIN')
+
+            try:
+                self._enqueue(jobs)
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+
+            self._connection.execute('COMMIT')
+
+        await self._run(execute)
+
+    async def claim_jobs(self, *, limit: int, lease: float) -> list[dict[str, Any]]:
+        # Queries are serialized on one thread, so the select and update can not race another claim.
+        # Leases use millisecond timestamps, datetime() would round them down to the second...
+        query: str = """
+        UPDATE outbox
+        SET status = 'running', attempts = attempts + 1, available = strftime('%Y-%m-%d %H:%M:%f', 'now', ?)
+        WHERE job_id IN (
+            SELECT job_id FROM outbox
+            WHERE status IN ('pending', 'running') AND available <= strftime('%Y-%m-%d %H:%M:%f', 'now')
+            ORDER BY available, job_id
+            LIMIT ?
+        )
+        RETURNING *
+        """
+
+        return await self._fetch(query, f'+{lease} seconds', limit)
+
+    async def complete_job(self, job_id: int, /) -> None:
+        query: str = """
+        UPDATE outbox SET status = 'done', completed = datetime('now'), last_error = NULL WHERE job_id = ?
+        """
+        await self._fetch(query, job_id)
+
+    async def extend_job(self, job_id: int, /, *, lease: float) -> None:
+        query: str = """
+        UPDATE outbox SET available = strftime('%Y-%m-%d %H:%M:%f', 'now', ?) WHERE job_id = ? AND status = 'running'
+        """
+        await self._fetch(query, f'+{lease} seconds', job_id)
+
+    async def update_job_payload(self, job_id: int, /, values: dict[str, Any]) -> None:
+        query: str = """UPDATE outbox SET payload = json_patch(payload, ?) WHERE job_id = ?"""
+        await self._fetch(query, json.dumps(values), job_id)
+
+    async def retry_job(self, job_id: int, /, *, delay: float, error: str) -> None:
+        query: str = """
+        UPDATE outbox
+        SET status = 'pending', available = strftime('%Y-%m-%d %H:%M:%f', 'now', ?), last_error = ?
+        WHERE job_id = ?
+        """
+        await self._fetch(query, f'+{delay} seconds', error, job_id)
+
+    async def fail_job(self, job_id: int, /, *, error: str) -> None:
+        query: str = """
+        UPDATE outbox SET status = 'failed', completed = datetime('now'), last_error = ? WHERE job_id = ?
+        """
+        await self._fetch(query, error, job_id)
+
+    async def fetch_outbox_depth(self, *, prefix: str | None = None) -> dict[str, int]:
+        query: str = """
+        SELECT status, count(*) AS count FROM outbox
+        WHERE status <> 'done' AND (?1 IS NULL OR substr(idempotency_key, 1, length(?1)) = ?1)
+        GROUP BY status
+        """
+        rows: list[dict[str, Any]] = await self._fetch(query, prefix)
+
+        depth: dict[str, int] = {status: 0 for status in JOB_STATUSES if status != 'done'}
+        depth.update({row['status']: row['count'] for row in rows})
+
+        return depth
+
+    async def archive_event(self, event_id: int, *, directory: pathlib.Path) -> list[pathlib.Path]:
+        if event_id == self.event:
+            raise ValueError('The active event can not be archived.')
+
+        directory.mkdir(parents=True, exist_ok=True)
+
+        def archive() -> list[pathlib.Path]:
+            files: list[pathlib.Path] = []
+            self._connection.execute('BEGIN')
+
+            try:
+                for table in EVENT_TABLES:
+                    query: str = f'SELECT * FROM {table} WHERE event_id = ?'
+                    cursor: sqlite3.Cursor = self._connection.execute(query, (event_id,))
+
+                    path: pathlib.Path = directory / f'event_{event_id}_{table}.csv.gz'
+                    with gzip.open(path, 'wt', newline='') as fp:
+                        writer = csv.writer(fp)
+                        writer.writerow([d[0] for d in cursor.description])
+                        writer.writerows(row.values() for row in cursor)
+
+                    files.append(path)
+
+                for table in reversed(EVENT_TABLES):
+                    self._connection.execute(f'DELETE FROM {table} WHERE event_id = ?', (event_id,))
+
+                query = """UPDATE events SET archived = datetime('now') WHERE event_id = ?"""
+                self._connection.execute(query, (event_id,))
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+                raise
+
+            self._connection.execute('COMMIT')
+            return files
+
+        files: list[pathlib.Path] = await self._run(archive)
+        logger.info(f'Archived event ({event_id}) to {directory}.')
+
+        return files